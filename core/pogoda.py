@@ -7,31 +7,33 @@ class Pogoda:
         self.opady = None
         self.poprzednia_temperatura = None  # Przechowuje temperaturę z poprzedniego dnia
 
-    def generuj_pogode(self):
-        """Generuje pogodę raz na dzień z ograniczeniem zmiany temperatury do 2 stopni."""
+    def generuj_pogode(self, rng=None):
+        """Generuje pogodę raz na dzień z ograniczeniem zmiany temperatury do 2 stopni.
+        :param rng: strumień losowości (np. game_engine.rng.stream('weather')); domyślnie moduł random."""
+        rng = rng or random
         min_temp = None
         max_temp = None
 
         if self.poprzednia_temperatura is None:
-            self.temperatura = random.randint(-5, 25)  # Pierwszy dzień bez ograniczeń
+            self.temperatura = rng.randint(-5, 25)  # Pierwszy dzień bez ograniczeń
         else:
             min_temp = max(-5, self.poprzednia_temperatura - 2)
             max_temp = min(25, self.poprzednia_temperatura + 2)
-            self.temperatura = random.randint(min_temp, max_temp)
+            self.temperatura = rng.randint(min_temp, max_temp)
 
         # Zapisanie obecnej temperatury jako poprzedniej na przyszłość
         self.poprzednia_temperatura = self.temperatura
 
         # Generowanie zachmurzenia
-        self.zachmurzenie = random.choice(["Bezchmurnie", "Zachmurzenie umiarkowane", "Duże zachmurzenie"])
+        self.zachmurzenie = rng.choice(["Bezchmurnie", "Zachmurzenie umiarkowane", "Duże zachmurzenie"])
 
         # Generowanie opadów z walidacją
         if self.zachmurzenie == "Bezchmurnie":
             self.opady = "Bezdeszczowo"
         elif self.zachmurzenie == "Zachmurzenie umiarkowane":
-            self.opady = random.choice(["Bezdeszczowo", "Lekkie opady"])
+            self.opady = rng.choice(["Bezdeszczowo", "Lekkie opady"])
         else:  # Duże zachmurzenie
-            self.opady = random.choice(["Bezdeszczowo", "Lekkie opady", "Intensywne opady"])
+            self.opady = rng.choice(["Bezdeszczowo", "Lekkie opady", "Intensywne opady"])
 
         # Dodanie opadów śniegu, jeśli temperatura poniżej zera i nie jest bezdeszczowo
         if self.temperatura < 0 and self.opady != "Bezdeszczowo":
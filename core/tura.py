@@ -13,14 +13,19 @@ class TurnManager:
         # Inicjalizacja obiektu Pogoda jako atrybutu klasy
         from core.pogoda import Pogoda
         self.weather = Pogoda()
-        self.weather.generuj_pogode()
+        self.weather.generuj_pogode(self._weather_rng())
         self.current_weather = self.weather.generuj_raport_pogodowy()
 
+    def _weather_rng(self):
+        """Strumień pogody silnika (None bez silnika - wtedy Pogoda używa modułu random)."""
+        streams = getattr(self.game_engine, 'rng', None)
+        return streams.stream('weather') if streams is not None else None
+
     def rozpocznij_nowa_ture(self):
         """Rozpoczyna nową turę i generuje pogodę raz na dzień."""
 
         if self.current_turn % 6 == 1:  # Generowanie pogody raz na dzień (co 6 tur)
-            self.weather.generuj_pogode()
+            self.weather.generuj_pogode(self._weather_rng())
 
         # Inkrementacja tury
         self.current_turn += 1
@@ -44,9 +49,13 @@ class TurnManager:
                     token.currentMovePoints = max_mp
 
             if self.current_turn % 6 == 0:  # Co 6 tur generujemy nowy raport pogodowy
-                self.weather.generuj_pogode()
+                self.weather.generuj_pogode(self._weather_rng())
                 self.current_weather = self.weather.generuj_raport_pogodowy()
 
+            # Wpis zmiany tury w dzienniku gry (numer tury z menedżera tur)
+            if self.game_engine is not None and hasattr(self.game_engine, 'record'):
+                self.game_engine.record('turn', turn=self.current_turn)
+
             return True  # Zakończono pełną turę
 
         return False
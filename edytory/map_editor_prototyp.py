@@ -4,8 +4,13 @@ import json
 import math
 import os
 from pathlib import Path
+import sys
 from PIL import Image, ImageTk, ImageDraw, ImageFont
 
+# Katalog projektu w sys.path, aby edytor korzystał ze wspólnej pamięci obrazków żetonów z gui/
+sys.path.append(str(Path(__file__).parent.parent))
+from gui.sprite_cache import get_token_sprite
+
 # Folder „assets” obok map_editor_prototyp.py
 ASSET_ROOT = Path(__file__).parent.parent / "assets"
 ASSET_ROOT.mkdir(exist_ok=True)
@@ -405,8 +410,9 @@ class MapEditor:
                 if not img_path.exists():
                     print(f"[WARN] Missing token image: {img_path}")
                     continue          # pomijamy brakujący plik
-                img = Image.open(img_path).resize((self.hex_size, self.hex_size))
-                tk_img = ImageTk.PhotoImage(img)
+                tk_img = get_token_sprite(img_path, self.hex_size)
+                if tk_img is None:
+                    continue
                 cx, cy = self.hex_centers[hex_id]
                 self.canvas.create_image(cx, cy, image=tk_img)
                 self.canvas.image_store.append(tk_img)
@@ -581,8 +587,7 @@ class MapEditor:
                 img_path = ASSET_ROOT / token["image"]
                 if img_path.exists():
                     try:
-                        img = Image.open(img_path).resize((s_zoom, s_zoom))
-                        tk_img = ImageTk.PhotoImage(img)
+                        tk_img = get_token_sprite(img_path, s_zoom)
                         self.canvas.create_image(cx, cy, image=tk_img, tags="hover_zoom")
                         # Przechowuj referencję, by nie znikł z pamięci
                         if not hasattr(self, '_hover_zoom_images'):
@@ -948,8 +953,7 @@ class MapEditor:
         # Wyświetlanie żetonów
         for token in available_tokens:
             if os.path.exists(token["image_path"]):
-                img = Image.open(token["image_path"]).resize((50, 50))
-                img = ImageTk.PhotoImage(img)
+                img = get_token_sprite(token["image_path"], 50)
                 btn = tk.Button(
                     frame, image=img, text=token["name"], compound="top",
                     bg="saddlebrown", fg="white", relief="raised",
@@ -17,8 +17,13 @@ project_root = Path(__file__).parent
 sys.path.append(str(project_root / "edytory"))
 
 class ArmyCreatorStudio:
-    def __init__(self, root):
+    # Strumień losowości; bez __init__ (np. w testach) - globalny moduł random
+    rng = random
+
+    def __init__(self, root, seed=None):
         self.root = root
+        # Własny strumień losowości kreatora (seed pozwala odtworzyć wygenerowaną armię)
+        self.rng = random.Random(seed)
         self.root.title("🎖️ Kreator Armii - Kampania 1939")
         self.root.geometry("800x700")
         self.root.configure(bg="#556B2F")  # Dark olive green jak w grze
@@ -506,11 +511,11 @@ class ArmyCreatorStudio:
             # Dla bardzo małych armii (≤3) nie wymuszaj minimum 1 dla każdego typu
             if size <= 3 and desired_count == 0:
                 # Małe szanse dla rzadkich typów w mini-armiach
-                if random.random() < template['weight'] * 2:
+                if self.rng.random() < template['weight'] * 2:
                     desired_count = 1
             elif desired_count == 0:
                 # Dla większych armii daj małą szansę na rzadkie typy
-                if random.random() < template['weight']:
+                if self.rng.random() < template['weight']:
                     desired_count = 1
             
             actual_count = min(desired_count, remaining_slots, 
@@ -521,14 +526,14 @@ class ArmyCreatorStudio:
                     break
                     
                 # Wybierz losowy rozmiar jednostki
-                unit_size = random.choice(self.unit_sizes)
+                unit_size = self.rng.choice(self.unit_sizes)
                 
                 # Dostosuj koszt w zależności od rozmiaru
                 size_multiplier = {"Pluton": 1.0, "Kompania": 1.5, "Batalion": 2.2}
                 unit_cost = int(template['base_cost'] * size_multiplier.get(unit_size, 1.0))
                 
                 # Dodaj losową wariację ±20%
-                variation = random.uniform(0.8, 1.2)
+                variation = self.rng.uniform(0.8, 1.2)
                 unit_cost = int(unit_cost * variation)
                 
                 # Automatycznie wybierz upgrady na podstawie poziomu wyposażenia
@@ -555,9 +560,9 @@ class ArmyCreatorStudio:
         # Wypełnij pozostałe sloty tanimi jednostkami
         while remaining_slots > 0 and remaining_budget >= 15:
             cheap_types = [('Z', 'Rozpoznanie'), ('P', 'Piechota')]
-            unit_type, type_name = random.choice(cheap_types)
+            unit_type, type_name = self.rng.choice(cheap_types)
             unit_size = 'Pluton'
-            unit_cost = min(remaining_budget, random.randint(15, 25))
+            unit_cost = min(remaining_budget, self.rng.randint(15, 25))
             
             army.append({
                 'type': type_name,
@@ -600,7 +605,7 @@ class ArmyCreatorStudio:
             
         elif unit_type in ["TC", "TŚ", "TL", "TS"]:  # Czołgi - tylko obserwator
             priorities = ["obserwator"]
-            max_upgrades = 1 if random.random() < upgrade_chance else 0
+            max_upgrades = 1 if self.rng.random() < upgrade_chance else 0
             
         elif unit_type in ["AC", "AL", "AP"]:  # Artyleria - obserwator + transport
             priorities = ["obserwator", "ciagnik altyleryjski", "sam. ciezarowy Fiat 621"]
@@ -608,11 +613,11 @@ class ArmyCreatorStudio:
             
         elif unit_type == "K":  # Kawaleria - tylko ckm
             priorities = ["sekcja ckm"]
-            max_upgrades = 1 if random.random() < upgrade_chance else 0
+            max_upgrades = 1 if self.rng.random() < upgrade_chance else 0
             
         else:  # Pozostałe (Z, D, G)
             priorities = ["sam. ciezarowy Fiat 621", "sekcja ckm"]
-            max_upgrades = 1 if random.random() < upgrade_chance else 0
+            max_upgrades = 1 if self.rng.random() < upgrade_chance else 0
         
         # Wybierz upgrady według priorytetów
         transport_selected = False
@@ -622,9 +627,9 @@ class ArmyCreatorStudio:
             
             if priority_upgrade in available_upgrades:
                 # Dodatkowa szansa bazująca na priorytecie
-                priority_chance = upgrade_chance * random.uniform(0.7, 1.0)
+                priority_chance = upgrade_chance * self.rng.uniform(0.7, 1.0)
                 
-                if random.random() < priority_chance:
+                if self.rng.random() < priority_chance:
                     # Sprawdź czy to transport (tylko jeden na jednostkę)
                     if priority_upgrade in self.transport_types:
                         if not transport_selected:
@@ -640,7 +645,7 @@ class ArmyCreatorStudio:
                                 and (u not in self.transport_types or not transport_selected)]
             
             if remaining_upgrades:
-                extra_upgrade = random.choice(remaining_upgrades)
+                extra_upgrade = self.rng.choice(remaining_upgrades)
                 selected_upgrades.append(extra_upgrade)
         
         return selected_upgrades
@@ -669,8 +674,8 @@ class ArmyCreatorStudio:
     
     def generate_random_army(self):
         """Generuje losową armię."""
-        size = random.randint(8, 20)
-        budget = random.randint(300, 800)
+        size = self.rng.randint(8, 20)
+        budget = self.rng.randint(300, 800)
         
         self.army_size.set(size)
         self.army_budget.set(budget)
@@ -813,7 +818,7 @@ class ArmyCreatorStudio:
         
         unit_type = preview_unit['unit_type']
         names_list = unit_names.get(unit_type, [f"{commander_num}. {preview_unit['type']} Einheit"])
-        unit_name = random.choice(names_list)
+        unit_name = self.rng.choice(names_list)
         
         # Generuj statystyki na podstawie kosztu i typu
         cost = preview_unit.get('base_cost', preview_unit['cost'])  # Użyj base_cost lub cost jako fallback
@@ -876,7 +881,7 @@ class ArmyCreatorStudio:
         
         # Dodaj losową wariację ±15%
         for key in ["attack_value", "combat_value", "defense_value"]:
-            variation = random.uniform(0.85, 1.15)
+            variation = self.rng.uniform(0.85, 1.15)
             stats[key] = max(1, int(stats[key] * variation))
         
         return stats
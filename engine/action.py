@@ -1,3 +1,15 @@
+from engine.visibility import PathVision
+from engine.reaction import ReactionResolver
+from engine.combat import combat_inputs, find_retreat_hex
+from engine.token_registry import find_token
+from engine.rng import game_random
+from engine.token import faction_of, is_owned_by
+
+def _remove_token(engine, token):
+    """Usuwa wyeliminowany żeton z listy silnika i z indeksu zajętości planszy."""
+    engine.tokens.remove(token)
+    engine.board.remove_token(token)
+
 class Action:
     def __init__(self, token_id):
         self.token_id = token_id
@@ -10,15 +22,17 @@ class MoveAction(Action):
         super().__init__(token_id)
         self.dest_q = dest_q
         self.dest_r = dest_r
+        # Heks, na którym ruch przerwała strefa zagrożenia wroga (None, jeśli nie przerwano)
+        self.interrupted_at = None
 
     def execute(self, engine):
         # Znajdź żeton
-        token = next((t for t in engine.tokens if t.id == self.token_id), None)
+        token = find_token(engine.tokens, self.token_id)
         if not token:
             return False, "Brak żetonu."
         player = None
         for p in getattr(engine, 'players', []):
-            if hasattr(token, 'owner') and token.owner == f"{p.id} ({p.nation})":
+            if is_owned_by(token, p):
                 player = p
         # Upewnij się, że tymczasowe zbiory widoczności istnieją
         if player is not None:
@@ -38,10 +52,8 @@ class MoveAction(Action):
         if tile is None:
             return False, "Brak pola docelowego."
         # Usuwamy blokadę na wejście na pole z wrogiem, ale nie pozwalamy wejść na pole z sojusznikiem
-        if engine.board.is_occupied(self.dest_q, self.dest_r):
-            for t in engine.tokens:
-                if t.q == self.dest_q and t.r == self.dest_r and t.owner == token.owner:
-                    return False, "Pole zajęte przez sojusznika."
+        if engine.board.tokens_at(self.dest_q, self.dest_r, owner=token.owner):
+            return False, "Pole zajęte przez sojusznika."
         # --- MNOŻNIKI TRYBÓW RUCHU ---
         movement_mode = getattr(token, 'movement_mode', 'combat')
         token.apply_movement_mode()  # Ustaw aktualne wartości ruchu i obrony
@@ -62,7 +74,8 @@ class MoveAction(Action):
         visible_tokens = None
         if player is not None and hasattr(player, 'visible_tokens'):
             visible_tokens = set(player.visible_tokens)
-        path = engine.board.find_path(start, goal, max_mp=token.currentMovePoints, max_fuel=token.currentFuel, visible_tokens=visible_tokens)
+        # Pole osiągalności jest zapamiętywane przez planszę, więc podgląd zasięgu w GUI i ruch liczą Dijkstrę raz
+        path = engine.board.reachable(start, max_mp=token.currentMovePoints, max_fuel=token.currentFuel, visible_tokens=visible_tokens).path_to(goal)
         if not path:
             return False, "Brak ścieżki do celu."
         # Oblicz koszt ruchu i paliwa po ścieżce
@@ -70,39 +83,25 @@ class MoveAction(Action):
         fuel_cost = 0
         final_pos = start
         board = engine.board
-        sight = token.stats.get('sight', 0)
+        vision = PathVision(board, token, engine.tokens)
+        threats = ReactionResolver.for_board(board)
+        faction = faction_of(token)
         for i, step in enumerate(path[1:]):  # pomijamy start
             tile = board.get_tile(*step)
             move_mod = getattr(tile, 'move_mod', 0)
             move_cost = 1 + move_mod  # zawsze minimum 1, np. bagno 1+3=4, las 1+2=3, płaski 1+0=1
             if token.currentMovePoints - (path_cost + move_cost) < 0 or token.currentFuel - (fuel_cost + move_cost) < 0:
                 break  # nie stać na kolejny krok
-            # Wyznacz pole widzenia z tego heksu
-            visible_hexes = set()
-            for dq in range(-sight, sight + 1):
-                for dr in range(-sight, sight + 1):
-                    q = step[0] + dq
-                    r = step[1] + dr
-                    if board.hex_distance(step, (q, r)) <= sight:
-                        if board.get_tile(q, r) is not None:
-                            visible_hexes.add((q, r))
-            # Sprawdź, czy w polu widzenia jest przeciwnik (ignoruj sojuszników)
-            enemy_in_sight = False
-            for t in engine.tokens:
-                # Pomijaj żetony bez ownera lub o pustym ownerze
-                if not hasattr(t, 'owner') or not hasattr(token, 'owner') or not t.owner or not token.owner:
-                    continue
-                if (t.q, t.r) in visible_hexes:
-                    nation1 = t.owner.split('(')[-1].replace(')','').strip()
-                    nation2 = token.owner.split('(')[-1].replace(')','').strip()
-                    if nation1 != nation2:
-                        enemy_in_sight = True
-                        break  # zatrzymaj ruch tylko na przeciwniku
             final_pos = step
             path_cost += move_cost
             fuel_cost += move_cost
-            if enemy_in_sight:
-                break  # Zatrzymaj ruch natychmiast
+            # Ogień okazyjny: ruch kończy się na pierwszym heksie, który wróg widzi i ma w zasięgu ataku
+            if threats.is_threatened(step, faction):
+                self.interrupted_at = step
+                break
+            # Zatrzymaj ruch natychmiast, gdy z tego heksu widać przeciwnika (sojusznicy są ignorowani)
+            if vision.sees_enemy(step):
+                break
         if final_pos == start:
             return False, "Brak wystarczających punktów ruchu lub paliwa na ruch."
         # Ustaw żeton na ostatniej osiągniętej pozycji
@@ -112,28 +111,19 @@ class MoveAction(Action):
 
         # --- ODKRYWANIE CAŁEGO POLA WIDZENIA NA TRASIE RUCHU ---
         if player is not None:
-            for hex_coords in path[:path.index(final_pos)+1]:
-                # Wyznacz pole widzenia z tego heksu
-                visible_hexes = set()
-                for dq in range(-sight, sight + 1):
-                    for dr in range(-sight, sight + 1):
-                        q = hex_coords[0] + dq
-                        r = hex_coords[1] + dr
-                        if board.hex_distance(hex_coords, (q, r)) <= sight:
-                            if board.get_tile(q, r) is not None:
-                                visible_hexes.add((q, r))
-                player.temp_visible_hexes.update(visible_hexes)
-                # Dodaj żetony przeciwnika z tych heksów
-                for vh in visible_hexes:
-                    for t in getattr(engine, 'tokens', []):
-                        if (t.q, t.r) == vh and hasattr(t, 'owner') and hasattr(token, 'owner'):
-                            nation1 = t.owner.split('(')[-1].replace(')','').strip()
-                            nation2 = token.owner.split('(')[-1].replace(')','').strip()
-                            if nation1 != nation2:
-                                player.temp_visible_tokens.add(t.id)
+            hexes, enemy_ids = vision.reveal(path[:path.index(final_pos)+1])
+            player.temp_visible_hexes.update(hexes)
+            player.temp_visible_tokens.update(enemy_ids)
 
         return True, "OK"
 
+
+def can_attack(attacker, defender) -> bool:
+    """Czy attacker może zaatakować defender: cel należy do innego właściciela.
+    Wspólna reguła CombatAction i LegalActionGenerator."""
+    return attacker.owner != defender.owner
+
+
 class CombatAction(Action):
     def __init__(self, attacker_id, defender_id, is_reaction: bool = False):
         super().__init__(attacker_id)
@@ -142,37 +132,35 @@ class CombatAction(Action):
         self.is_reaction = bool(is_reaction)
 
     def execute(self, engine):
-        import random
-        attacker = next((t for t in engine.tokens if t.id == self.token_id), None)
-        defender = next((t for t in engine.tokens if t.id == self.defender_id), None)
+        random = game_random(engine, 'combat')
+        attacker = find_token(engine.tokens, self.token_id)
+        defender = find_token(engine.tokens, self.defender_id)
         if not attacker or not defender:
             return False, "Brak żetonu atakującego lub broniącego."
+        # Wartości walki liczone wspólnie z podglądem szans (engine.combat.CombatPredictor)
+        inputs = combat_inputs(engine.board, attacker, defender)
         # Sprawdź dystans (zasięg ataku)
-        attack_range = attacker.stats.get('attack', {}).get('range', 1)
+        attack_range = inputs.attack_range
         defense_range = defender.stats.get('attack', {}).get('range', 1)
-        dist = engine.board.hex_distance((attacker.q, attacker.r), (defender.q, defender.r))
+        dist = inputs.distance
         if dist > attack_range:
             return False, f"Za daleko do ataku (zasięg: {attack_range})."
         # Sprawdź punkty ruchu tylko dla zwykłego ataku (nie reakcji)
         if not self.is_reaction and getattr(attacker, 'currentMovePoints', 0) <= 0:
             return False, "Brak punktów ruchu do ataku."
         # Sprawdź czy atak nie jest na własny żeton
-        if attacker.owner == defender.owner:
+        if not can_attack(attacker, defender):
             return False, "Nie można atakować własnych żetonów!"
         # Atak kosztuje wszystkie pozostałe MP (atak tylko raz na turę) – ale nie dla reakcji
         if not self.is_reaction:
             attacker.currentMovePoints = 0
         # --- Rozstrzyganie walki ---
         # Atakujący
-        attack_val = attacker.stats.get('attack', {}).get('value', 0)
+        attack_val = inputs.attack_value
         attack_mult = random.uniform(0.8, 1.2)
         attack_result = int(round(attack_val * attack_mult))
-        # Obrońca
-        # Użyj aktualnej wartości obrony (zmienianej przez tryb ruchu), jeśli istnieje
-        defense_val = getattr(defender, 'defense_value', defender.stats.get('defense_value', 0))
-        tile = engine.board.get_tile(defender.q, defender.r)
-        defense_mod = tile.defense_mod if tile else 0
-        defense_total = defense_val + defense_mod
+        # Obrońca (aktualna wartość obrony z trybu ruchu + modyfikator terenu)
+        defense_total = inputs.defense_total
         defense_mult = random.uniform(0.8, 1.2)
         # --- PRINTY DEBUGUJĄCE WALKĘ (opcjonalne) ---
         debug_combat = getattr(engine, 'debug_combat', False)
@@ -182,7 +170,7 @@ class CombatAction(Action):
             print(f"  Zasięg ataku: {attack_range}, dystans: {dist}")
             print(f"  Zasięg ataku obrońcy: {defense_range}")
         # Atak jednostronny jeśli obrońca nie sięga atakującego
-        if dist > defense_range:
+        if not inputs.counterattack:
             if debug_combat:
                 print("  Obrońca nie może kontratakować (za mały zasięg) – atak jednostronny.")
             defense_result = 0  # brak kontrataku
@@ -192,7 +180,7 @@ class CombatAction(Action):
             defense_result = int(round(defense_total * defense_mult))
         if debug_combat:
             print(f"  Atak: {attack_val} x {attack_mult:.2f} = {attack_result}")
-            print(f"  Obrona: {defense_val} + modyfikator terenu {defense_mod} = {defense_total} x {defense_mult:.2f} = {defense_result}")
+            print(f"  Obrona (z modyfikatorem terenu): {defense_total} x {defense_mult:.2f} = {defense_result}")
             print(f"  Straty: obrońca -{attack_result}, atakujący -{defense_result}")
         # Odejmij straty
         defender.combat_value = max(0, getattr(defender, 'combat_value', 0) - attack_result)
@@ -204,35 +192,22 @@ class CombatAction(Action):
             print(f"  Po walce: obrońca {defender.combat_value}, atakujący {attacker.combat_value}")
         # Eliminacja obrońcy
         if defender.combat_value <= 0:
-            import random
             if random.random() < 0.5:
                 defender.combat_value = 1
                 # Szukaj wolnego sąsiedniego pola oddalającego od atakującego
-                from engine.hex_utils import get_neighbors
-                neighbors = get_neighbors(defender.q, defender.r)
-                start_dist = engine.board.hex_distance((attacker.q, attacker.r), (defender.q, defender.r))
-                found = False
-                for nq, nr in neighbors:
-                    # Pole musi istnieć i być wolne
-                    if not engine.board.get_tile(nq, nr):
-                        continue
-                    if engine.board.is_occupied(nq, nr):
-                        continue
-                    # Pole musi oddalać od atakującego
-                    if engine.board.hex_distance((attacker.q, attacker.r), (nq, nr)) > start_dist:
-                        defender.set_position(nq, nr)
-                        msg = f"Obrońca przeżył z 1 punktem i cofnął się na ({nq},{nr})!"
-                        found = True
-                        break
-                if not found:
+                retreat = find_retreat_hex(engine.board, attacker, defender)
+                if retreat is not None:
+                    defender.set_position(*retreat)
+                    msg = f"Obrońca przeżył z 1 punktem i cofnął się na ({retreat[0]},{retreat[1]})!"
+                else:
                     # Jeśli nie można się cofnąć, żeton ginie
                     self._award_vp_for_elimination(engine, attacker, defender)
-                    engine.tokens.remove(defender)
+                    _remove_token(engine, defender)
                     msg = "Obrońca nie mógł się cofnąć i został zniszczony!"
             else:
                 # --- VP za eliminację obrońcy ---
                 self._award_vp_for_elimination(engine, attacker, defender)
-                engine.tokens.remove(defender)
+                _remove_token(engine, defender)
                 msg = "Obrońca został zniszczony!"
         else:
             msg = f"Obrońca stracił {attack_result} punktów, pozostało: {defender.combat_value}"
@@ -240,7 +215,7 @@ class CombatAction(Action):
         if attacker.combat_value <= 0:
             # --- VP za eliminację atakującego (dla obrońcy) ---
             self._award_vp_for_elimination(engine, defender, attacker)
-            engine.tokens.remove(attacker)
+            _remove_token(engine, attacker)
             msg += "\nAtakujący został zniszczony!"
         else:
             msg += f"\nAtakujący stracił {defense_result} punktów, pozostało: {attacker.combat_value}"
@@ -253,9 +228,9 @@ class CombatAction(Action):
         winner_player = None
         loser_player = None
         for p in getattr(engine, 'players', []):
-            if hasattr(winner_token, 'owner') and p and winner_token.owner == f"{p.id} ({p.nation})":
+            if p and is_owned_by(winner_token, p):
                 winner_player = p
-            if hasattr(loser_token, 'owner') and p and loser_token.owner == f"{p.id} ({p.nation})":
+            if p and is_owned_by(loser_token, p):
                 loser_player = p
         price = loser_token.stats.get('price', 0)
         # Dodaj punkty zwycięstwa zwycięzcy
@@ -280,3 +255,66 @@ class CombatAction(Action):
                 'token_id': loser_token.id,
                 'enemy': winner_token.owner
             })
+
+def economic_points(player) -> int:
+    """Punkty ekonomiczne gracza do wydania na uzupełnienia; brak gracza lub atrybutu to 0
+    (jak w oknie uzupełniania panelu dowódcy). Wspólna reguła ResupplyAction i LegalActionGenerator."""
+    return getattr(player, 'punkty_ekonomiczne', 0) or 0
+
+
+class ResupplyAction(Action):
+    """Uzupełnienie paliwa i zasobów bojowych żetonu (jak w oknie uzupełniania panelu dowódcy).
+    Ilości są przycinane do maksimum żetonu, a koszt (punkt za faktycznie dodaną jednostkę) jest
+    pobierany z punktów ekonomicznych dowódcy-właściciela."""
+
+    def __init__(self, token_id, fuel: int = 0, combat: int = 0):
+        super().__init__(token_id)
+        self.fuel = max(0, int(fuel))
+        self.combat = max(0, int(combat))
+
+    def execute(self, engine):
+        token = find_token(engine.tokens, self.token_id)
+        if not token:
+            return False, "Brak żetonu."
+        max_fuel = getattr(token, 'maxFuel', token.stats.get('maintenance', 0))
+        current_fuel = getattr(token, 'currentFuel', 0)
+        fuel = max(0, min(self.fuel, max_fuel - current_fuel))
+        max_combat = token.stats.get('combat_value', 0)
+        current_combat = getattr(token, 'combat_value', 0)
+        combat = max(0, min(self.combat, max_combat - current_combat))
+        cost = fuel + combat
+        player = next((p for p in getattr(engine, 'players', []) if is_owned_by(token, p)), None)
+        points = economic_points(player)
+        if cost > points:
+            return False, f"Za mało punktów ekonomicznych ({points}/{cost})."
+        token.currentFuel = current_fuel + fuel
+        token.combat_value = current_combat + combat
+        if player is not None and cost:
+            player.punkty_ekonomiczne = points - cost
+            if getattr(player, 'economy', None) is not None:
+                player.economy.economic_points = player.punkty_ekonomiczne
+        return True, f"Uzupełniono: paliwo +{fuel}, zasoby bojowe +{combat}"
+
+# Tryby ruchu żetonu (mnożniki w Token.apply_movement_mode)
+MOVEMENT_MODES = ('combat', 'march', 'recon')
+
+
+class ModeChangeAction(Action):
+    """Zmiana trybu ruchu żetonu; po zmianie tryb jest zablokowany do końca tury (jak w oknie wyboru trybu)."""
+
+    def __init__(self, token_id, mode: str):
+        super().__init__(token_id)
+        self.mode = mode
+
+    def execute(self, engine):
+        token = find_token(engine.tokens, self.token_id)
+        if not token:
+            return False, "Brak żetonu."
+        if self.mode not in MOVEMENT_MODES:
+            return False, f"Nieznany tryb ruchu: {self.mode}."
+        if getattr(token, 'movement_mode_locked', False):
+            return False, "Tryb ruchu zablokowany do końca tury."
+        token.movement_mode = self.mode
+        token.apply_movement_mode(reset_mp=False)
+        token.movement_mode_locked = True
+        return True, f"Tryb ruchu: {self.mode}"
@@ -6,6 +6,11 @@ Podział na mniejsze, testowalne komponenty
 
 from typing import Tuple, Optional, Dict, Any, List, Set
 from dataclasses import dataclass
+from engine.hex_utils import hex_disk_offsets
+from engine.visibility import PathVision
+from engine.token_registry import find_token
+from engine.token import is_owned_by
+from engine.rng import game_random
 
 
 @dataclass
@@ -32,7 +37,7 @@ class BaseAction:
     
     def _find_token(self, engine, token_id: str):
         """Znajdź żeton po ID"""
-        return next((t for t in engine.tokens if t.id == token_id), None)
+        return find_token(engine.tokens, token_id)
     
     def _find_player_by_token(self, engine, token):
         """Znajdź gracza będącego właścicielem żetonu"""
@@ -40,7 +45,7 @@ class BaseAction:
             return None
         
         for player in getattr(engine, 'players', []):
-            if token.owner == f"{player.id} ({player.nation})":
+            if is_owned_by(token, player):
                 return player
         return None
 
@@ -63,9 +68,8 @@ class MovementValidator:
         
         # Sprawdź czy pole nie jest zajęte przez sojusznika
         if engine.board.is_occupied(dest_q, dest_r):
-            for t in engine.tokens:
-                if t.q == dest_q and t.r == dest_r and t.owner == token.owner:
-                    return False, "Pole zajęte przez sojusznika."
+            if engine.board.tokens_at(dest_q, dest_r, owner=token.owner):
+                return False, "Pole zajęte przez sojusznika."
         
         return True, "OK"
     
@@ -121,7 +125,7 @@ class PathfindingService:
         path_cost = 0
         fuel_cost = 0
         final_pos = (token.q, token.r)
-        sight = token.stats.get('sight', 0)
+        vision = PathVision(engine.board, token, engine.tokens)
         
         for step in path[1:]:  # pomijamy start
             tile = engine.board.get_tile(*step)
@@ -134,7 +138,7 @@ class PathfindingService:
                 break
             
             # Sprawdź czy w polu widzenia jest przeciwnik
-            if PathfindingService._enemy_in_sight(engine, token, step, sight):
+            if vision.sees_enemy(step):
                 final_pos = step
                 path_cost += move_cost
                 fuel_cost += move_cost
@@ -149,21 +153,7 @@ class PathfindingService:
     @staticmethod
     def _enemy_in_sight(engine, token, position: Tuple[int, int], sight: int) -> bool:
         """Sprawdź czy w polu widzenia jest przeciwnik"""
-        visible_hexes = VisionService.calculate_visible_hexes(engine.board, position, sight)
-        
-        for enemy_token in engine.tokens:
-            if not hasattr(enemy_token, 'owner') or not hasattr(token, 'owner'):
-                continue
-            if not enemy_token.owner or not token.owner:
-                continue
-            
-            if (enemy_token.q, enemy_token.r) in visible_hexes:
-                enemy_nation = enemy_token.owner.split('(')[-1].replace(')', '').strip()
-                token_nation = token.owner.split('(')[-1].replace(')', '').strip()
-                if enemy_nation != token_nation:
-                    return True
-        
-        return False
+        return PathVision(engine.board, token, engine.tokens, sight).sees_enemy(position)
 
 
 class VisionService:
@@ -172,18 +162,11 @@ class VisionService:
     @staticmethod
     def calculate_visible_hexes(board, position: Tuple[int, int], sight: int) -> Set[Tuple[int, int]]:
         """Oblicz widzialne heksy z danej pozycji"""
-        visible_hexes = set()
         q, r = position
-        
-        for dq in range(-sight, sight + 1):
-            for dr in range(-sight, sight + 1):
-                hex_q = q + dq
-                hex_r = r + dr
-                if board.hex_distance(position, (hex_q, hex_r)) <= sight:
-                    if board.get_tile(hex_q, hex_r) is not None:
-                        visible_hexes.add((hex_q, hex_r))
-        
-        return visible_hexes
+        return {
+            (q + dq, r + dr) for dq, dr in hex_disk_offsets(sight)
+            if board.get_tile(q + dq, r + dr) is not None
+        }
     
     @staticmethod
     def update_player_vision(engine, player, token, path: List[Tuple[int, int]], final_pos: Tuple[int, int]):
@@ -191,32 +174,18 @@ class VisionService:
         if not player:
             return
         
-        sight = token.stats.get('sight', 0)
-        
-        # Odkryj heksy na całej trasie do końcowej pozycji
+        # Odkryj heksy na całej trasie do końcowej pozycji (jedna suma dysków widzenia)
         final_index = path.index(final_pos) if final_pos in path else len(path) - 1
-        path_to_final = path[:final_index + 1]
-        
-        for hex_coords in path_to_final:
-            visible_hexes = VisionService.calculate_visible_hexes(engine.board, hex_coords, sight)
-            player.temp_visible_hexes.update(visible_hexes)
-            
-            # Dodaj żetony przeciwnika z widzialnych heksów
-            VisionService._add_visible_enemy_tokens(engine, player, token, visible_hexes)
+        hexes, enemy_ids = PathVision(engine.board, token, engine.tokens).reveal(path[:final_index + 1])
+        player.temp_visible_hexes.update(hexes)
+        player.temp_visible_tokens.update(enemy_ids)
     
     @staticmethod
     def _add_visible_enemy_tokens(engine, player, token, visible_hexes: Set[Tuple[int, int]]):
         """Dodaj żetony przeciwnika z widzialnych heksów"""
-        for hex_pos in visible_hexes:
-            for enemy_token in engine.tokens:
-                if ((enemy_token.q, enemy_token.r) == hex_pos and 
-                    hasattr(enemy_token, 'owner') and hasattr(token, 'owner')):
-                    
-                    enemy_nation = enemy_token.owner.split('(')[-1].replace(')', '').strip()
-                    token_nation = token.owner.split('(')[-1].replace(')', '').strip()
-                    
-                    if enemy_nation != token_nation:
-                        player.temp_visible_tokens.add(enemy_token.id)
+        for pos, ids in PathVision(engine.board, token, engine.tokens).enemies.items():
+            if pos in visible_hexes:
+                player.temp_visible_tokens.update(ids)
 
 
 class MoveAction(BaseAction):
@@ -291,7 +260,7 @@ class CombatCalculator:
     @staticmethod
     def calculate_combat_result(attacker, defender, engine) -> Dict[str, Any]:
         """Oblicz wynik walki między dwoma żetonami"""
-        import random
+        random = game_random(engine, 'combat')
         
         # Wartości ataku i obrony
         attack_val = attacker.stats.get('attack', {}).get('value', 0)
@@ -357,7 +326,7 @@ class CombatResolver:
         # Sprawdź eliminację atakującego
         if attacker.combat_value <= 0:
             CombatResolver._award_vp_for_elimination(engine, defender, attacker)
-            engine.tokens.remove(attacker)
+            CombatResolver._remove_token(engine, attacker)
             messages.append("Atakujący został zniszczony!")
         else:
             if defense_damage > 0:
@@ -368,7 +337,7 @@ class CombatResolver:
     @staticmethod
     def _handle_defender_elimination(engine, attacker, defender) -> str:
         """Obsłuż eliminację obrońcy"""
-        import random
+        random = game_random(engine, 'combat')
         
         # 50% szans na przeżycie i odwrót
         if random.random() < 0.5:
@@ -380,8 +349,14 @@ class CombatResolver:
         
         # Obrońca ginie
         CombatResolver._award_vp_for_elimination(engine, attacker, defender)
-        engine.tokens.remove(defender)
+        CombatResolver._remove_token(engine, defender)
         return "Obrońca został zniszczony!"
+
+    @staticmethod
+    def _remove_token(engine, token):
+        """Usuń żeton z gry i z indeksu zajętości planszy"""
+        engine.tokens.remove(token)
+        engine.board.remove_token(token)
     
     @staticmethod
     def _find_retreat_position(engine, attacker, defender) -> Optional[Tuple[int, int]]:
@@ -412,9 +387,9 @@ class CombatResolver:
         loser_player = None
         
         for player in getattr(engine, 'players', []):
-            if hasattr(winner_token, 'owner') and winner_token.owner == f"{player.id} ({player.nation})":
+            if hasattr(winner_token, 'owner') and is_owned_by(winner_token, player):
                 winner_player = player
-            if hasattr(loser_token, 'owner') and loser_token.owner == f"{player.id} ({player.nation})":
+            if hasattr(loser_token, 'owner') and is_owned_by(loser_token, player):
                 loser_player = player
         
         price = loser_token.stats.get('price', 0)
@@ -0,0 +1,197 @@
+"""
+Zapis automatyczny w tle. Wątek GUI robi tylko tanią kopię stanu w pamięci (capture_state: słowniki
+żetonów i graczy, punkty kluczowe, stan RNG - bez JSON i bez operacji na plikach), a serializacja,
+kompresja i atomowa podmiana pliku odbywają się w jednym wątku roboczym. Między pełnymi zapisami
+(co full_every zapisów) powstają zapisy różnicowe: tylko zmienione i usunięte żetony oraz zmienione
+strumienie RNG (małe sekcje graczy i punktów kluczowych idą w całości). Pełny zapis z jego różnicami
+to jedna generacja; trzymanych jest `generations` ostatnich generacji.
+
+Pliki w katalogu zapisu: autosave_<numer>.full / autosave_<numer>.delta (JSON skompresowany zlib).
+load_autosave odtwarza najnowszy stan w formacie GameEngine.save_state (GameEngine.apply_state).
+"""
+import json
+import os
+import re
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from engine.save_manager import serialize_players
+
+AUTOSAVE_DIR = os.path.join("saves", "autosave")
+FULL, DELTA = "full", "delta"
+_FILE_RE = re.compile(r"^autosave_(\d+)\.(full|delta)$")
+
+
+def capture_state(engine) -> Dict[str, Any]:
+    """Odłączona od silnika kopia stanu do zapisu (na wątku GUI): żetony, gracze (VP, ekonomia, widoczność),
+    punkty kluczowe, tura, bieżący gracz i RNG. Słowniki statystyk żetonów są współdzielone
+    (nie zmieniają się w trakcie gry), reszta to nowe obiekty."""
+    return {
+        "tokens": [t.serialize() for t in engine.tokens],
+        "players": serialize_players(getattr(engine, 'players', [])),
+        "key_points_state": {k: dict(v) for k, v in getattr(engine, 'key_points_state', {}).items()},
+        "key_points": {k: dict(v) for k, v in engine.board.key_points.items()},
+        "turn": engine.turn,
+        "current_player": engine.current_player,
+        "rng": engine.rng.getstate(),
+    }
+
+
+def autosave_files(directory) -> List[tuple]:
+    """Pliki zapisu automatycznego jako (numer, rodzaj, ścieżka), rosnąco po numerze."""
+    if not os.path.isdir(directory):
+        return []
+    files = []
+    for name in os.listdir(directory):
+        match = _FILE_RE.match(name)
+        if match:
+            files.append((int(match.group(1)), match.group(2), os.path.join(directory, name)))
+    return sorted(files)
+
+
+def _read_record(path) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        return json.loads(zlib.decompress(f.read()).decode("utf-8"))
+
+
+def _apply_delta(state: Dict[str, Any], record: Dict[str, Any]):
+    tokens = {t["id"]: t for t in state["tokens"]}
+    for token_id in record.pop("removed"):
+        tokens.pop(token_id, None)
+    for data in record.pop("tokens"):
+        tokens[data["id"]] = data
+    rng = record.pop("rng")
+    for key in ("base", "kind", "seq"):
+        record.pop(key, None)
+    # Pozostałe sekcje (gracze, punkty kluczowe, tura) są w każdej różnicy w całości
+    state.update(record)
+    state["tokens"] = list(tokens.values())
+    state["rng"] = {"seed": rng["seed"], "streams": {**state["rng"]["streams"], **rng["streams"]}}
+
+
+def load_autosave(directory=AUTOSAVE_DIR) -> Optional[Dict[str, Any]]:
+    """Najnowszy stan z zapisów automatycznych: ostatni czytelny pełny zapis i kolejne różnice (do pierwszej
+    brakującej lub uszkodzonej). None, jeśli w katalogu nie ma żadnego czytelnego pełnego zapisu."""
+    files = autosave_files(directory)
+    for start in reversed([i for i, (_, kind, _) in enumerate(files) if kind == FULL]):
+        try:
+            state = _read_record(files[start][2])
+        except (OSError, ValueError, zlib.error) as e:
+            print(f"[WARN] Uszkodzony zapis automatyczny {files[start][2]}: {e}")
+            continue
+        seq = state.pop("seq")
+        state.pop("kind", None)
+        for number, kind, path in files[start + 1:]:
+            if kind != DELTA or number != seq + 1:
+                break
+            try:
+                record = _read_record(path)
+            except (OSError, ValueError, zlib.error) as e:
+                print(f"[WARN] Uszkodzony zapis automatyczny {path}: {e}")
+                break
+            if record.get("base") != seq:
+                break
+            _apply_delta(state, record)
+            seq = number
+        return state
+    return None
+
+
+class AutoSaver:
+    """Zapis automatyczny w tle (jeden wątek roboczy, więc zapisy trafiają na dysk w kolejności zleceń).
+
+    AutoSaver(katalog, silnik) podpina się jako engine.autosave; request() zleca zapis bieżącego stanu
+    i wraca od razu. submit() wykonuje w tym samym wątku inne zapisy (np. ręczny zapis gry z panelu),
+    żeby nie ścigały się z zapisem automatycznym."""
+
+    def __init__(self, directory=AUTOSAVE_DIR, engine=None, full_every: int = 5, generations: int = 3):
+        self.directory = directory
+        self.engine = engine
+        self.full_every = max(1, full_every)
+        self.generations = max(1, generations)
+        files = autosave_files(directory)
+        self._seq = files[-1][0] if files else 0
+        # Stan ostatniego zapisu (id żetonu -> słownik) - używany tylko w wątku roboczym
+        self._last = None
+        self._since_full = 0
+        self._executor = None
+        if engine is not None:
+            engine.autosave = self
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def request(self, engine=None) -> Future:
+        """Zleca zapis stanu silnika; na wywołującym wątku tylko capture_state."""
+        return self.submit(self.write, capture_state(engine or self.engine))
+
+    def flush(self):
+        """Czeka na zakończenie wszystkich zleconych zapisów."""
+        if self._executor is not None:
+            self.submit(lambda: None).result()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def write(self, state: Dict[str, Any]) -> str:
+        """Zapisuje stan (pełny albo różnicowy) i zwraca ścieżkę pliku. Wywoływane w wątku roboczym."""
+        tokens = {t["id"]: t for t in state["tokens"]}
+        self._seq += 1
+        if self._last is None or self._since_full + 1 >= self.full_every:
+            kind, record = FULL, dict(state)
+            self._since_full = 0
+        else:
+            last_tokens, last_rng = self._last
+            streams = state["rng"]["streams"]
+            kind, record = DELTA, dict(
+                state,
+                base=self._seq - 1,
+                tokens=[t for token_id, t in tokens.items() if last_tokens.get(token_id) != t],
+                removed=[token_id for token_id in last_tokens if token_id not in tokens],
+                rng={"seed": state["rng"]["seed"],
+                     "streams": {k: v for k, v in streams.items() if last_rng.get(k) != v}},
+            )
+            self._since_full += 1
+        record["kind"], record["seq"] = kind, self._seq
+        payload = zlib.compress(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"autosave_{self._seq:06d}.{kind}")
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[WARN] Zapis automatyczny nie powiódł się: {e}")
+            # Następny zapis będzie pełny, bo ten mógł nie trafić na dysk
+            self._last = None
+            raise
+        self._last = (tokens, dict(state["rng"]["streams"]))
+        if kind == FULL:
+            self._rotate()
+        return path
+
+    def _rotate(self):
+        """Usuwa generacje starsze niż `generations` ostatnich pełnych zapisów. Różnica należy do generacji
+        najbliższego wcześniejszego pełnego zapisu i znika tylko razem z nią; pliki są usuwane od najnowszych,
+        więc nawet przerwane sprzątanie nie zostawia różnicy bez jej pełnego zapisu bazowego. Różnice
+        bez żadnego wcześniejszego pełnego zapisu (nie do odtworzenia) też są usuwane."""
+        files = autosave_files(self.directory)
+        fulls = [number for number, kind, _ in files if kind == FULL]
+        kept = set(fulls[-self.generations:])
+        generation = None
+        stale = []
+        for number, kind, path in files:
+            if kind == FULL:
+                generation = number
+            if generation not in kept:
+                stale.append(path)
+        for path in reversed(stale):
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"[WARN] Nie udało się usunąć {path}: {e}")
@@ -0,0 +1,68 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+from engine.snapshot import player_state, restore_player_state, restore_token_state, token_state
+
+
+@dataclass
+class BatchResult:
+    """Wynik execute_batch. Przy niepowodzeniu stan gry jest przywrócony sprzed paczki,
+    a failed_index wskazuje akcję, która się nie powiodła."""
+    success: bool
+    messages: List[str] = field(default_factory=list)
+    # (atakujący, cel, sukces, komunikat) ataków reakcyjnych po ruchach z paczki
+    reactions: List[Tuple[object, object, bool, str]] = field(default_factory=list)
+    failed_index: Optional[int] = None
+    dirty_tokens: Set[str] = field(default_factory=set)
+    dirty_hexes: Set[Tuple[int, int]] = field(default_factory=set)
+
+
+class ActionTransaction:
+    """Migawka stanu dotkniętego przez akcje paczki, zbierana leniwie: żeton jest zapamiętywany przy
+    pierwszej akcji, która go dotyczy (także ataku reakcyjnego), gracze i strumienie losowości - przy
+    otwarciu transakcji. rollback() przywraca żetony (także usunięte, na ich miejsca w kolejności rejestru),
+    graczy i RNG (jak restore_snapshot), więc nieudana paczka nie zużywa losowań; dirty() podsumowuje zmiany."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        # id żetonu -> (żeton, stan sprzed transakcji)
+        self._tokens: Dict[str, tuple] = {}
+        # Kolejność rejestru (zapamiętana krotka, bez kopiowania)
+        self._order = engine.registry.order()
+        self._players = [(p, player_state(p)) for p in getattr(engine, 'players', [])]
+        rng = getattr(engine, 'rng', None)
+        self._rng = rng.copy() if rng is not None else None
+
+    def touch(self, token_id):
+        """Zapamiętuje stan żetonu przed pierwszą zmianą w tej transakcji."""
+        if token_id is None or token_id in self._tokens:
+            return
+        token = self.engine.registry.get(token_id)
+        if token is not None:
+            self._tokens[token_id] = (token, token_state(token))
+
+    def touch_action(self, action):
+        self.touch(getattr(action, 'token_id', None))
+        self.touch(getattr(action, 'defender_id', None))
+
+    def dirty(self) -> Tuple[Set[str], Set[Tuple[int, int]]]:
+        """Id dotkniętych żetonów i heksy, na których stały przed i po transakcji."""
+        hexes = set()
+        for token, state in self._tokens.values():
+            for pos in (state[:2], (token.q, token.r)):
+                if pos[0] is not None and pos[1] is not None:
+                    hexes.add(tuple(pos))
+        return set(self._tokens), hexes
+
+    def rollback(self):
+        registry = self.engine.registry
+        current = registry.order()
+        # Rejestr zmieniony tylko przez usunięcia (eliminacje): odtworzenie pierwotnej kolejności
+        if current is not self._order and (
+                len(current) != len(self._order) or any(a is not b for a, b in zip(current, self._order))):
+            registry.reset(self._order)
+        for token, state in self._tokens.values():
+            restore_token_state(token, state)
+        for player, state in self._players:
+            restore_player_state(player, state)
+        if self._rng is not None:
+            self.engine.rng.assign(self._rng)
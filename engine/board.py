@@ -1,6 +1,10 @@
 import json
+import copy
 from typing import Dict, Tuple, Optional, List
-from engine.hex_utils import get_hex_vertices, point_in_polygon
+import numpy as np
+from engine.hex_utils import get_hex_vertices, point_in_polygon, hex_disk_offsets
+from engine.token_registry import token_nation
+from engine.zobrist import token_hash, zobrist_key
 
 class Tile:
     def __init__(self, q: int, r: int, data: Dict):
@@ -13,6 +17,54 @@ class Tile:
         self.value = data.get("value", None)
         self.spawn_nation = data.get("spawn_nation", None)
 
+class ReachabilityField:
+    """Wynik jednego przebiegu Dijkstry z pola startowego: koszt dojścia i poprzednik dla każdego osiągalnego heksa.
+    Ścieżkę do dowolnego heksa odtwarza się w czasie proporcjonalnym do jej długości."""
+
+    def __init__(self, board, start: Tuple[int, int], cost: Dict[Tuple[int, int], int], came_from: Dict[Tuple[int, int], Tuple[int, int]]):
+        self.board = board
+        self.start = start
+        self.cost = cost
+        self.came_from = came_from
+
+    def __contains__(self, hex_coords) -> bool:
+        return tuple(hex_coords) in self.cost
+
+    def __len__(self) -> int:
+        return len(self.cost)
+
+    def hexes(self) -> List[Tuple[int, int]]:
+        """Wszystkie osiągalne heksy (bez pola startowego)."""
+        return [h for h in self.cost if h != self.start]
+
+    def cost_to(self, hex_coords) -> Optional[int]:
+        return self.cost.get(tuple(hex_coords))
+
+    def path_to(self, hex_coords) -> Optional[List[Tuple[int, int]]]:
+        """Ścieżka od startu do heksa (włącznie z oboma końcami) lub None, jeśli heks jest poza zasięgiem."""
+        current = tuple(hex_coords)
+        if current not in self.cost:
+            return None
+        path = [current]
+        while current in self.came_from:
+            current = self.came_from[current]
+            path.append(current)
+        return path[::-1]
+
+    def closest_to(self, goal: Tuple[int, int]) -> Tuple[int, int]:
+        """Osiągalny heks najbliższy celowi (remisy rozstrzyga niższy koszt ruchu)."""
+        return min(self.cost, key=lambda h: (self.board.hex_distance(h, goal), self.cost[h]))
+
+    def path_to_closest(self, goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """Odpowiednik find_path(..., fallback_to_closest=True): ścieżka do celu lub do najbliższego osiągalnego pola."""
+        if goal in self.cost:
+            return self.path_to(goal)
+        best = self.closest_to(goal)
+        if best == self.start:
+            return None
+        return self.path_to(best)
+
+
 class Board:
     def __init__(self, json_path: str):
         self.json_path = json_path  # Dodane: zapamiętaj ścieżkę do pliku mapy
@@ -38,6 +90,16 @@ class Board:
         # Dodano: key_points
         self.key_points = d.get("key_points", {})
         # key_points można dodać później
+        # Gęsta siatka terenu (tablice NumPy + całkowite id heksa) budowana raz przy wczytaniu
+        self._build_grid()
+        # Śledzenie widoczności (engine.visibility.VisibilityTracker) powiadamiane o zmianach żetonów
+        self.visibility = None
+        # Pozostali obserwatorzy zmian żetonów (np. engine.reaction.ReactionResolver) - te same metody co visibility
+        self.observers = []
+        # Rejestr żetonów silnika (engine.token_registry.TokenRegistry) powiadamiany o zmianie właściciela
+        self.registry = None
+        # Indeks zajętości pól (heks -> id żetonów), uzupełniany przez set_tokens/add_token
+        self.set_tokens([])
 
     def hex_to_pixel(self, q: int, r: int) -> Tuple[float, float]:
         # Axial -> pixel (dla pointy-top) z offsetem, by heks 0,0 był w pełni widoczny
@@ -71,19 +133,314 @@ class Board:
         # s = -q - r
         return (q, r)
 
+    def _build_grid(self):
+        """Buduje siatkę terenu w układzie offset (wiersz, kolumna) dla wszystkich heksów mapy.
+        Kolumna = q - q0, wiersz = r + q // 2 - row0; id heksa = wiersz * grid_cols + kolumna.
+        Tablice NumPy służą do operacji wektorowych (widoczność, rendering), a płaskie listy
+        Pythona do szybkich odczytów skalarnych w pętlach (pathfinding)."""
+        tiles = list(self.terrain.values())
+        if tiles:
+            self.grid_q0 = min(t.q for t in tiles)
+            self.grid_row0 = min(t.r + t.q // 2 for t in tiles)
+            self.grid_cols = max(t.q for t in tiles) - self.grid_q0 + 1
+            self.grid_rows = max(t.r + t.q // 2 for t in tiles) - self.grid_row0 + 1
+        else:
+            self.grid_q0 = self.grid_row0 = 0
+            self.grid_cols = self.grid_rows = 0
+        shape = (self.grid_rows, self.grid_cols)
+        cols = np.arange(self.grid_cols)
+        rows = np.arange(self.grid_rows)
+        # Współrzędne axial każdej komórki siatki (także tych bez heksa)
+        self.q_grid = np.broadcast_to(cols + self.grid_q0, shape).astype(np.int32)
+        self.r_grid = (rows[:, None] + self.grid_row0 - self.q_grid // 2).astype(np.int32)
+        self.valid_grid = np.zeros(shape, dtype=bool)
+        self.move_mod_grid = np.zeros(shape, dtype=np.int16)
+        self.defense_mod_grid = np.zeros(shape, dtype=np.int16)
+        self.key_point_grid = np.zeros(shape, dtype=bool)
+        # Kod nacji spawnu (indeks w spawn_nations) lub -1
+        self.spawn_nations = list(self.spawn_points.keys())
+        for tile in tiles:
+            if tile.spawn_nation and tile.spawn_nation not in self.spawn_nations:
+                self.spawn_nations.append(tile.spawn_nation)
+        self.spawn_grid = np.full(shape, -1, dtype=np.int8)
+        self._tiles = [None] * (self.grid_rows * self.grid_cols)
+        self._step_cost = [None] * (self.grid_rows * self.grid_cols)
+        self._key_coords = {}
+        for key, tile in self.terrain.items():
+            idx = self.hex_id(tile.q, tile.r)
+            row, col = divmod(idx, self.grid_cols)
+            self._tiles[idx] = tile
+            self._key_coords[key] = (tile.q, tile.r)
+            self.valid_grid[row, col] = True
+            self.move_mod_grid[row, col] = tile.move_mod
+            self.defense_mod_grid[row, col] = tile.defense_mod
+            if tile.move_mod != -1:
+                self._step_cost[idx] = 1 + tile.move_mod
+            if tile.spawn_nation in self.spawn_nations:
+                self.spawn_grid[row, col] = self.spawn_nations.index(tile.spawn_nation)
+        self.passable_grid = self.valid_grid & (self.move_mod_grid != -1)
+        # Szablony dysków widzenia (promień, parzystość q) -> maska; budowane leniwie
+        self._vision_stencils = {}
+        for key in self.key_points:
+            coords = self._key_coords.get(key)
+            if coords:
+                self.key_point_grid[self.grid_index(*coords)] = True
+
+    def hex_id(self, q: int, r: int) -> int:
+        """Całkowite id heksa w siatce (-1 poza prostokątem siatki)."""
+        col = q - self.grid_q0
+        row = r + q // 2 - self.grid_row0
+        if 0 <= col < self.grid_cols and 0 <= row < self.grid_rows:
+            return row * self.grid_cols + col
+        return -1
+
+    def grid_index(self, q: int, r: int) -> Tuple[int, int]:
+        """Indeks (wiersz, kolumna) heksa w tablicach siatki (bez sprawdzania zakresu)."""
+        return (r + q // 2 - self.grid_row0, q - self.grid_q0)
+
+    def hex_coords(self, hex_id: int) -> Tuple[int, int]:
+        """Odwrotność hex_id: zwraca (q, r)."""
+        row, col = divmod(hex_id, self.grid_cols)
+        q = col + self.grid_q0
+        return (q, row + self.grid_row0 - q // 2)
+
+    def key_to_coords(self, key: str) -> Optional[Tuple[int, int]]:
+        """Zamienia klucz "q,r" z pliku mapy na (q, r) bez ponownego parsowania napisu."""
+        coords = self._key_coords.get(key)
+        if coords is None and isinstance(key, str) and ',' in key:
+            try:
+                coords = tuple(map(int, key.split(',')))
+            except ValueError:
+                return None
+        return coords
+
     def get_tile(self, q: int, r: int) -> Optional[Tile]:
-        return self.terrain.get(f"{q},{r}")
+        idx = self.hex_id(q, r)
+        return self._tiles[idx] if idx >= 0 else None
+
+    def step_cost(self, q: int, r: int) -> Optional[int]:
+        """Koszt wejścia na heks (1 + move_mod) lub None, jeśli heks nie istnieje albo jest nieprzejezdny."""
+        idx = self.hex_id(q, r)
+        return self._step_cost[idx] if idx >= 0 else None
+
+    def _vision_stencil(self, radius: int, parity: int):
+        """Szablon dysku heksowego o danym promieniu w układzie siatki offset.
+        Przesunięcie wiersza zależy od parzystości kolumny środka, dlatego szablony są osobne dla q parzystego i nieparzystego.
+        Zwraca (maska bool, przesunięcie wiersza lewego górnego rogu, przesunięcie kolumny)."""
+        key = (radius, parity)
+        stencil = self._vision_stencils.get(key)
+        if stencil is None:
+            offsets = [(dr + (parity + dq) // 2, dq) for dq, dr in hex_disk_offsets(radius)]
+            drows, dcols = np.array(offsets).T
+            row0, col0 = int(drows.min()), int(dcols.min())
+            mask = np.zeros((int(drows.max()) - row0 + 1, int(dcols.max()) - col0 + 1), dtype=bool)
+            mask[drows - row0, dcols - col0] = True
+            stencil = self._vision_stencils[key] = (mask, row0, col0)
+        return stencil
+
+    def vision_window(self, q: int, r: int, radius: int):
+        """Wycinek siatki objęty dyskiem widzenia i odpowiadający mu fragment szablonu.
+        Zwraca ((wycinek wierszy, wycinek kolumn), maska bool) albo None, jeśli dysk leży poza siatką."""
+        stencil, drow, dcol = self._vision_stencil(int(radius), q % 2)
+        row, col = self.grid_index(q, r)
+        top, left = row + drow, col + dcol
+        # Przytnij szablon do granic siatki
+        t, l = max(top, 0), max(left, 0)
+        b = min(top + stencil.shape[0], self.grid_rows)
+        rt = min(left + stencil.shape[1], self.grid_cols)
+        if t >= b or l >= rt:
+            return None
+        return (slice(t, b), slice(l, rt)), stencil[t - top:b - top, l - left:rt - left]
+
+    def vision_mask(self, sources, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Maska widoczności na siatce terenu: suma (OR) dysków widzenia dla trójek (q, r, promień).
+        Zwraca tablicę bool o kształcie siatki, ograniczoną do istniejących heksów."""
+        mask = np.zeros((self.grid_rows, self.grid_cols), dtype=bool) if out is None else out
+        for q, r, radius in sources:
+            if q is None or r is None or radius < 0:
+                continue
+            window = self.vision_window(q, r, radius)
+            if window is not None:
+                mask[window[0]] |= window[1]
+        mask &= self.valid_grid
+        return mask
+
+    def mask_to_hexes(self, mask: np.ndarray) -> set:
+        """Zamienia maskę siatki na zbiór współrzędnych (q, r)."""
+        rows, cols = np.nonzero(mask)
+        return set(zip(self.q_grid[rows, cols].tolist(), self.r_grid[rows, cols].tolist()))
+
+    def vision_hexes(self, q: int, r: int, radius: int) -> set:
+        """Heksy mapy w odległości <= radius od (q, r)."""
+        return self.mask_to_hexes(self.vision_mask([(q, r, radius)]))
+
+    def remove_key_point(self, key: str):
+        """Usuwa wyczerpany punkt kluczowy z mapy i z siatki flag."""
+        self.key_points.pop(key, None)
+        coords = self._key_coords.get(key)
+        if coords:
+            self.key_point_grid[self.grid_index(*coords)] = False
+
+    def set_key_points(self, key_points: Dict):
+        """Zastępuje punkty kluczowe mapy (np. przy odtwarzaniu dziennika gry) i przebudowuje siatkę flag."""
+        self.key_points = dict(key_points)
+        self.key_point_grid[:] = False
+        for key in self.key_points:
+            coords = self._key_coords.get(key)
+            if coords:
+                self.key_point_grid[self.grid_index(*coords)] = True
+
+    def clone(self) -> 'Board':
+        """Plansza dla kopii silnika (GameEngine.clone): teren, siatki i szablony widzenia są współdzielone
+        (tylko do odczytu), kopiowane są jedynie punkty kluczowe. Indeks zajętości, obserwatorzy
+        i pamięć pól osiągalności są nowe i puste."""
+        board = copy.copy(self)
+        board.key_points = dict(self.key_points)
+        board.key_point_grid = self.key_point_grid.copy()
+        board.visibility = None
+        board.observers = []
+        board.registry = None
+        board._reach_cache = {}
+        board._reach_cache_version = None
+        board._tokens_by_id = {}
+        board.set_tokens([])
+        return board
 
     def set_tokens(self, tokens: List):
-        """Przypisz listę żetonów do planszy (do obsługi kolizji, pathfindingu itp.).
-        UWAGA: Jeśli zmieniasz pozycje żetonów ręcznie (np. w testach), wywołaj ponownie set_tokens po zmianie!"""
+        """Przypisz listę żetonów do planszy i zbuduj od zera indeks zajętości pól.
+        Żetony zostają podpięte do planszy, więc późniejsze zmiany pozycji (set_position,
+        przypisanie q/r) oraz właściciela aktualizują indeks automatycznie."""
+        for token in getattr(self, '_tokens_by_id', {}).values():
+            if getattr(token, '_board', None) is self:
+                token._board = None
         self.tokens = tokens
+        self._tokens_by_id = {}
+        self._hex_tokens = {}
+        self.occupancy_version = getattr(self, 'occupancy_version', 0) + 1
+        # Skrót Zobrista stanu podpiętych żetonów (engine.zobrist), aktualizowany przyrostowo przy każdej zmianie
+        self.state_hash = 0
+        for token in tokens:
+            self._attach(token)
+        self._notify('tokens_reset')
+
+    def add_token(self, token):
+        """Dodaje pojedynczy żeton do indeksu zajętości (np. po wystawieniu nowej jednostki)."""
+        if self._tokens_by_id.get(token.id) is token:
+            return
+        self._attach(token)
+        self.occupancy_version += 1
+        self._notify('token_added', token)
+
+    def remove_token(self, token):
+        """Usuwa żeton z indeksu zajętości (np. po eliminacji w walce). Nie modyfikuje listy żetonów silnika."""
+        if self._tokens_by_id.get(token.id) is not token:
+            return
+        del self._tokens_by_id[token.id]
+        self._unindex(token, token.q, token.r)
+        self.state_hash ^= token_hash(token)
+        if getattr(token, '_board', None) is self:
+            token._board = None
+        self.occupancy_version += 1
+        self._notify('token_removed', token)
+
+    def _notify(self, event, *args):
+        """Przekazuje zdarzenie zmiany żetonów do śledzenia widoczności i pozostałych obserwatorów."""
+        if self.visibility is not None:
+            getattr(self.visibility, event)(*args)
+        for observer in self.observers:
+            getattr(observer, event)(*args)
+
+    def _attach(self, token):
+        previous = self._tokens_by_id.get(token.id)
+        if previous is not None and previous is not token:
+            self.remove_token(previous)
+        self._tokens_by_id[token.id] = token
+        token._board = self
+        self._index(token, token.q, token.r)
+        self.state_hash ^= token_hash(token)
+
+    def _index(self, token, q, r):
+        if q is None or r is None:
+            return
+        pos = (q, r)
+        self._hex_tokens.setdefault(pos, set()).add(token.id)
+
+    def _unindex(self, token, q, r):
+        if q is None or r is None:
+            return
+        pos = (q, r)
+        ids = self._hex_tokens.get(pos)
+        if ids is not None:
+            ids.discard(token.id)
+            if not ids:
+                del self._hex_tokens[pos]
+
+    def _on_token_moved(self, token, old_q, old_r):
+        """Wywoływane przez Token przy zmianie pozycji."""
+        self._unindex(token, old_q, old_r)
+        self._index(token, token.q, token.r)
+        self.state_hash ^= zobrist_key(token.id, 'pos', old_q, old_r) ^ zobrist_key(token.id, 'pos', token.q, token.r)
+        self.occupancy_version += 1
+        self._notify('token_changed', token)
+
+    def _on_token_owner_changed(self, token, old_owner):
+        """Wywoływane przez Token przy zmianie właściciela. Indeks pól się nie zmienia; kubełki
+        właściciela i nacji prowadzi rejestr żetonów (TokenRegistry)."""
+        self.state_hash ^= zobrist_key(token.id, 'owner', old_owner) ^ zobrist_key(token.id, 'owner', token.owner)
+        self.occupancy_version += 1
+        if self.registry is not None:
+            self.registry.token_owner_changed(token, old_owner)
+        self._notify('token_changed', token)
+
+    def _on_token_field_changed(self, token, name, old, new):
+        """Wywoływane przez Token przy zmianie pola z HASHED_FIELDS (punkty ruchu, paliwo, zasoby, tryb).
+        Nie zmienia zajętości pól, więc aktualizuje tylko skrót stanu."""
+        self.state_hash ^= zobrist_key(token.id, name, old) ^ zobrist_key(token.id, name, new)
+
+    def get_token(self, token_id: str):
+        """Zwraca żeton o podanym id z indeksu planszy (lub None)."""
+        return self._tokens_by_id.get(token_id)
+
+    def token_ids_at(self, q: int, r: int) -> set:
+        """Zwraca zbiór id żetonów stojących na heksie (pusty zbiór, jeśli pole jest wolne)."""
+        return self._hex_tokens.get((q, r), set())
+
+    def tokens_at(self, q: int, r: int, nation: Optional[str] = None, owner: Optional[str] = None) -> List:
+        """Zwraca żetony na heksie, opcjonalnie tylko danej nacji lub danego właściciela."""
+        tokens = [self._tokens_by_id[tid] for tid in self.token_ids_at(q, r)]
+        if owner is not None:
+            return [t for t in tokens if t.owner == owner]
+        if nation is not None:
+            return [t for t in tokens if token_nation(t) == nation]
+        return tokens
+
+    def _positions(self, tokens) -> Dict[Tuple[int, int], set]:
+        positions = {}
+        for token in tokens:
+            if token.q is not None and token.r is not None and self._tokens_by_id.get(token.id) is token:
+                positions.setdefault((token.q, token.r), set()).add(token.id)
+        return positions
+
+    def nation_positions(self, nation: str) -> Dict[Tuple[int, int], set]:
+        """Zwraca mapę heks -> id żetonów danej nacji (z kubełka nacji rejestru, gdy jest podpięty)."""
+        if self.registry is not None:
+            return self._positions(self.registry.by_nation(nation))
+        return self._positions(t for t in self._tokens_by_id.values() if token_nation(t) == nation)
+
+    def owner_positions(self, owner: str) -> Dict[Tuple[int, int], set]:
+        """Zwraca mapę heks -> id żetonów danego właściciela (z kubełka właściciela rejestru, gdy jest podpięty)."""
+        if self.registry is not None:
+            return self._positions(self.registry.by_owner(owner))
+        return self._positions(t for t in self._tokens_by_id.values() if t.owner == owner)
 
     def is_occupied(self, q: int, r: int, visible_tokens: Optional[set] = None) -> bool:
         """Sprawdza, czy pole jest zajęte przez żeton. Jeśli podano visible_tokens, sprawdza tylko żetony widoczne."""
+        ids = self._hex_tokens.get((q, r))
+        if not ids:
+            return False
         if visible_tokens is not None:
-            return any(t.q == q and t.r == r and t.id in visible_tokens for t in getattr(self, 'tokens', []))
-        return any(t.q == q and t.r == r for t in getattr(self, 'tokens', []))
+            return any(tid in visible_tokens for tid in ids)
+        return True
 
     def neighbors(self, q: int, r: int) -> List[Tuple[int, int]]:
         """Zwraca listę sąsiadów heksa (axial)."""
@@ -117,14 +474,11 @@ class Board:
                 best_h = h_curr
                 best_node = current
             for neighbor in self.neighbors(*current):
-                tile = self.get_tile(*neighbor)
-                if not tile:
+                move_cost = self.step_cost(*neighbor)
+                if move_cost is None:
                     continue
                 if self.is_occupied(*neighbor, visible_tokens=visible_tokens):
                     continue
-                if tile.move_mod == -1:
-                    continue
-                move_cost = 1 + tile.move_mod
                 new_mp = cost_so_far[current][0] + move_cost
                 new_fuel = cost_so_far[current][1] + move_cost
                 if new_mp > max_mp or new_fuel > max_fuel:
@@ -145,6 +499,45 @@ class Board:
             return path[::-1]
         return None
 
+    def reachable(self, start: Tuple[int, int], max_mp: int = 99, max_fuel: int = 99, visible_tokens: Optional[set] = None) -> ReachabilityField:
+        """Dijkstra: wszystkie heksy osiągalne z pola startowego za dane MP i paliwo (jeden przebieg).
+        Reguły jak w find_path: koszt wejścia 1 + move_mod, pola nieprzejezdne i zajęte (przez widoczne żetony) są pomijane.
+        Wynik jest zapamiętywany do najbliższej zmiany zajętości pól, więc kolejne zapytania o ten sam żeton są darmowe."""
+        start = tuple(start)
+        # Ruch zużywa tyle samo MP co paliwa, więc ogranicza mniejszy z zapasów
+        budget = min(max_mp, max_fuel)
+        key = (start, budget, frozenset(visible_tokens) if visible_tokens is not None else None)
+        if getattr(self, '_reach_cache_version', None) != self.occupancy_version:
+            self._reach_cache = {}
+            self._reach_cache_version = self.occupancy_version
+        field = self._reach_cache.get(key)
+        if field is None:
+            field = self._reach_cache[key] = self._dijkstra(start, budget, visible_tokens)
+        return field
+
+    def _dijkstra(self, start: Tuple[int, int], budget: int, visible_tokens: Optional[set]) -> ReachabilityField:
+        import heapq
+        cost = {start: 0}
+        came_from = {}
+        open_set = [(0, start)]
+        while open_set:
+            current_cost, current = heapq.heappop(open_set)
+            if current_cost > cost[current]:
+                continue
+            for neighbor in self.neighbors(*current):
+                move_cost = self.step_cost(*neighbor)
+                if move_cost is None:
+                    continue
+                new_cost = current_cost + move_cost
+                if new_cost > budget or new_cost >= cost.get(neighbor, budget + 1):
+                    continue
+                if self.is_occupied(*neighbor, visible_tokens=visible_tokens):
+                    continue
+                cost[neighbor] = new_cost
+                came_from[neighbor] = current
+                heapq.heappush(open_set, (new_cost, neighbor))
+        return ReachabilityField(self, start, cost, came_from)
+
     def hex_distance(self, a: Tuple[int, int], b: Tuple[int, int]) -> int:
         """Dystans heksowy (axial)."""
         aq, ar = a
@@ -152,20 +545,22 @@ class Board:
         return int((abs(aq - bq) + abs(aq + ar - bq - br) + abs(ar - br)) / 2)
 
     def coords_to_hex(self, x, y):
-        # Nowa wersja: iteruj po wszystkich kluczach terrain (q,r mogą być ujemne)
-        for hex_id in self.terrain:
-            q, r = map(int, hex_id.split(","))
+        # Kandydat z odwrotnego przekształcenia hex_to_pixel, potem dokładny test wielokąta dla niego i sąsiadów
+        s = self.hex_size
+        guess = self.pixel_to_hex(x - s, y - s * (3**0.5) / 2)
+        for q, r in [guess] + self.neighbors(*guess):
+            if self.get_tile(q, r) is None:
+                continue
             cx, cy = self.hex_to_pixel(q, r)
-            verts = get_hex_vertices(cx, cy, self.hex_size)
+            verts = get_hex_vertices(cx, cy, s)
             if point_in_polygon(x, y, verts):
                 return q, r
         return None
 
     def get_overlay_items(self):
         items = []
-        for key, tile in self.terrain.items():
-            q, r = map(int, key.split(","))
-            cx, cy = self.hex_to_pixel(q, r)
+        for tile in self.terrain.values():
+            cx, cy = self.hex_to_pixel(tile.q, tile.r)
             verts = get_hex_vertices(cx, cy, self.hex_size)
             if tile.spawn_nation:
                 txt = f"spawn{tile.spawn_nation.lower()}"
@@ -0,0 +1,134 @@
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from engine.hex_utils import get_neighbors
+
+# Rozrzut wyniku walki: wartość ataku/obrony mnożona przez U(0.8, 1.2) i zaokrąglana
+ROLL_MIN = 0.8
+ROLL_MAX = 1.2
+# Szansa, że obrońca zredukowany do zera próbuje się cofnąć zamiast zginąć
+RETREAT_CHANCE = 0.5
+
+
+@dataclass(frozen=True)
+class CombatInputs:
+    """Liczby, od których zależy wynik CombatAction (po uwzględnieniu trybu ruchu i terenu)."""
+    attack_value: int
+    defense_total: int
+    attacker_strength: int
+    defender_strength: int
+    counterattack: bool
+    can_retreat: bool
+    distance: int
+    attack_range: int
+
+
+@dataclass(frozen=True)
+class CombatOdds:
+    """Rozkład wyniku walki: straty obu stron oraz prawdopodobieństwa eliminacji i odwrotu obrońcy."""
+    defender_loss: Dict[int, float]
+    attacker_loss: Dict[int, float]
+    defender_destroyed: float
+    defender_retreats: float
+    attacker_destroyed: float
+
+    @property
+    def expected_defender_loss(self) -> float:
+        return sum(k * p for k, p in self.defender_loss.items())
+
+    @property
+    def expected_attacker_loss(self) -> float:
+        return sum(k * p for k, p in self.attacker_loss.items())
+
+    def summary(self) -> str:
+        return (f"Straty obrońcy: ~{self.expected_defender_loss:.1f}, atakującego: ~{self.expected_attacker_loss:.1f}\n"
+                f"Zniszczenie obrońcy: {self.defender_destroyed:.0%}, odwrót obrońcy: {self.defender_retreats:.0%}\n"
+                f"Zniszczenie atakującego: {self.attacker_destroyed:.0%}")
+
+
+def find_retreat_hex(board, attacker, defender) -> Optional[Tuple[int, int]]:
+    """Pierwsze wolne sąsiednie pole obrońcy, które oddala go od atakującego (None, gdy brak)."""
+    start_dist = board.hex_distance((attacker.q, attacker.r), (defender.q, defender.r))
+    for nq, nr in get_neighbors(defender.q, defender.r):
+        if not board.get_tile(nq, nr):
+            continue
+        if board.is_occupied(nq, nr):
+            continue
+        if board.hex_distance((attacker.q, attacker.r), (nq, nr)) > start_dist:
+            return (nq, nr)
+    return None
+
+
+def combat_inputs(board, attacker, defender) -> CombatInputs:
+    """Zbiera wartości walki tak samo jak CombatAction.execute."""
+    attack_range = attacker.stats.get('attack', {}).get('range', 1)
+    defense_range = defender.stats.get('attack', {}).get('range', 1)
+    dist = board.hex_distance((attacker.q, attacker.r), (defender.q, defender.r))
+    # Użyj aktualnej wartości obrony (zmienianej przez tryb ruchu), jeśli istnieje
+    defense_val = getattr(defender, 'defense_value', defender.stats.get('defense_value', 0))
+    tile = board.get_tile(defender.q, defender.r)
+    defense_mod = tile.defense_mod if tile else 0
+    return CombatInputs(
+        attack_value=attacker.stats.get('attack', {}).get('value', 0),
+        defense_total=defense_val + defense_mod,
+        attacker_strength=getattr(attacker, 'combat_value', 0),
+        defender_strength=getattr(defender, 'combat_value', 0),
+        counterattack=dist <= defense_range,
+        can_retreat=find_retreat_hex(board, attacker, defender) is not None,
+        distance=dist,
+        attack_range=attack_range,
+    )
+
+
+@lru_cache(maxsize=None)
+def rounded_roll_distribution(value: float) -> Tuple[Tuple[int, float], ...]:
+    """Dokładny rozkład round(value * U(ROLL_MIN, ROLL_MAX)) jako pary (wynik, prawdopodobieństwo)."""
+    lo, hi = sorted((value * ROLL_MIN, value * ROLL_MAX))
+    if hi - lo <= 0:
+        return ((int(round(value)), 1.0),)
+    result = []
+    for k in range(int(math.floor(lo + 0.5)), int(math.floor(hi + 0.5)) + 1):
+        overlap = min(hi, k + 0.5) - max(lo, k - 0.5)
+        if overlap > 0:
+            result.append((k, overlap / (hi - lo)))
+    return tuple(result)
+
+
+@lru_cache(maxsize=65536)
+def _odds(attack_value, defense_total, attacker_strength, defender_strength, counterattack, can_retreat) -> CombatOdds:
+    defender_loss = dict(rounded_roll_distribution(attack_value))
+    attacker_loss = dict(rounded_roll_distribution(defense_total)) if counterattack else {0: 1.0}
+    p_zero = sum(p for loss, p in defender_loss.items() if defender_strength - loss <= 0)
+    retreats = p_zero * RETREAT_CHANCE if can_retreat else 0.0
+    return CombatOdds(
+        defender_loss=defender_loss,
+        attacker_loss=attacker_loss,
+        defender_destroyed=p_zero - retreats,
+        defender_retreats=retreats,
+        attacker_destroyed=sum(p for loss, p in attacker_loss.items() if attacker_strength - loss <= 0),
+    )
+
+
+class CombatPredictor:
+    """Podgląd szans walki dla pary atakujący/obrońca. Rozkład liczony jest analitycznie
+    (zaokrąglony rozkład jednostajny rzutu, niezależne strony) i zapamiętywany według wartości
+    wejściowych, więc GUI i AI mogą pytać o tysiące par na turę."""
+
+    def __init__(self, board):
+        self.board = board
+
+    def inputs(self, attacker, defender) -> CombatInputs:
+        return combat_inputs(self.board, attacker, defender)
+
+    def predict(self, attacker, defender) -> Optional[CombatOdds]:
+        """Rozkład wyniku ataku albo None, gdy obrońca jest poza zasięgiem ataku."""
+        inputs = self.inputs(attacker, defender)
+        if inputs.distance > inputs.attack_range:
+            return None
+        return self.odds(inputs)
+
+    @staticmethod
+    def odds(inputs: CombatInputs) -> CombatOdds:
+        return _odds(inputs.attack_value, inputs.defense_total, inputs.attacker_strength,
+                     inputs.defender_strength, inputs.counterattack, inputs.can_retreat)
@@ -1,54 +1,197 @@
-import random
 import os
 import json
 from engine.board import Board
-from engine.token import load_tokens, Token
+from engine.token import load_tokens, Token, faction_id, is_owned_by
+from engine.visibility import VisibilityTracker
+from engine.reaction import ReactionResolver
+from engine.combat import CombatPredictor
+from engine.token_registry import TokenRegistry
+from engine.rng import RandomStreams
+from engine.batch import ActionTransaction, BatchResult
+from engine.legal import LegalActionGenerator, LegalActions
+from engine.snapshot import EngineSnapshot, clone_player, restore_snapshot, take_snapshot
+from engine.zobrist import key_point_hash, turn_hash
+from engine.journal import action_info, action_kind
+from engine.autosave import AUTOSAVE_DIR, AutoSaver, capture_state, load_autosave
+from engine.save_manager import players_from_state
 
 class GameEngine:
-    def __init__(self, map_path: str, tokens_index_path: str, tokens_start_path: str, seed: int = 42, read_only: bool = False):
-        self.random = random.Random(seed)
+    def __init__(self, map_path: str, tokens_index_path: str, tokens_start_path: str, seed: int = 42, read_only: bool = False,
+                 autoload: bool = False):
+        # Nazwane strumienie losowości (walka, ekonomia, pogoda...) wyprowadzone z jednego seeda
+        self.rng = RandomStreams(seed)
+        self.random = self.rng.stream('engine')
         self.board = Board(map_path)
+        # Rejestr żetonów: indeks id/właściciel/nacja, zmiany przenoszone do indeksu planszy
+        self.registry = TokenRegistry()
+        self.registry.subscribe(self._on_registry_event)
+        self.board.registry = self.registry
+        # Ogień reakcyjny wrogów po ruchu (mapa zagrożeń aktualizowana razem z indeksem planszy)
+        self.reactions = ReactionResolver(self.board)
+        # Podgląd szans walki (GUI, AI)
+        self.combat_predictor = CombatPredictor(self.board)
+        # Generator dozwolonych akcji gracza (AI, podpowiedzi GUI, symulacje)
+        self.legal = LegalActionGenerator(self)
         self.read_only = read_only  # Dodana flaga tylko do odczytu
+        # Słuchacze zmian stanu (subscribe) i otwarta transakcja execute_batch
+        self._listeners = []
+        self._transaction = None
+        # Dziennik zdarzeń gry (engine.journal.ActionJournal), podpinany przez ActionJournal(ścieżka, silnik)
+        self.journal = None
+        # Zapis automatyczny w tle (engine.autosave.AutoSaver), tworzony przy pierwszym end_turn
+        self.autosave = None
+        self._init_key_points_state()
+        self.tokens = load_tokens(tokens_index_path, tokens_start_path)
+        self.turn = 1
+        self.current_player = 0
+        # autoload=True: wznowienie przerwanej gry z zapisu automatycznego (saves/autosave) albo ze starego
+        # saves/latest.json; domyślnie zawsze nowa gra (starsze wersje wczytywały saves/latest.json same,
+        # miejsca, które tego potrzebują, podają autoload=True albo wołają resume())
+        if autoload:
+            self.resume()
+
+    def resume(self) -> bool:
+        """Wczytuje najnowszy stan z zapisu automatycznego (albo ze starego saves/latest.json).
+        Zwraca False, gdy nie ma czego wznowić."""
+        autosaved = load_autosave(AUTOSAVE_DIR)
+        if autosaved is not None:
+            self.apply_state(autosaved)
+            return True
         state_path = os.path.join("saves", "latest.json")
         if os.path.exists(state_path):
             self.load_state(state_path)
-        else:
-            self.tokens = load_tokens(tokens_index_path, tokens_start_path)
-            self.board.set_tokens(self.tokens)
-            self.turn = 1
-            self.current_player = 0
-        self._init_key_points_state()
+            return True
+        return False
+
+    @property
+    def tokens(self) -> TokenRegistry:
+        """Żetony gry (TokenRegistry). Przypisanie listy zastępuje zawartość rejestru i indeks planszy."""
+        return self.registry
+
+    @tokens.setter
+    def tokens(self, tokens):
+        self.registry.reset(tokens)
+
+    def _on_registry_event(self, event, token):
+        if event == 'reset':
+            self.board.set_tokens(self.registry)
+        elif event == 'added':
+            self.board.add_token(token)
+        elif event == 'removed':
+            self.board.remove_token(token)
 
     def _init_key_points_state(self):
         """Tworzy słownik: hex_id -> {'initial_value': X, 'current_value': Y, 'type': ...} na podstawie mapy."""
-        self.key_points_state = {}
+        key_points_state = {}
         if hasattr(self.board, 'key_points'):
             for hex_id, kp in self.board.key_points.items():
-                self.key_points_state[hex_id] = {
+                key_points_state[hex_id] = {
                     'initial_value': kp['value'],
                     'current_value': kp['value'],
                     'type': kp.get('type', None)
                 }
+        self.key_points_state = key_points_state
+
+    @property
+    def key_points_state(self) -> dict:
+        """Stan punktów kluczowych. Przypisanie słownika przelicza ich część skrótu stanu; wartości
+        w trakcie gry zmienia process_key_points (przez _set_key_point_value/_drop_key_point)."""
+        return self._key_points_state
+
+    @key_points_state.setter
+    def key_points_state(self, value):
+        self._key_points_state = value
+        self._key_points_hash = 0
+        for hex_id, kp in value.items():
+            self._key_points_hash ^= key_point_hash(hex_id, kp)
+
+    def _set_key_point_value(self, hex_id, kp, value):
+        self._key_points_hash ^= key_point_hash(hex_id, kp)
+        kp['current_value'] = value
+        self._key_points_hash ^= key_point_hash(hex_id, kp)
+
+    def _drop_key_point(self, hex_id):
+        kp = self._key_points_state.pop(hex_id, None)
+        if kp is not None:
+            self._key_points_hash ^= key_point_hash(hex_id, kp)
+
+    @property
+    def state_hash(self) -> int:
+        """64-bitowy skrót Zobrista stanu gry: pozycje, właściciele, punkty ruchu, paliwo, zasoby bojowe
+        i tryb ruchu żetonów, wartości punktów kluczowych, tura i bieżący gracz. Utrzymywany przyrostowo
+        (O(1) na zmianę), więc nadaje się do tablic transpozycji AI, szybkiego sprawdzenia "czy coś się
+        zmieniło" i porównania replik; engine.zobrist.full_state_hash liczy go od zera do weryfikacji."""
+        player = getattr(self, 'current_player_obj', None)
+        return (self.board.state_hash ^ self._key_points_hash
+                ^ turn_hash(self.turn, self.current_player, getattr(player, 'id', None)))
 
     def save_state(self, filepath: str):
+        """Zapis stanu (capture_state: żetony, gracze, punkty kluczowe, tura, RNG) do pliku JSON."""
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        state = {
-            "tokens": [t.serialize() for t in self.tokens],
-            "turn": self.turn,
-            "current_player": self.current_player
-        }
+        state = capture_state(self)
         tmp_file = filepath + ".tmp"
         with open(tmp_file, "w", encoding="utf-8") as f:
             json.dump(state, f, indent=2, ensure_ascii=False)
         os.replace(tmp_file, filepath)
 
+    def snapshot(self) -> EngineSnapshot:
+        """Migawka stanu gry w pamięci (bez serializacji): do cofania ruchu i analizy "co jeśli"."""
+        return take_snapshot(self)
+
+    def restore(self, snapshot: EngineSnapshot):
+        """Przywraca stan z migawki tego samego silnika (żetony, gracze, punkty kluczowe, tura, RNG)."""
+        restore_snapshot(self, snapshot)
+        self.record('restore')
+
+    def clone(self) -> 'GameEngine':
+        """Niezależna kopia silnika (np. dla przeszukiwania AI). Teren, siatki planszy i słowniki statystyk
+        jednostek są współdzielone, kopiowane są tylko zmienne pola żetonów, stan graczy, punkty kluczowe i RNG."""
+        twin = GameEngine.__new__(GameEngine)
+        twin.__dict__.update(self.__dict__)
+        twin.board = self.board.clone()
+        twin.registry = TokenRegistry()
+        twin.registry.subscribe(twin._on_registry_event)
+        twin.board.registry = twin.registry
+        twin.reactions = ReactionResolver(twin.board)
+        twin.combat_predictor = CombatPredictor(twin.board)
+        twin.legal = LegalActionGenerator(twin)
+        twin._listeners = []
+        twin._transaction = None
+        twin.journal = None
+        twin.autosave = None
+        twin.rng = self.rng.copy()
+        twin.random = twin.rng.stream('engine')
+        twin.key_points_state = {k: dict(v) for k, v in getattr(self, 'key_points_state', {}).items()}
+        if hasattr(self, 'players'):
+            players = {id(p): clone_player(p) for p in self.players}
+            twin.players = [players[id(p)] for p in self.players]
+            if getattr(self, 'current_player_obj', None) is not None:
+                twin.current_player_obj = players.get(id(self.current_player_obj), self.current_player_obj)
+        twin.tokens = [t.clone() for t in self.tokens]
+        return twin
+
     def load_state(self, filepath: str):
         with open(filepath, "r", encoding="utf-8") as f:
             state = json.load(f)
+        self.apply_state(state)
+
+    def apply_state(self, state: dict):
+        """Ustawia stan w formacie save_state (żetony, gracze, punkty kluczowe, tura, bieżący gracz, RNG).
+        Sekcje nieobecne w starszych zapisach (gracze, punkty kluczowe) zostają bez zmian."""
         self.tokens = [Token.from_dict(t) for t in state["tokens"]]
-        self.board.set_tokens(self.tokens)
+        if "players" in state:
+            self.players = players_from_state(state["players"])
+            current = getattr(self, 'current_player_obj', None)
+            if current is not None:
+                self.current_player_obj = next((p for p in self.players if p.id == current.id), None)
+        if "key_points" in state:
+            self.board.set_key_points(state["key_points"])
+        if "key_points_state" in state:
+            self.key_points_state = {k: dict(v) for k, v in state["key_points_state"].items()}
         self.turn = state["turn"]
         self.current_player = state["current_player"]
+        if "rng" in state:
+            self.rng.setstate(state["rng"])
 
     def next_turn(self):
         self.turn += 1
@@ -76,10 +219,14 @@ class GameEngine:
                 update_all_players_visibility(self.players, self.tokens, self.board)
             except Exception:
                 pass
+        self.record('turn', turn=self.turn)
 
     def end_turn(self):
+        """Następna tura i zapis automatyczny w tle (na tym wątku tylko kopia stanu w pamięci)."""
         self.next_turn()
-        self.save_state(os.path.join("saves", "latest.json"))
+        if self.autosave is None:
+            AutoSaver(AUTOSAVE_DIR, self)
+        self.autosave.request(self)
 
     def get_player_count(self):
         # Zaimplementuj zgodnie z logiką graczy
@@ -98,12 +245,76 @@ class GameEngine:
     def execute_action(self, action, player=None):
         """Rejestruje i wykonuje akcję (np. ruch, walka). Weryfikuje właściciela żetonu."""
         # Sprawdzenie właściciela żetonu
-        token = next((t for t in self.tokens if t.id == getattr(action, 'token_id', None)), None)
+        token = self.registry.get(getattr(action, 'token_id', None))
         if player and token:
-            expected_owner = f"{player.id} ({player.nation})"
-            if token.owner != expected_owner:
+            if not is_owned_by(token, player):
                 return False, "Ten żeton nie należy do twojego dowódcy."
-        return action.execute(self)
+        if self._transaction is not None:
+            self._transaction.touch_action(action)
+        success, msg = action.execute(self)
+        if self.journal is not None:
+            self.record(action_kind(action), ok=success, **action_info(action))
+        return success, msg
+
+    def record(self, event, **info):
+        """Dopisuje zdarzenie i zmiany stanu od poprzedniego wpisu do dziennika gry (jeśli podpięty).
+        W trakcie execute_batch wpisy czekają na koniec paczki (jeden wpis 'batch')."""
+        if self.journal is not None and self._transaction is None:
+            self.journal.record(event, **info)
+
+    def legal_actions(self, player) -> LegalActions:
+        """Dozwolone ruchy, ataki, zmiany trybu i uzupełnienia żetonów gracza (zapamiętywane do zmiany stanu)."""
+        return self.legal.legal_actions(player)
+
+    def subscribe(self, listener):
+        """Rejestruje słuchacza zmian stanu: listener(zdarzenie, dane), np. ('batch', BatchResult)."""
+        self._listeners.append(listener)
+
+    def _emit(self, event, data):
+        for listener in self._listeners:
+            listener(event, data)
+
+    def execute_batch(self, actions, player=None, reaction_fire: bool = True) -> BatchResult:
+        """Wykonuje listę akcji (ruch, walka, uzupełnienie) jako jedną transakcję: pierwsza nieudana
+        akcja cofa całą paczkę. Po ruchach rozstrzygany jest ogień reakcyjny wrogów (reaction_fire).
+        Widoczność graczy jest uzgadniana raz, na końcu, a słuchacze dostają jedno zdarzenie 'batch'."""
+        if self._transaction is not None:
+            raise RuntimeError("execute_batch nie może być zagnieżdżone")
+        from engine.action import MoveAction
+        transaction = self._transaction = ActionTransaction(self)
+        result = BatchResult(success=True)
+        try:
+            for index, action in enumerate(actions):
+                success, msg = self.execute_action(action, player=player)
+                result.messages.append(msg)
+                if not success:
+                    result.success = False
+                    result.failed_index = index
+                    break
+                token = self.registry.get(action.token_id)
+                if reaction_fire and isinstance(action, MoveAction) and token is not None:
+                    for enemy, success2, msg2 in self.resolve_reaction_fire(token):
+                        result.reactions.append((enemy, token, success2, msg2))
+        except Exception:
+            transaction.rollback()
+            raise
+        finally:
+            self._transaction = None
+        if not result.success:
+            transaction.rollback()
+            self.record('batch', ok=False, actions=[dict(action_info(a), kind=action_kind(a)) for a in actions])
+            return result
+        result.dirty_tokens, result.dirty_hexes = transaction.dirty()
+        if getattr(self, 'players', None):
+            update_all_players_visibility(self.players, self.tokens, self.board)
+        self.record('batch', ok=True, actions=[dict(action_info(a), kind=action_kind(a)) for a in actions])
+        self._emit('batch', result)
+        return result
+
+    def resolve_reaction_fire(self, moved_token):
+        """Ataki reakcyjne wrogów, którzy widzą i mają w zasięgu żeton po jego ruchu.
+        Zwraca listę (atakujący, sukces, komunikat); działa także bez GUI."""
+        return self.reactions.resolve(self, moved_token)
 
     def get_visible_tokens(self, player):
         """Zwraca listę żetonów widocznych dla danego gracza (elastyczne filtrowanie)."""
@@ -114,7 +325,6 @@ class GameEngine:
         player_id = getattr(player, 'id', None)
         for token in self.tokens:
             token_nation = str(token.stats.get('nation', '')).strip().lower()
-            token_owner = str(token.owner).strip()
             # 1. Mgła wojny i pole 'visible_for' (jeśli istnieje)
             if 'visible_for' in token.stats:
                 if player_id in token.stats['visible_for']:
@@ -124,23 +334,21 @@ class GameEngine:
             if player_role == 'generał' and token_nation == player_nation:
                 visible.append(token)
             # 3. Dowódca widzi tylko swoje żetony
-            elif player_role == 'dowódca' and token_owner == f"{player_id} ({player_nation_orig})":
+            elif player_role == 'dowódca' and is_owned_by(token, player):
                 visible.append(token)
         return visible
 
     def _process_key_points(self, players):
         """Przetwarza punkty kluczowe: rozdziela punkty ekonomiczne, aktualizuje stan punktów, usuwa wyzerowane."""
-        # Mapowanie nacji -> generał
-        generals = {p.nation: p for p in players if getattr(p, 'role', '').lower() == 'generał'}
-        tokens_by_pos = {(t.q, t.r): t for t in self.tokens}
+        # Mapowanie frakcji -> generał
+        generals = {faction_id(p.nation): p for p in players if getattr(p, 'role', '').lower() == 'generał'}
         to_remove = []
         for hex_id, kp in self.key_points_state.items():
-            q, r = map(int, hex_id.split(","))
-            token = tokens_by_pos.get((q, r))
+            q, r = self.board.key_to_coords(hex_id)
+            on_hex = self.board.tokens_at(q, r)
+            token = on_hex[0] if on_hex else None
             if token and hasattr(token, 'owner') and token.owner:
-                # Wyciągnij nację z ownera (np. "2 (Polska)")
-                nation = token.owner.split("(")[-1].replace(")", "").strip()
-                general = generals.get(nation)
+                general = generals.get(token.faction)
                 if general and hasattr(general, 'economy'):
                     give = int(0.1 * kp['initial_value'])
                     if give < 1:
@@ -150,15 +358,16 @@ class GameEngine:
                     if give > kp['current_value']:
                         give = kp['current_value']
                     general.economy.economic_points += give
-                    kp['current_value'] -= give
+                    self._set_key_point_value(hex_id, kp, kp['current_value'] - give)
                     if kp['current_value'] <= 0:
                         to_remove.append(hex_id)
         # Usuń wyzerowane punkty z key_points_state i z planszy
         for hex_id in to_remove:
-            self.key_points_state.pop(hex_id, None)
+            self._drop_key_point(hex_id)
             if hasattr(self.board, 'key_points'):
-                self.board.key_points.pop(hex_id, None)        # (Opcjonalnie) zapisz do pliku mapy aktualny stan key_points
+                self.board.remove_key_point(hex_id)        # (Opcjonalnie) zapisz do pliku mapy aktualny stan key_points
         self._save_key_points_to_map()
+        self.record('key_points')
 
     def _save_key_points_to_map(self):
         """Zapisuje aktualny stan key_points do pliku mapy (data/map_data.json)."""
@@ -177,18 +386,17 @@ class GameEngine:
 
     def process_key_points(self, players):
         """Przetwarza punkty kluczowe: rozdziela punkty ekonomiczne, aktualizuje stan punktów, usuwa wyzerowane."""
-        generals = {p.nation: p for p in players if getattr(p, 'role', '').lower() == 'generał'}
-        tokens_by_pos = {(t.q, t.r): t for t in self.tokens}
+        generals = {faction_id(p.nation): p for p in players if getattr(p, 'role', '').lower() == 'generał'}
         to_remove = []
         # Debug: zbierz sumy dla każdego generała
         debug_points_per_general = {}
         debug_details_per_general = {}
         for hex_id, kp in self.key_points_state.items():
-            q, r = map(int, hex_id.split(","))
-            token = tokens_by_pos.get((q, r))
+            q, r = self.board.key_to_coords(hex_id)
+            on_hex = self.board.tokens_at(q, r)
+            token = on_hex[0] if on_hex else None
             if token and hasattr(token, 'owner') and token.owner:
-                nation = token.owner.split("(")[-1].replace(")", "").strip()
-                general = generals.get(nation)
+                general = generals.get(token.faction)
                 if general and hasattr(general, 'economy'):
                     give = int(0.1 * kp['initial_value'])
                     if give < 1:
@@ -198,7 +406,7 @@ class GameEngine:
                     if give > kp['current_value']:
                         give = kp['current_value']
                     general.economy.economic_points += give
-                    kp['current_value'] -= give
+                    self._set_key_point_value(hex_id, kp, kp['current_value'] - give)
                     # Debug: zapisz szczegóły
                     debug_points_per_general.setdefault(general, 0)
                     debug_points_per_general[general] += give
@@ -207,10 +415,11 @@ class GameEngine:
                         to_remove.append(hex_id)
         # Usuń wyzerowane punkty z key_points_state i z planszy
         for hex_id in to_remove:
-            self.key_points_state.pop(hex_id, None)
+            self._drop_key_point(hex_id)
             if hasattr(self.board, 'key_points'):
-                self.board.key_points.pop(hex_id, None)
+                self.board.remove_key_point(hex_id)
         self._save_key_points_to_map()
+        self.record('key_points', income={str(p.id): points for p, points in debug_points_per_general.items()})
         # Zwróć informacje o przyznanych punktach
         return debug_points_per_general
 
@@ -221,36 +430,30 @@ class GameEngine:
 def get_token_vision_hexes(token, board):
     """
     Zwraca zbiór (q, r) heksów w zasięgu widzenia żetonu na podstawie pola 'sight'.
-    Używa dystansu heksagonalnego (axial/cube).
+    Używa gotowego szablonu dysku heksowego nałożonego na siatkę terenu planszy.
     """
     if token.q is None or token.r is None:
         return set()
-    vision_range = token.stats.get('sight', 0)
-    visible = set()
-    for dq in range(-vision_range, vision_range + 1):
-        for dr in range(-vision_range, vision_range + 1):
-            q = token.q + dq
-            r = token.r + dr
-            if board.hex_distance((token.q, token.r), (q, r)) <= vision_range:
-                if board.get_tile(q, r) is not None:
-                    visible.add((q, r))
-    return visible
+    return board.vision_hexes(token.q, token.r, token.stats.get('sight', 0))
+
+def get_tokens_vision_mask(tokens, board):
+    """Maska widoczności (siatka planszy) będąca sumą dysków widzenia podanych żetonów."""
+    return board.vision_mask((t.q, t.r, t.stats.get('sight', 0)) for t in tokens)
 
 def update_player_visibility(player, all_tokens, board):
     """
     Aktualizuje widoczność gracza: zbiera wszystkie heksy w zasięgu widzenia jego żetonów
     oraz żetony znajdujące się na tych heksach. Uwzględnia tymczasową widoczność (temp_visible_hexes, temp_visible_tokens).
     """
-    visible_hexes = set()
     # Dowódca: tylko własne żetony; Generał: sumuje widoczność dowódców swojej nacji
     if player.role.lower() == 'dowódca':
-        own_tokens = [t for t in all_tokens if t.owner == f"{player.id} ({player.nation})"]
+        own_tokens = [t for t in all_tokens if is_owned_by(t, player)]
     elif player.role.lower() == 'generał':
-        own_tokens = [t for t in all_tokens if t.owner.endswith(f"({player.nation})")]
+        faction = faction_id(player.nation)
+        own_tokens = [t for t in all_tokens if t.faction == faction]
     else:
         own_tokens = []
-    for token in own_tokens:
-        visible_hexes |= get_token_vision_hexes(token, board)
+    visible_hexes = board.mask_to_hexes(get_tokens_vision_mask(own_tokens, board))
     # Dodaj tymczasową widoczność
     if hasattr(player, 'temp_visible_hexes'):
         visible_hexes |= player.temp_visible_hexes
@@ -276,18 +479,18 @@ def update_general_visibility(general, all_players, all_tokens):
         all_hexes |= getattr(d, 'visible_hexes', set())
     general.visible_hexes = all_hexes
     # Generał widzi wszystkie żetony swojej nacji
-    own_tokens = {t.id for t in all_tokens if t.owner.endswith(f"({nation})")}
+    faction = faction_id(nation)
+    own_tokens = {t.id for t in all_tokens if t.faction == faction}
     # Oraz wszystkie żetony przeciwnika, które są na widocznych heksach
-    enemy_tokens = {t.id for t in all_tokens if t.owner and not t.owner.endswith(f"({nation})") and (t.q, t.r) in all_hexes}
+    enemy_tokens = {t.id for t in all_tokens if t.owner and t.faction != faction and (t.q, t.r) in all_hexes}
     general.visible_tokens = own_tokens | enemy_tokens
 
 def update_all_players_visibility(players, all_tokens, board):
-    for player in players:
-        update_player_visibility(player, all_tokens, board)
-    # Dodatkowa aktualizacja dla generałów (po wszystkich dowódcach!)
-    for player in players:
-        if player.role.lower() == 'generał':
-            update_general_visibility(player, players, all_tokens)
+    """Uzgadnia widoczność wszystkich graczy.
+    Liczniki widoczności (VisibilityTracker) są aktualizowane przyrostowo przy każdym ruchu, wystawieniu
+    i eliminacji żetonu; tutaj pełne przeliczenie następuje tylko po zmianie graczy lub listy żetonów
+    (np. po wczytaniu gry), a w pozostałych przypadkach doliczana jest jedynie widoczność tymczasowa."""
+    VisibilityTracker.for_board(board).update(players, all_tokens)
 
 def clear_temp_visibility(players):
     for p in players:
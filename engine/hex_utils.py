@@ -1,4 +1,5 @@
 import math
+from functools import lru_cache
 
 def get_hex_vertices(cx, cy, s):
     angles = [math.radians(60 * i) for i in range(6)]
@@ -24,3 +25,13 @@ def get_neighbors(q, r):
         (q + 1, r - 1),
         (q - 1, r + 1)
     ]
+
+
+@lru_cache(maxsize=None)
+def hex_disk_offsets(radius):
+    """Przesunięcia axial (dq, dr) wszystkich heksów w odległości <= radius od środka."""
+    return tuple(
+        (dq, dr)
+        for dq in range(-radius, radius + 1)
+        for dr in range(max(-radius, -dq - radius), min(radius, -dq + radius) + 1)
+    )
@@ -0,0 +1,430 @@
+"""
+Dziennik zdarzeń gry (event sourcing): binarny plik tylko do dopisywania z różnicami stanu po każdej
+zmianie (ruch, walka, uzupełnienie, wystawienie, dochód z punktów kluczowych, zmiana tury) i okresowymi
+pełnymi klatkami kluczowymi. JournalReplayer odtwarza stan na początek dowolnej tury: wczytuje najbliższą
+wcześniejszą klatkę i nakłada kolejne różnice, a skrót stanu (GameEngine.state_hash) zapisany przy każdym
+wpisie pozwala wykryć rozbieżność odtworzenia.
+
+Format pliku: MAGIC, wersja (uint16), długość i JSON metadanych (ścieżka mapy, seed), a dalej rekordy:
+nagłówek _RECORD (rodzaj b'K' - klatka / b'D' - różnica, tura, długość treści, skrót stanu) i treść
+(JSON skompresowany zlib). Nagłówki pozwalają zbudować indeks tur bez dekodowania treści.
+
+Podgląd z wiersza poleceń:
+    python -m engine.journal logs/journal_20250101_120000.bin --turn 12
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List
+
+from core.ekonomia import EconomySystem
+from engine.player import Player
+from engine.rng import RandomStreams
+from engine.snapshot import PLAYER_VALUES, TOKEN_FIELDS, token_state
+from engine.token import Token, shared_stats
+
+MAGIC = b"KJRN"
+VERSION = 1
+_HEADER = struct.Struct("<4sHI")
+_RECORD = struct.Struct("<cIIQ")
+KEYFRAME, DELTA = b"K", b"D"
+
+# Rodzaje wpisów dla akcji silnika (inne klasy akcji - nazwa klasy małymi literami)
+ACTION_KINDS = {
+    "MoveAction": "move",
+    "CombatAction": "combat",
+    "ResupplyAction": "resupply",
+    "ModeChangeAction": "mode",
+}
+
+
+class JournalError(Exception):
+    """Uszkodzony plik dziennika albo odtworzony stan niezgodny ze skrótem zapisanym w dzienniku."""
+
+
+def action_kind(action) -> str:
+    name = type(action).__name__
+    return ACTION_KINDS.get(name, name.lower())
+
+
+def action_info(action) -> Dict[str, Any]:
+    """Parametry akcji (id żetonów, cel, ilości) do opisu wpisu."""
+    return {k: v for k, v in vars(action).items() if isinstance(v, (str, int, float, bool, type(None)))}
+
+
+# --- KODOWANIE STANU ---
+def token_record(token) -> Dict[str, Any]:
+    """Pełny zapis żetonu: serialize() i pozostałe zmienne pola (np. defense_value po zmianie trybu)."""
+    record = token.serialize()
+    for name in TOKEN_FIELDS:
+        if name not in record and hasattr(token, name):
+            record[name] = getattr(token, name)
+    return record
+
+
+def apply_token_fields(token, fields: Dict[str, Any]):
+    if 'q' in fields or 'r' in fields:
+        token.set_position(fields.get('q', token.q), fields.get('r', token.r))
+    for name, value in fields.items():
+        if name in ('id', 'q', 'r'):
+            continue
+        if name == 'stats':
+            token.stats = shared_stats(value)
+        else:
+            setattr(token, name, value)
+
+
+def token_from_record(record: Dict[str, Any]) -> Token:
+    token = Token.from_dict(record)
+    apply_token_fields(token, {k: v for k, v in record.items() if k in TOKEN_FIELDS})
+    return token
+
+
+def player_record(player) -> Dict[str, Any]:
+    record = {'id': player.id, 'nation': player.nation, 'role': player.role,
+              'time_limit': getattr(player, 'time_limit', 5)}
+    for name in PLAYER_VALUES:
+        if hasattr(player, name):
+            record[name] = getattr(player, name)
+    if getattr(player, 'economy', None) is not None:
+        record['economy'] = dict(player.economy.__dict__)
+    record['vp_history'] = list(getattr(player, 'vp_history', []))
+    return record
+
+
+def apply_player_fields(player, fields: Dict[str, Any]):
+    for name, value in fields.items():
+        if name == 'economy':
+            if getattr(player, 'economy', None) is None:
+                player.economy = EconomySystem()
+            player.economy.__dict__.update(value)
+        elif name == 'vp_history':
+            player.vp_history = list(value)
+        elif name == 'vp_added':
+            player.vp_history.extend(value)
+        elif name not in ('id', 'nation', 'role', 'time_limit'):
+            setattr(player, name, value)
+
+
+def player_from_record(record: Dict[str, Any]) -> Player:
+    player = Player(record['id'], record['nation'], record['role'], record.get('time_limit', 5))
+    apply_player_fields(player, record)
+    return player
+
+
+def _encode(payload) -> bytes:
+    return zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(data: bytes):
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+# --- ZAPIS ---
+class ActionJournal:
+    """Zapisuje dziennik gry silnika. Po utworzeniu jest podpięty jako engine.journal, a silnik (akcje,
+    punkty kluczowe, zmiana tury) i GUI (wystawienie, uzupełnienie) wołają engine.record(rodzaj, ...).
+
+    Wpis zawiera różnicę stanu od poprzedniego wpisu, liczoną przez porównanie krotek stanu żetonów
+    (engine.snapshot.token_state), więc obejmuje także zmiany zrobione poza akcjami silnika. Wyniki
+    losowań walki są zapisane jako ich skutki; stan RNG trafia do klatek (pełny) i wpisów zmiany tury
+    (strumienie zmienione od poprzedniego zapisu), więc gra odtworzona na początek tury toczy się
+    dalej z tymi samymi losowaniami.
+    Numer tury w nagłówkach wpisów pochodzi z wpisów 'turn' (record('turn', turn=N) z TurnManager),
+    a nie ze stanu silnika. Klatka kluczowa jest zapisywana na starcie i co keyframe_every tur."""
+
+    def __init__(self, path: str, engine, keyframe_every: int = 5):
+        self.path = path
+        self.engine = engine
+        self.keyframe_every = max(1, int(keyframe_every))
+        meta = {"map_path": getattr(engine.board, 'json_path', None), "seed": engine.rng.seed}
+        meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(meta_bytes)))
+            f.write(meta_bytes)
+        engine.journal = self
+        # Bieżąca tura dziennika (nagłówki wpisów, klatki kluczowe), zmieniana przez wpisy 'turn'
+        self.turn = engine.turn if isinstance(engine.turn, int) and engine.turn >= 0 else 0
+        self._write_keyframe("start", {})
+
+    # --- STAN BAZOWY (do liczenia różnic) ---
+    def _rebase(self):
+        engine = self.engine
+        self._tokens = {t.id: (t, token_state(t), token_record(t)) for t in engine.tokens}
+        self._players = {str(p.id): player_record(p) for p in getattr(engine, 'players', [])}
+        self._key_points = {k: v.get('current_value') for k, v in engine.key_points_state.items()}
+        self._turn = self._turn_fields()
+        self._rng = self.engine.rng.getstate()["streams"]
+
+    def _turn_fields(self) -> Dict[str, Any]:
+        engine = self.engine
+        player = getattr(engine, 'current_player_obj', None)
+        return {'turn': engine.turn, 'current_player': engine.current_player,
+                'current_player_id': getattr(player, 'id', None)}
+
+    def _write(self, kind: bytes, payload):
+        data = _encode(payload)
+        with open(self.path, "ab") as f:
+            f.write(_RECORD.pack(kind, self.turn, len(data), self.engine.state_hash))
+            f.write(data)
+
+    def _write_keyframe(self, event: str, info: Dict[str, Any]):
+        engine = self.engine
+        payload = {
+            "event": event,
+            "info": info,
+            "tokens": [token_record(t) for t in engine.tokens],
+            "players": [player_record(p) for p in getattr(engine, 'players', [])],
+            "key_points_state": engine.key_points_state,
+            "key_points": engine.board.key_points,
+            "rng": engine.rng.getstate(),
+        }
+        payload.update(self._turn_fields())
+        self._write(KEYFRAME, payload)
+        self._rebase()
+
+    def record(self, event: str, **info):
+        """Dopisuje wpis: rodzaj zdarzenia, jego parametry i różnicę stanu od poprzedniego wpisu.
+        Wpis 'turn' z parametrem turn zmienia bieżącą turę dziennika."""
+        if event == "turn" and isinstance(info.get("turn"), int) and info["turn"] >= 0:
+            self.turn = info["turn"]
+        if event == "turn" and self.turn % self.keyframe_every == 0:
+            self._write_keyframe(event, info)
+            return
+        payload = {"event": event, "info": info}
+        payload.update(self._diff())
+        if event == "turn":
+            # Tylko strumienie, z których losowano od poprzedniego zapisu stanu RNG
+            streams = self.engine.rng.getstate()["streams"]
+            changed = {name: state for name, state in streams.items() if self._rng.get(name) != state}
+            self._rng = streams
+            if changed:
+                payload["rng_streams"] = changed
+        self._write(DELTA, payload)
+
+    def _diff(self) -> Dict[str, Any]:
+        engine = self.engine
+        delta: Dict[str, Any] = {}
+        changed, added, tokens = {}, [], {}
+        for token in engine.tokens:
+            previous = self._tokens.get(token.id)
+            if previous is not None and previous[0] is token:
+                state = token_state(token)
+                if state == previous[1]:
+                    tokens[token.id] = previous
+                    continue
+                record = token_record(token)
+                changed[token.id] = {k: v for k, v in record.items() if previous[2].get(k) != v}
+            else:
+                record = token_record(token)
+                state = token_state(token)
+                added.append(record)
+            tokens[token.id] = (token, state, record)
+        removed = [token_id for token_id in self._tokens if token_id not in tokens]
+        self._tokens = tokens
+        if changed:
+            delta["tokens"] = changed
+        if added:
+            delta["added"] = added
+        if removed:
+            delta["removed"] = removed
+
+        players = {}
+        for player in getattr(engine, 'players', []):
+            key = str(player.id)
+            record = player_record(player)
+            previous = self._players.get(key)
+            self._players[key] = record
+            if previous is None:
+                players[key] = record
+                continue
+            fields = {k: v for k, v in record.items() if k != 'vp_history' and previous.get(k) != v}
+            old_vp, new_vp = previous['vp_history'], record['vp_history']
+            if new_vp[:len(old_vp)] != old_vp:
+                fields['vp_history'] = new_vp
+            elif len(new_vp) > len(old_vp):
+                fields['vp_added'] = new_vp[len(old_vp):]
+            if fields:
+                players[key] = fields
+        if players:
+            delta["players"] = players
+
+        key_points = {k: v.get('current_value') for k, v in engine.key_points_state.items()}
+        kp_delta = {k: v for k, v in key_points.items() if self._key_points.get(k) != v}
+        kp_delta.update({k: None for k in self._key_points if k not in key_points})
+        self._key_points = key_points
+        if kp_delta:
+            delta["key_points"] = kp_delta
+
+        turn = self._turn_fields()
+        delta.update({k: v for k, v in turn.items() if self._turn.get(k) != v})
+        self._turn = turn
+        return delta
+
+
+# --- ODCZYT I ODTWARZANIE ---
+@dataclass
+class JournalEntry:
+    index: int
+    kind: bytes  # KEYFRAME albo DELTA
+    turn: int
+    state_hash: int
+    offset: int
+    length: int
+
+
+class JournalReplayer:
+    """Odczyt dziennika: indeks wpisów z nagłówków, lista zdarzeń i odtwarzanie stanu do wybranej tury."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: List[JournalEntry] = []
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise JournalError(f"{path}: za krótki plik dziennika")
+            magic, version, meta_len = _HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise JournalError(f"{path}: nieznany format dziennika ({magic!r}, wersja {version})")
+            self.meta = json.loads(f.read(meta_len).decode("utf-8"))
+            offset = _HEADER.size + meta_len
+            while True:
+                raw = f.read(_RECORD.size)
+                if len(raw) < _RECORD.size:
+                    break  # koniec pliku albo urwany ostatni wpis (np. po awarii) - pomijamy
+                kind, turn, length, state_hash = _RECORD.unpack(raw)
+                offset += _RECORD.size
+                if offset + length > size:
+                    break
+                f.seek(length, 1)
+                self.entries.append(JournalEntry(len(self.entries), kind, turn, state_hash, offset, length))
+                offset += length
+        if not self.entries or self.entries[0].kind != KEYFRAME:
+            raise JournalError(f"{path}: dziennik nie zaczyna się od klatki kluczowej")
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def turns(self) -> List[int]:
+        return sorted({entry.turn for entry in self.entries})
+
+    def payload(self, entry: JournalEntry) -> Dict[str, Any]:
+        with open(self.path, "rb") as f:
+            f.seek(entry.offset)
+            data = f.read(entry.length)
+        if len(data) < entry.length:
+            raise JournalError(f"{self.path}: urwany wpis {entry.index}")
+        return _decode(data)
+
+    def events(self) -> Iterator[tuple]:
+        """(tura, zdarzenie, parametry) kolejnych wpisów - do przeglądania przebiegu partii."""
+        for entry in self.entries:
+            payload = self.payload(entry)
+            yield entry.turn, payload["event"], payload["info"]
+
+    def new_engine(self, tokens_index_path: str = "assets/tokens/index.json",
+                   tokens_start_path: str = "assets/start_tokens.json"):
+        """Silnik z mapą z dziennika, gotowy do replay/seek (żetony i gracze przyjdą z klatki)."""
+        from engine.engine import GameEngine
+        return GameEngine(self.meta.get("map_path") or "data/map_data.json", tokens_index_path, tokens_start_path,
+                          seed=self.meta.get("seed", 42), read_only=True, autoload=False)
+
+    def index_of_turn(self, turn: int) -> int:
+        """Indeks pierwszego wpisu tury turn (początek tury: zmiana tury albo klatka startowa)."""
+        for entry in self.entries:
+            if entry.turn >= turn:
+                return entry.index
+        raise JournalError(f"{self.path}: brak tury {turn} w dzienniku (ostatnia: {self.entries[-1].turn})")
+
+    def seek(self, engine, turn: int):
+        """Ustawia engine w stanie z początku tury turn."""
+        return self.replay(engine, self.index_of_turn(turn))
+
+    def replay(self, engine, index: int):
+        """Ustawia engine w stanie po wpisie index: najbliższa klatka kluczowa i kolejne różnice.
+        Sprawdza zgodność engine.state_hash ze skrótem zapisanym przy wpisie."""
+        if not 0 <= index < len(self.entries):
+            raise JournalError(f"{self.path}: brak wpisu {index}")
+        start = max(e.index for e in self.entries[:index + 1] if e.kind == KEYFRAME)
+        self._apply_keyframe(engine, self.payload(self.entries[start]))
+        with open(self.path, "rb") as f:
+            for entry in self.entries[start + 1:index + 1]:
+                f.seek(entry.offset)
+                self._apply_delta(engine, _decode(f.read(entry.length)))
+        expected = self.entries[index].state_hash
+        if engine.state_hash != expected:
+            raise JournalError(f"{self.path}: stan po wpisie {index} niezgodny ze skrótem z dziennika")
+        return engine
+
+    def _apply_keyframe(self, engine, payload):
+        engine.tokens = [token_from_record(record) for record in payload["tokens"]]
+        engine.players = [player_from_record(record) for record in payload["players"]]
+        engine.board.set_key_points(payload["key_points"])
+        engine.key_points_state = {k: dict(v) for k, v in payload["key_points_state"].items()}
+        self._apply_turn(engine, payload)
+
+    def _apply_delta(self, engine, payload):
+        for token_id in payload.get("removed", ()):
+            token = engine.registry.get(token_id)
+            if token is not None:
+                engine.registry.remove(token)
+        for token_id, fields in payload.get("tokens", {}).items():
+            apply_token_fields(engine.registry.get(token_id), fields)
+        for record in payload.get("added", ()):
+            engine.registry.add(token_from_record(record))
+        players = {str(p.id): p for p in engine.players}
+        for key, fields in payload.get("players", {}).items():
+            if key in players:
+                apply_player_fields(players[key], fields)
+            else:
+                engine.players.append(player_from_record(fields))
+        for hex_id, value in payload.get("key_points", {}).items():
+            if value is None:
+                engine._drop_key_point(hex_id)
+                engine.board.remove_key_point(hex_id)
+            else:
+                engine._set_key_point_value(hex_id, engine.key_points_state[hex_id], value)
+        self._apply_turn(engine, payload)
+
+    @staticmethod
+    def _apply_turn(engine, payload):
+        if "turn" in payload:
+            engine.turn = payload["turn"]
+        if "current_player" in payload:
+            engine.current_player = payload["current_player"]
+        if "current_player_id" in payload:
+            player_id = payload["current_player_id"]
+            engine.current_player_obj = next((p for p in engine.players if p.id == player_id), None)
+        if "rng" in payload:
+            streams = RandomStreams()
+            streams.setstate(payload["rng"])
+            engine.rng.assign(streams)
+        for name, (version, internal, gauss) in payload.get("rng_streams", {}).items():
+            engine.rng.stream(name).setstate((version, tuple(internal), gauss))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Podgląd dziennika gry")
+    parser.add_argument("path", help="plik dziennika")
+    parser.add_argument("--turn", type=int, default=None, help="odtwórz stan z początku tury")
+    args = parser.parse_args(argv)
+    replayer = JournalReplayer(args.path)
+    if args.turn is None:
+        for turn, event, info in replayer.events():
+            print(f"tura {turn:3d}  {event:10s} {info}")
+        return 0
+    engine = replayer.seek(replayer.new_engine(), args.turn)
+    for player in engine.players:
+        print(f"{player.nation} {player.role} {player.id}: VP {getattr(player, 'victory_points', 0)}")
+    print(f"Tura {engine.turn}: {len(engine.tokens)} żetonów, skrót stanu {engine.state_hash:016x}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
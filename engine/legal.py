@@ -0,0 +1,113 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple
+from engine.action import CombatAction, ModeChangeAction, MoveAction, ResupplyAction, MOVEMENT_MODES, can_attack, economic_points
+from engine.hex_utils import hex_disk_offsets
+from engine.token import is_owned_by
+
+
+@dataclass
+class LegalActions:
+    """Dozwolone akcje gracza w bieżącym stanie, pogrupowane według id żetonu."""
+    moves: Dict[str, List[Tuple[int, int]]] = field(default_factory=dict)
+    attacks: Dict[str, List[str]] = field(default_factory=dict)
+    mode_switches: Dict[str, List[str]] = field(default_factory=dict)
+    # id żetonu -> (maks. paliwo, maks. zasoby bojowe) do uzupełnienia za dostępne punkty
+    resupply: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    def __len__(self):
+        return (sum(len(v) for v in self.moves.values()) + sum(len(v) for v in self.attacks.values())
+                + sum(len(v) for v in self.mode_switches.values()) + len(self.resupply))
+
+    def actions(self) -> Iterator:
+        """Akcje silnika odpowiadające pozycjom listy (uzupełnienie - w maksymalnej dostępnej ilości)."""
+        for token_id, hexes in self.moves.items():
+            for q, r in hexes:
+                yield MoveAction(token_id, q, r)
+        for token_id, targets in self.attacks.items():
+            for target_id in targets:
+                yield CombatAction(token_id, target_id)
+        for token_id, modes in self.mode_switches.items():
+            for mode in modes:
+                yield ModeChangeAction(token_id, mode)
+        for token_id, (fuel, combat) in self.resupply.items():
+            yield ResupplyAction(token_id, fuel, combat)
+
+
+class LegalActionGenerator:
+    """Wylicza LegalActions z indeksów silnika: pola osiągalności planszy (zapamiętywane do zmiany
+    zajętości), indeksu heks -> żetony dla celów ataku i rejestru żetonów. Wynik jest trzymany na
+    gracza do zmiany stanu: zajętości pól, stanu jego żetonów, widoczności lub punktów ekonomicznych.
+    Reguły są takie same jak w MoveAction, CombatAction, ModeChangeAction i ResupplyAction."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        # id(gracz) -> (klucz stanu, wynik, gracz)
+        self._cache: Dict[int, Tuple[tuple, LegalActions, object]] = {}
+
+    def _own_tokens(self, player) -> List:
+        return [t for t in self.engine.tokens if t.q is not None and is_owned_by(t, player)]
+
+    def _state_key(self, player, own) -> tuple:
+        visible = getattr(player, 'visible_tokens', None)
+        return (
+            self.engine.board.occupancy_version,
+            tuple((t.id, t.q, t.r, t.currentMovePoints, t.currentFuel, t.combat_value,
+                   t.movement_mode, t.movement_mode_locked) for t in own),
+            frozenset(visible) if visible is not None else None,
+            getattr(player, 'punkty_ekonomiczne', None),
+        )
+
+    def legal_actions(self, player) -> LegalActions:
+        own = self._own_tokens(player)
+        key = self._state_key(player, own)
+        cached = self._cache.get(id(player))
+        if cached is not None and cached[0] == key and cached[2] is player:
+            return cached[1]
+        result = self._generate(player, own)
+        self._cache[id(player)] = (key, result, player)
+        return result
+
+    def _generate(self, player, own) -> LegalActions:
+        board = self.engine.board
+        visible = getattr(player, 'visible_tokens', None)
+        visible_set = set(visible) if visible is not None else None
+        points = economic_points(player)
+        result = LegalActions()
+        for token in own:
+            mp = getattr(token, 'currentMovePoints', 0)
+            fuel = getattr(token, 'currentFuel', 0)
+            if mp > 0 and fuel > 0:
+                field_ = board.reachable((token.q, token.r), max_mp=mp, max_fuel=fuel, visible_tokens=visible_set)
+                hexes = [h for h in field_.hexes() if not board.tokens_at(h[0], h[1], owner=token.owner)]
+                if hexes:
+                    result.moves[token.id] = sorted(hexes)
+            if mp > 0:
+                targets = self._targets(token, visible_set)
+                if targets:
+                    result.attacks[token.id] = targets
+            if not getattr(token, 'movement_mode_locked', False):
+                result.mode_switches[token.id] = [m for m in MOVEMENT_MODES if m != token.movement_mode]
+            if points > 0:
+                max_fuel = getattr(token, 'maxFuel', token.stats.get('maintenance', 0))
+                max_combat = token.stats.get('combat_value', 0)
+                refuel = max(0, min(max_fuel - fuel, points))
+                # Łączny koszt uzupełnienia nie przekracza punktów (jak w ResupplyAction)
+                rearm = max(0, min(max_combat - getattr(token, 'combat_value', max_combat), points - refuel))
+                if refuel or rearm:
+                    result.resupply[token.id] = (refuel, rearm)
+        return result
+
+    def _targets(self, token, visible_set) -> List[str]:
+        """Widoczne żetony w zasięgu ataku, które CombatAction pozwala zaatakować (w kolejności id)."""
+        board = self.engine.board
+        attack = token.stats.get('attack', {})
+        attack_range = attack.get('range', 1) if isinstance(attack, dict) else 1
+        targets = []
+        for dq, dr in hex_disk_offsets(attack_range):
+            for other in board.tokens_at(token.q + dq, token.r + dr):
+                if not can_attack(token, other):
+                    continue
+                if visible_set is not None and other.id not in visible_set:
+                    continue
+                targets.append(other.id)
+        return sorted(targets)
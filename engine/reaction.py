@@ -0,0 +1,119 @@
+from typing import Dict, List, Set, Tuple
+from engine.hex_utils import hex_disk_offsets
+from engine.token import faction_of
+
+
+def threat_radius(token) -> int:
+    """Zasięg reakcji żetonu: wróg musi być jednocześnie w zasięgu widzenia i ataku."""
+    attack = token.stats.get('attack', {})
+    attack_range = attack.get('range', 1) if isinstance(attack, dict) else 1
+    return min(token.stats.get('sight', 0), attack_range)
+
+
+class ReactionResolver:
+    """Ogień reakcyjny po ruchu żetonu. Dla każdej frakcji trzyma mapę zagrożeń heks -> id żetonów,
+    które widzą ten heks i mogą go ostrzelać; mapa jest aktualizowana przyrostowo przy ruchu,
+    wystawieniu i eliminacji żetonów (obserwator Board), więc rozstrzygnięcie reakcji sprawdza
+    tylko żetony zapisane na heksie docelowym zamiast liczyć odległość do wszystkich żetonów."""
+
+    def __init__(self, board):
+        self.board = board
+        # frakcja -> heks -> id żetonów tej frakcji zagrażających heksowi
+        self._zones: Dict[int, Dict[Tuple[int, int], Set[str]]] = {}
+        # id żetonu -> (q, r, promień, frakcja) strefy wpisanej do mapy
+        self._stamps: Dict[str, Tuple[int, int, int, int]] = {}
+        self.valid = False
+        board.observers.append(self)
+
+    @staticmethod
+    def for_board(board) -> 'ReactionResolver':
+        for observer in board.observers:
+            if isinstance(observer, ReactionResolver):
+                return observer
+        return ReactionResolver(board)
+
+    # --- MAPA ZAGROŻEŃ ---
+    def rebuild(self):
+        self._zones = {}
+        self._stamps = {}
+        for token in list(self.board._tokens_by_id.values()):
+            self._stamp(token)
+        self.valid = True
+
+    def _stamp(self, token):
+        if token.q is None or token.r is None or not token.owner:
+            return
+        radius = threat_radius(token)
+        if radius < 0:
+            return
+        stamp = (token.q, token.r, radius, faction_of(token))
+        self._stamps[token.id] = stamp
+        zone = self._zones.setdefault(stamp[3], {})
+        for dq, dr in hex_disk_offsets(radius):
+            zone.setdefault((token.q + dq, token.r + dr), set()).add(token.id)
+
+    def _unstamp(self, token_id):
+        stamp = self._stamps.pop(token_id, None)
+        if stamp is None:
+            return
+        q, r, radius, faction = stamp
+        zone = self._zones.get(faction, {})
+        for dq, dr in hex_disk_offsets(radius):
+            pos = (q + dq, r + dr)
+            ids = zone.get(pos)
+            if ids is not None:
+                ids.discard(token_id)
+                if not ids:
+                    del zone[pos]
+
+    # --- ZDARZENIA Z PLANSZY ---
+    def tokens_reset(self):
+        self.valid = False
+
+    def token_added(self, token):
+        if self.valid:
+            self._unstamp(token.id)
+            self._stamp(token)
+
+    def token_removed(self, token):
+        if self.valid:
+            self._unstamp(token.id)
+
+    def token_changed(self, token):
+        if self.valid:
+            self._unstamp(token.id)
+            self._stamp(token)
+
+    # --- ZAPYTANIA ---
+    def threats_at(self, position: Tuple[int, int], faction: int) -> List:
+        """Żetony innych frakcji, które widzą heks i mają go w zasięgu ataku (w kolejności id)."""
+        if not self.valid:
+            self.rebuild()
+        ids = set()
+        for zone_faction, zone in self._zones.items():
+            if zone_faction != faction:
+                ids |= zone.get(position, set())
+        return [self.board._tokens_by_id[tid] for tid in sorted(ids) if tid in self.board._tokens_by_id]
+
+    def is_threatened(self, position: Tuple[int, int], faction: int) -> bool:
+        """Czy heks jest w strefie zagrożenia którejkolwiek innej frakcji (bez budowania listy żetonów)."""
+        if not self.valid:
+            self.rebuild()
+        return any(position in zone for zone_faction, zone in self._zones.items() if zone_faction != faction)
+
+    def resolve(self, engine, moved_token) -> List[Tuple[object, bool, str]]:
+        """Wykonuje ataki reakcyjne wrogów na żeton, który właśnie się ruszył.
+        Zwraca listę (atakujący, sukces, komunikat). Ataki kończą się, gdy żeton zostanie zniszczony."""
+        from engine.action import CombatAction
+        results = []
+        if moved_token.q is None or moved_token.r is None:
+            return results
+        for enemy in self.threats_at((moved_token.q, moved_token.r), faction_of(moved_token)):
+            if self.board.get_token(moved_token.id) is not moved_token:
+                break
+            if self.board.get_token(enemy.id) is not enemy:
+                continue
+            setattr(moved_token, 'wykryty_do_konca_tury', True)
+            success, msg = engine.execute_action(CombatAction(enemy.id, moved_token.id, is_reaction=True))
+            results.append((enemy, success, msg))
+        return results
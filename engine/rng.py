@@ -0,0 +1,83 @@
+import hashlib
+import random
+from typing import Dict, List
+
+
+def derive_seed(seed, *path) -> int:
+    """Stabilny (niezależny od PYTHONHASHSEED i procesu) 64-bitowy seed pochodny od seeda i nazw."""
+    key = ":".join(str(part) for part in (seed,) + path)
+    return int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big")
+
+
+class RandomStreams:
+    """Nazwane strumienie losowości silnika ('combat', 'economy', 'weather', ...).
+
+    Każdy strumień to osobny random.Random z seedem wyprowadzonym z seeda głównego i nazwy, więc
+    dodanie losowania w jednym systemie nie przesuwa wyników w pozostałych. spawn() tworzy
+    niezależne strumienie potomne (np. po jednym na proces symulacji wsadowej); ten sam seed
+    i te same wywołania dają zawsze ten sam przebieg gry."""
+
+    def __init__(self, seed=42):
+        self.seed = seed
+        self._streams: Dict[str, random.Random] = {}
+
+    def stream(self, name: str) -> random.Random:
+        rng = self._streams.get(name)
+        if rng is None:
+            rng = self._streams[name] = random.Random(derive_seed(self.seed, name))
+        return rng
+
+    __getitem__ = stream
+
+    def spawn(self, index) -> 'RandomStreams':
+        """Niezależny zestaw strumieni potomnych o numerze/nazwie index (deterministyczny)."""
+        return RandomStreams(derive_seed(self.seed, "child", index))
+
+    def spawn_many(self, count: int) -> List['RandomStreams']:
+        return [self.spawn(i) for i in range(count)]
+
+    def copy(self) -> 'RandomStreams':
+        """Niezależna kopia strumieni w bieżącym stanie (migawki i kopie silnika)."""
+        twin = RandomStreams(self.seed)
+        twin.assign(self)
+        return twin
+
+    def assign(self, other: 'RandomStreams'):
+        """Ustawia stan strumieni na stan other; obiekty strumieni zostają te same, więc trzymane
+        gdzie indziej referencje (np. self.random silnika) widzą przywrócony stan."""
+        self.seed = other.seed
+        for name, rng in self._streams.items():
+            if name not in other._streams:
+                rng.seed(derive_seed(self.seed, name))
+        for name, rng in other._streams.items():
+            self.stream(name).setstate(rng.getstate())
+
+    # --- STAN (zapis gry, powtórki) ---
+    def getstate(self) -> dict:
+        """Stan wszystkich użytych strumieni w postaci zapisywalnej do JSON."""
+        streams = {}
+        for name, rng in self._streams.items():
+            version, internal, gauss = rng.getstate()
+            streams[name] = [version, list(internal), gauss]
+        return {"seed": self.seed, "streams": streams}
+
+    def setstate(self, state: dict):
+        """Odwrotność getstate. Jak assign: stan trafia do istniejących obiektów strumieni (alias
+        GameEngine.random, strumienie trzymane przez wywołującego), a strumienie nieobecne w stanie
+        wracają do stanu początkowego."""
+        self.seed = state.get("seed", self.seed)
+        streams = state.get("streams", {})
+        for name, rng in self._streams.items():
+            if name not in streams:
+                rng.seed(derive_seed(self.seed, name))
+        for name, (version, internal, gauss) in streams.items():
+            self.stream(name).setstate((version, tuple(internal), gauss))
+
+
+def game_random(engine, name: str):
+    """Strumień silnika o podanej nazwie; obiekty bez RandomStreams (np. atrapy silnika w testach)
+    korzystają z globalnego modułu random."""
+    streams = getattr(engine, 'rng', None)
+    if isinstance(streams, RandomStreams):
+        return streams.stream(name)
+    return random
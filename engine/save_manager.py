@@ -1,6 +1,9 @@
 import os
 import json
 import base64
+import hashlib
+import shutil
+import zipfile
 from pathlib import Path
 from engine.token import Token
 from engine.player import Player
@@ -14,42 +17,56 @@ def _ensure_saves_dir(path):
         os.makedirs(dir_name, exist_ok=True)
     return path
 
-def save_game(path, engine, active_player=None):
-    path = _ensure_saves_dir(path)
-    def player_to_dict(p):
-        return p.serialize()
+# --- FORMAT ZAPISU ---
+# Zapis gry to archiwum ZIP: mały nagłówek (header.json, bez kompresji) i skompresowane sekcje
+# żetonów, graczy i pozostałego stanu. Obrazki i definicje JSON kupionych żetonów trafiają do
+# wspólnego magazynu plików adresowanych skrótem SHA-256 (katalog blobs obok zapisu), więc każdy
+# plik jest zapisany raz, a rozmiar zapisu nie rośnie z liczbą kupionych jednostek.
+# Stare zapisy JSON (z obrazkami w base64) są nadal wczytywane.
+SAVE_FORMAT = "kampania-save"
+SAVE_VERSION = 1
+BLOBS_DIR = "blobs"
+
+
+def blob_dir_for(save_path):
+    """Katalog magazynu plików wspólny dla zapisów z tego samego katalogu."""
+    return os.path.join(os.path.dirname(os.path.abspath(save_path)), BLOBS_DIR)
+
+
+def put_blob(blob_dir, data: bytes) -> str:
+    """Dodaje plik do magazynu (jeśli go tam nie ma) i zwraca jego skrót SHA-256."""
+    digest = hashlib.sha256(data).hexdigest()
+    blob_path = os.path.join(blob_dir, digest[:2], digest)
+    if not os.path.exists(blob_path):
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        tmp_path = f"{blob_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, blob_path)
+    return digest
+
+
+def blob_path(blob_dir, digest: str) -> str:
+    return os.path.join(blob_dir, digest[:2], digest)
+
+
+def _file_digest(path) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
 
-    # Serializuj żetony z pełnymi danymi dla nowych żetonów
+def _game_state(engine, active_player, token_files):
+    """Stan gry do zapisu; token_files(token, token_data) dokłada do danych nowego żetonu jego pliki."""
     tokens_data = []
     for token in engine.tokens:
         token_data = token.serialize()
-        
         # Jeśli to nowy żeton, zapisz pełne dane + obraz
         if "nowy_" in token.id:
-            json_path = Path(f"assets/tokens/aktualne/{token.id}.json")
-            png_path = Path(f"assets/tokens/aktualne/{token.id}.png")
-            
-            # Wczytaj pełne dane JSON
-            if json_path.exists():
-                try:
-                    with open(json_path, 'r', encoding='utf-8') as f:
-                        token_data['full_data'] = json.load(f)
-                except Exception as e:
-                    print(f"[WARN] Nie udało się wczytać {json_path}: {e}")
-            
-            # Zakoduj obraz do base64
-            if png_path.exists():
-                try:
-                    with open(png_path, 'rb') as f:
-                        token_data['image_data'] = base64.b64encode(f.read()).decode('utf-8')
-                except Exception as e:
-                    print(f"[WARN] Nie udało się zakodować {png_path}: {e}")
-        
+            token_files(token, token_data)
         tokens_data.append(token_data)
-
-    state = {
+    return {
         "tokens": tokens_data,
-        "players": [player_to_dict(p) for p in getattr(engine, 'players', [])],
+        "players": [p.serialize() for p in getattr(engine, 'players', [])],
         "turn": getattr(engine, 'turn', 1),
         # ZAPISUJEMY current_player jako id aktywnego gracza
         "current_player": getattr(engine, 'current_player_obj', getattr(engine, 'current_player', None)).id if hasattr(engine, 'current_player_obj') and getattr(engine, 'current_player_obj', None) else getattr(engine, 'current_player', 0),
@@ -63,42 +80,202 @@ def save_game(path, engine, active_player=None):
         # Dodajemy key_points_state do zapisu
         "key_points_state": getattr(engine, 'key_points_state', {})
     }
+
+
+def serialize_players(players):
+    """Player.serialize() z kopiami pól zmienianych w trakcie gry (historia VP, ekonomia), więc wynik
+    można zapisać w tle; dokłada punkty ekonomiczne dowódcy (punkty_ekonomiczne), jeśli są. Listy
+    widoczności są posortowane, więc ten sam stan daje zawsze ten sam zapis (zapisy różnicowe)."""
+    result = []
+    for player in players:
+        pdata = player.serialize()
+        for key in ("visible_hexes", "visible_tokens", "temp_visible_hexes", "temp_visible_tokens"):
+            pdata[key] = sorted(pdata[key], key=str)
+        pdata["vp_history"] = list(pdata["vp_history"])
+        if pdata.get("economy") is not None:
+            pdata["economy"] = dict(pdata["economy"])
+        if hasattr(player, 'punkty_ekonomiczne'):
+            pdata["punkty_ekonomiczne"] = player.punkty_ekonomiczne
+        result.append(pdata)
+    return result
+
+
+def players_from_state(players_data):
+    """Gracze odtworzeni z listy Player.serialize() (zapis gry, zapis automatyczny)."""
+    from core.ekonomia import EconomySystem
+    players = []
+    for pdata in players_data:
+        player = Player(pdata["id"], pdata["nation"], pdata["role"], pdata.get("time_limit", 5), pdata.get("image_path"), None)
+        # NIE nadpisuj __dict__ w całości, tylko ustaw kluczowe atrybuty:
+        # (aby nie nadpisać np. referencji do economy)
+        player.victory_points = pdata.get("victory_points", 0)
+        player.vp_history = pdata.get("vp_history", [])
+        # Odtwórz economy jako obiekt EconomySystem
+        if "economy" in pdata and isinstance(pdata["economy"], dict):
+            econ = EconomySystem()
+            econ.__dict__.update(pdata["economy"])
+            player.economy = econ
+        if "punkty_ekonomiczne" in pdata:
+            player.punkty_ekonomiczne = pdata["punkty_ekonomiczne"]
+        # Zamień listy na sety tupli (odtwarzanie widoczności)
+        for key in ["visible_hexes", "visible_tokens", "temp_visible_hexes", "temp_visible_tokens"]:
+            if key in pdata and isinstance(pdata[key], list):
+                setattr(player, key, set(tuple(x) if isinstance(x, list) else x for x in pdata[key]))
+        players.append(player)
+    return players
+
+
+def capture_save(engine, active_player=None):
+    """Stan gry do save_game oderwany od obiektów silnika (bez operacji na plikach), więc zapis
+    (write_save) może iść w tle, gdy gra toczy się dalej."""
+    state = _game_state(engine, active_player, lambda token, token_data: None)
+    state["players"] = serialize_players(getattr(engine, 'players', []))
+    for key in ("weather", "turn_manager"):
+        if state[key] is not None:
+            state[key] = dict(state[key])
+    state["key_points_state"] = {k: dict(v) for k, v in state["key_points_state"].items()}
+    return state
+
+
+def write_save(path, state):
+    """Zapisuje stan z capture_save w formacie archiwum (SAVE_FORMAT); pliki nowych żetonów trafiają do magazynu blobs."""
+    path = _ensure_saves_dir(path)
+    blob_dir = blob_dir_for(path)
+    new_token_ids = []
+    for token_data in state["tokens"]:
+        if "nowy_" not in token_data["id"]:
+            continue
+        new_token_ids.append(token_data["id"])
+        for key, file_path in (('full_data_blob', Path(f"assets/tokens/aktualne/{token_data['id']}.json")),
+                               ('image_blob', Path(f"assets/tokens/aktualne/{token_data['id']}.png"))):
+            if file_path.exists():
+                try:
+                    token_data[key] = put_blob(blob_dir, file_path.read_bytes())
+                except Exception as e:
+                    print(f"[WARN] Nie udało się zapisać {file_path} w magazynie zapisów: {e}")
+
+    state = dict(state)
+    sections = {
+        "tokens.json": state.pop("tokens"),
+        "players.json": state.pop("players"),
+        "state.json": state,
+    }
+    header = {
+        "format": SAVE_FORMAT,
+        "version": SAVE_VERSION,
+        "turn": state.get("turn"),
+        "tokens": len(sections["tokens.json"]),
+        "players": len(sections["players.json"]),
+    }
+    payloads = {name: json.dumps(section, ensure_ascii=False, separators=(",", ":")) for name, section in sections.items()}
+    tmp_path = path + ".tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(zipfile.ZipInfo("header.json"), json.dumps(header, ensure_ascii=False), compress_type=zipfile.ZIP_STORED)
+        for name, payload in payloads.items():
+            zf.writestr(name, payload)
+    os.replace(tmp_path, path)
+
+    # Wyczyść folder aktualne po zapisie (tylko pliki zapisanych żetonów - zapis mógł iść w tle)
+    cleanup_aktualne_folder(new_token_ids)
+
+
+def save_game(path, engine, active_player=None):
+    """Zapisuje grę w formacie archiwum (SAVE_FORMAT); pliki nowych żetonów trafiają do magazynu blobs."""
+    write_save(path, capture_save(engine, active_player))
+
+
+def save_game_json(path, engine, active_player=None):
+    """Zapis w starym formacie JSON (obrazki nowych żetonów w base64) - dla narzędzi, które go czytają."""
+    path = _ensure_saves_dir(path)
+
+    def token_files(token, token_data):
+        json_path = Path(f"assets/tokens/aktualne/{token.id}.json")
+        png_path = Path(f"assets/tokens/aktualne/{token.id}.png")
+        # Wczytaj pełne dane JSON
+        if json_path.exists():
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    token_data['full_data'] = json.load(f)
+            except Exception as e:
+                print(f"[WARN] Nie udało się wczytać {json_path}: {e}")
+        # Zakoduj obraz do base64
+        if png_path.exists():
+            try:
+                with open(png_path, 'rb') as f:
+                    token_data['image_data'] = base64.b64encode(f.read()).decode('utf-8')
+            except Exception as e:
+                print(f"[WARN] Nie udało się zakodować {png_path}: {e}")
+
+    state = _game_state(engine, active_player, token_files)
     with open(path, "w", encoding="utf-8") as f:
         json.dump(state, f, ensure_ascii=False, indent=2)
-    
+
     # Wyczyść folder aktualne po zapisie
     cleanup_aktualne_folder()
 
-def cleanup_aktualne_folder():
-    """Usuwa nowe żetony z folderu aktualne po zapisie"""
+
+def read_save(path):
+    """Stan gry z pliku zapisu: archiwum SAVE_FORMAT albo stary JSON."""
+    if not zipfile.is_zipfile(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    with zipfile.ZipFile(path) as zf:
+        header = json.loads(zf.read("header.json").decode("utf-8"))
+        if header.get("format") != SAVE_FORMAT or header.get("version", 0) > SAVE_VERSION:
+            raise ValueError(f"Nieobsługiwany format zapisu: {header.get('format')} v{header.get('version')}")
+        state = json.loads(zf.read("state.json").decode("utf-8"))
+        state["tokens"] = json.loads(zf.read("tokens.json").decode("utf-8"))
+        state["players"] = json.loads(zf.read("players.json").decode("utf-8"))
+    return state
+
+
+def cleanup_aktualne_folder(token_ids=None):
+    """Usuwa nowe żetony z folderu aktualne po zapisie (token_ids: tylko pliki tych żetonów)"""
     aktualne_path = Path("assets/tokens/aktualne")
     if aktualne_path.exists():
         for file_path in aktualne_path.iterdir():
-            if file_path.name.startswith("nowy_"):
+            if file_path.name.startswith("nowy_") and (token_ids is None or file_path.stem in token_ids):
                 try:
                     file_path.unlink()
                 except Exception as e:
                     print(f"[WARN] Nie udało się usunąć {file_path}: {e}")
 
+def _restore_blob(blob_dir, digest, dest: Path):
+    """Kopiuje plik z magazynu do dest; plik o tej samej treści zostaje (bez ponownego zapisu)."""
+    source = blob_path(blob_dir, digest)
+    if not os.path.exists(source):
+        print(f"[WARN] Brak pliku {digest} w magazynie {blob_dir} (potrzebny dla {dest.name})")
+        return
+    if dest.exists() and dest.stat().st_size == os.path.getsize(source) and _file_digest(dest) == digest:
+        return
+    shutil.copyfile(source, dest)
+
+
 def load_game(path, engine):
     import types
-    from core.ekonomia import EconomySystem
-    with open(path, "r", encoding="utf-8") as f:
-        state = json.load(f)    # Odtwórz żetony
-    engine.tokens = []
+    state = read_save(path)
+    blob_dir = blob_dir_for(path)
     aktualne_path = Path("assets/tokens/aktualne")
     aktualne_path.mkdir(parents=True, exist_ok=True)
-    
+
+    # Odtwórz żetony
+    tokens = []
     for tdata in state["tokens"]:
-        from engine.token import Token
         token = Token.from_dict(tdata)
-        engine.tokens.append(token)
-        
-        # Jeśli to nowy żeton z pełnymi danymi, odtwórz pliki
-        if "nowy_" in token.id and "full_data" in tdata:
-            json_path = aktualne_path / f"{token.id}.json"
-            png_path = aktualne_path / f"{token.id}.png"
-            
+        tokens.append(token)
+        if "nowy_" not in token.id:
+            continue
+        json_path = aktualne_path / f"{token.id}.json"
+        png_path = aktualne_path / f"{token.id}.png"
+        # Nowy żeton z zapisu w formacie archiwum: pliki z magazynu blobs
+        for key, dest in (('full_data_blob', json_path), ('image_blob', png_path)):
+            if key in tdata:
+                try:
+                    _restore_blob(blob_dir, tdata[key], dest)
+                except Exception as e:
+                    print(f"[WARN] Nie udało się odtworzyć {dest}: {e}")
+        # Nowy żeton ze starego zapisu JSON: pełne dane i obraz w base64
+        if "full_data" in tdata:
             # Zapisz JSON
             try:
                 with open(json_path, 'w', encoding='utf-8') as f:
@@ -114,24 +291,11 @@ def load_game(path, engine):
                         f.write(image_bytes)
                 except Exception as e:
                     print(f"[WARN] Nie udało się odtworzyć {png_path}: {e}")
+    engine.tokens = tokens
+    # Przebuduj indeks zajętości planszy dla nowej listy żetonów
+    engine.board.set_tokens(engine.tokens)
     # Odtwórz graczy
-    engine.players = []
-    for pdata in state["players"]:
-        player = Player(pdata["id"], pdata["nation"], pdata["role"], pdata.get("time_limit", 5), pdata.get("image_path"), None)
-        # NIE nadpisuj __dict__ w całości, tylko ustaw kluczowe atrybuty:
-        # (aby nie nadpisać np. referencji do economy)
-        player.victory_points = pdata.get("victory_points", 0)
-        player.vp_history = pdata.get("vp_history", [])
-        # Odtwórz economy jako obiekt EconomySystem
-        if "economy" in pdata and isinstance(pdata["economy"], dict):
-            econ = EconomySystem()
-            econ.__dict__.update(pdata["economy"])
-            player.economy = econ
-        # Zamień listy na sety tupli (odtwarzanie widoczności)
-        for key in ["visible_hexes", "visible_tokens", "temp_visible_hexes", "temp_visible_tokens"]:
-            if key in pdata and isinstance(pdata[key], list):
-                setattr(player, key, set(tuple(x) if isinstance(x, list) else x for x in pdata[key]))
-        engine.players.append(player)
+    engine.players = players_from_state(state["players"])
     # Odtwórz inne stany
     if "turn" in state:
         engine.turn = state["turn"]
@@ -0,0 +1,261 @@
+"""
+Symulacje wsadowe bez GUI: pełne partie rozgrywane samym GameEngine przez polityki skryptowe/AI,
+równolegle w puli procesów. Wyniki (zwycięzca, VP, liczba tur, czas) trafiają do pliku CSV.
+
+Użycie:
+    python -m engine.simulate --games 1000 --workers 8 --polska agresywna --niemcy losowa --out wyniki.csv
+
+Polityka to nazwa z POLICIES albo ścieżka 'moduł:Klasa' do klasy z metodą play_turn(engine, player, rng).
+"""
+import argparse
+import csv
+import importlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, fields
+from typing import Dict, Iterable, List, Optional
+
+from core.ekonomia import EconomySystem
+from core.tura import TurnManager
+from core.zwyciestwo import VictoryConditions
+from engine.action import CombatAction, MoveAction
+from engine.engine import GameEngine, clear_temp_visibility
+from engine.journal import ActionJournal
+from engine.player import Player
+from engine.rng import RandomStreams
+from engine.token import faction_id, faction_of, is_owned_by
+
+NATIONS = ("Polska", "Niemcy")
+
+
+@dataclass
+class GameResult:
+    """Wynik jednej partii (jeden wiersz pliku wyników)."""
+    game: int
+    seed: int
+    winner: str  # nacja z większą sumą VP albo 'remis'
+    vp_polska: int
+    vp_niemcy: int
+    turns: int
+    wall_time: float
+
+
+# --- POLITYKI ---
+class PassivePolicy:
+    """Nic nie robi (punkt odniesienia do testów balansu)."""
+
+    def play_turn(self, engine, player, rng):
+        pass
+
+
+class AggressivePolicy:
+    """Dowódca atakuje wroga w zasięgu o najlepszym oczekiwanym bilansie strat (CombatPredictor),
+    a w przeciwnym razie rusza w stronę najbliższego wroga lub punktu kluczowego."""
+
+    def play_turn(self, engine, player, rng):
+        if player.role != "Dowódca":
+            return
+        for token in _own_tokens(engine, player):
+            if self._attack(engine, player, token):
+                continue
+            target = self._target(engine, token)
+            if target is not None and _move_towards(engine, player, token, target):
+                self._attack(engine, player, token)
+
+    def _attack(self, engine, player, token) -> bool:
+        if engine.registry.get(token.id) is not token or token.currentMovePoints <= 0:
+            return False
+        best, best_score = None, 0.0
+        for enemy_id in engine.legal_actions(player).attacks.get(token.id, []):
+            enemy = engine.registry.get(enemy_id)
+            odds = engine.combat_predictor.predict(token, enemy)
+            if odds is None:
+                continue
+            score = odds.expected_defender_loss - odds.expected_attacker_loss
+            if best is None or score > best_score:
+                best, best_score = enemy, score
+        if best is None:
+            return False
+        success, _ = engine.execute_action(CombatAction(token.id, best.id), player=player)
+        return success
+
+    def _target(self, engine, token):
+        candidates = [(e.q, e.r) for e in _enemies(engine, token)]
+        if not candidates:
+            candidates = [engine.board.key_to_coords(k) for k in getattr(engine, 'key_points_state', {})]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda pos: (engine.board.hex_distance((token.q, token.r), pos), pos))
+
+
+class RandomPolicy:
+    """Losowe ruchy i ataki (ze strumienia 'policy' silnika, więc partie są powtarzalne)."""
+
+    def play_turn(self, engine, player, rng):
+        if player.role != "Dowódca":
+            return
+        for token in _own_tokens(engine, player):
+            if engine.registry.get(token.id) is not token:
+                continue
+            legal = engine.legal_actions(player)
+            targets = legal.attacks.get(token.id)
+            if targets and rng.random() < 0.5:
+                engine.execute_action(CombatAction(token.id, rng.choice(targets)), player=player)
+                continue
+            hexes = legal.moves.get(token.id)
+            if hexes:
+                _move_towards(engine, player, token, rng.choice(hexes))
+
+
+POLICIES = {
+    "pasywna": PassivePolicy,
+    "agresywna": AggressivePolicy,
+    "losowa": RandomPolicy,
+}
+
+
+def load_policy(spec: str):
+    """Polityka o nazwie z POLICIES albo instancja klasy wskazanej jako 'moduł:Klasa'."""
+    if spec in POLICIES:
+        return POLICIES[spec]()
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Nieznana polityka: {spec} (dostępne: {', '.join(POLICIES)} lub moduł:Klasa)")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+def _own_tokens(engine, player) -> List:
+    return sorted((t for t in engine.tokens if t.q is not None and is_owned_by(t, player)), key=lambda t: t.id)
+
+
+def _enemies(engine, token) -> List:
+    faction = faction_of(token)
+    return [t for t in engine.tokens if t.owner and t.q is not None and t.faction != faction]
+
+
+def _move_towards(engine, player, token, goal) -> bool:
+    """Ruch żetonu do celu (lub najbliższego osiągalnego pola) i ogień reakcyjny wrogów po ruchu."""
+    if engine.registry.get(token.id) is not token or token.currentMovePoints <= 0:
+        return False
+    field = engine.board.reachable((token.q, token.r), max_mp=token.currentMovePoints,
+                                   max_fuel=token.currentFuel, visible_tokens=getattr(player, 'visible_tokens', None))
+    path = field.path_to_closest(tuple(goal))
+    if not path or len(path) < 2:
+        return False
+    success, _ = engine.execute_action(MoveAction(token.id, *path[-1]), player=player)
+    if success:
+        engine.resolve_reaction_fire(token)
+    return success
+
+
+# --- PARTIA ---
+def build_players() -> List[Player]:
+    """Skład jak w main.py: Generał i dwóch Dowódców na nację, Polska zaczyna."""
+    players = [
+        Player(1, "Polska", "Generał", 5),
+        Player(2, "Polska", "Dowódca", 5),
+        Player(3, "Polska", "Dowódca", 5),
+        Player(4, "Niemcy", "Generał", 5),
+        Player(5, "Niemcy", "Dowódca", 5),
+        Player(6, "Niemcy", "Dowódca", 5),
+    ]
+    for p in players:
+        p.economy = EconomySystem()
+    return players
+
+
+def play_game(seed: int, policies: Dict[str, str], max_turns: int = 30, game: int = 0,
+              map_path: str = "data/map_data.json", tokens_index_path: str = "assets/tokens/index.json",
+              tokens_start_path: str = "assets/start_tokens.json", journal_path: Optional[str] = None) -> GameResult:
+    """Rozgrywa jedną partię bez GUI; pętla tur jak run_human_vs_human_game w main.py.
+    journal_path: plik dziennika gry (engine.journal) do powtórki partii."""
+    started = time.perf_counter()
+    engine = GameEngine(map_path, tokens_index_path, tokens_start_path, seed=seed, read_only=True, autoload=False)
+    players = build_players()
+    engine.players = players
+    engine.update_all_players_visibility(players)
+    turn_manager = TurnManager(players, game_engine=engine)
+    if journal_path:
+        ActionJournal(journal_path, engine)
+    victory_conditions = VictoryConditions(max_turns=max_turns)
+    policy_by_nation = {nation: load_policy(policies.get(nation, "pasywna")) for nation in NATIONS}
+    policy_rng = engine.rng.stream('policy')
+    while True:
+        current_player = turn_manager.get_current_player()
+        engine.current_player_obj = current_player
+        engine.turn = turn_manager.current_turn
+        if current_player.role == "Generał":
+            current_player.economy.generate_economic_points(engine.rng.stream('economy'))
+            current_player.economy.add_special_points()
+        policy_by_nation[current_player.nation].play_turn(engine, current_player, policy_rng)
+        if turn_manager.next_turn():
+            engine.process_key_points(players)
+        engine.update_all_players_visibility(players)
+        if victory_conditions.check_game_over(turn_manager.current_turn):
+            break
+        for t in engine.tokens:
+            t.movement_mode_locked = False
+        clear_temp_visibility(players)
+    vp = {nation: sum(getattr(p, 'victory_points', 0) for p in players if faction_id(p.nation) == faction_id(nation))
+          for nation in NATIONS}
+    winner = "remis" if vp["Polska"] == vp["Niemcy"] else max(vp, key=vp.get)
+    return GameResult(game=game, seed=seed, winner=winner, vp_polska=vp["Polska"], vp_niemcy=vp["Niemcy"],
+                      turns=turn_manager.current_turn, wall_time=round(time.perf_counter() - started, 3))
+
+
+def _play_game_job(job) -> GameResult:
+    game, seed, policies, max_turns = job
+    return play_game(seed, policies, max_turns=max_turns, game=game)
+
+
+def run_batch(games: int, policies: Dict[str, str], seed: int = 42, max_turns: int = 30,
+              workers: Optional[int] = None) -> Iterable[GameResult]:
+    """Rozgrywa games partii w puli procesów (workers=1: w bieżącym procesie). Seed każdej partii
+    pochodzi z RandomStreams(seed).spawn(numer), więc wynik partii nie zależy od liczby procesów.
+    Zwraca wyniki w kolejności numerów partii, w miarę ich kończenia."""
+    root = RandomStreams(seed)
+    jobs = [(i, root.spawn(i).seed, dict(policies), max_turns) for i in range(games)]
+    if workers == 1:
+        for job in jobs:
+            yield _play_game_job(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, games // (4 * (workers or os.cpu_count() or 1)))
+        yield from pool.map(_play_game_job, jobs, chunksize=chunksize)
+
+
+def write_results(results: Iterable[GameResult], path: str) -> int:
+    """Zapisuje wyniki do CSV (wiersz na partię, zapis na bieżąco). Zwraca liczbę partii."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([field.name for field in fields(GameResult)])
+        for result in results:
+            writer.writerow(asdict(result).values())
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Symulacje wsadowe partii bez GUI")
+    parser.add_argument("--games", type=int, default=100, help="liczba partii")
+    parser.add_argument("--workers", type=int, default=None, help="liczba procesów (domyślnie liczba rdzeni)")
+    parser.add_argument("--seed", type=int, default=42, help="seed główny serii")
+    parser.add_argument("--turns", type=int, default=30, help="limit tur (VictoryConditions)")
+    parser.add_argument("--polska", default="agresywna", help="polityka strony polskiej")
+    parser.add_argument("--niemcy", default="agresywna", help="polityka strony niemieckiej")
+    parser.add_argument("--out", default="wyniki_symulacji.csv", help="plik wyników CSV")
+    args = parser.parse_args(argv)
+    policies = {"Polska": args.polska, "Niemcy": args.niemcy}
+    for spec in policies.values():
+        load_policy(spec)  # błędna nazwa polityki kończy program przed startem puli
+    started = time.perf_counter()
+    count = write_results(run_batch(args.games, policies, seed=args.seed, max_turns=args.turns, workers=args.workers), args.out)
+    print(f"Rozegrano {count} partii w {time.perf_counter() - started:.1f} s -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import copy
+from operator import attrgetter
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+from engine.token import HASHED_FIELDS, Token
+
+# Pola żetonu zmieniane w trakcie gry (pozycja i właściciel są odtwarzane przez planszę).
+# Pola ze skrótu stanu idą przez właściwości, więc przywrócenie aktualizuje też Board.state_hash.
+TOKEN_FIELDS = tuple(name.lstrip('_') if name.lstrip('_') in HASHED_FIELDS else name for name in Token.__slots__
+                     if name not in ('_board', 'id', '_owner', 'owner_player', 'faction', 'stats', '_q', '_r', '__dict__'))
+PLAYER_VALUES = ('victory_points', 'punkty_ekonomiczne')
+# Tymczasowa widoczność (z ruchu); stała widoczność wynika z pozycji żetonów i odtwarza ją VisibilityTracker
+PLAYER_SETS = ('temp_visible_hexes', 'temp_visible_tokens')
+_MISSING = object()
+_get_token_fields = attrgetter(*TOKEN_FIELDS)
+
+
+def token_state(token) -> tuple:
+    """Zmienny stan żetonu: (q, r, owner, wartości TOKEN_FIELDS, kopia __dict__)."""
+    try:
+        values = _get_token_fields(token)
+    except AttributeError:
+        # Nieustawione sloty (np. base_move przed pierwszym apply_movement_mode)
+        values = tuple(getattr(token, name, _MISSING) for name in TOKEN_FIELDS)
+    return (token.q, token.r, token.owner, values, dict(token.__dict__))
+
+
+def restore_token_state(token, state: tuple):
+    """Przywraca stan z token_state; pozycja i właściciel idą przez setery, więc indeks planszy się zgadza."""
+    q, r, owner, values, extra = state
+    for name, value in zip(TOKEN_FIELDS, values):
+        if value is not _MISSING:
+            setattr(token, name, value)
+        elif hasattr(token, name):
+            delattr(token, name)
+    token.__dict__.clear()
+    token.__dict__.update(extra)
+    token.owner = owner
+    token.set_position(q, r)
+
+
+def player_state(player) -> tuple:
+    """Stan gracza zmieniany przez akcje: VP, historia VP, punkty ekonomiczne i tymczasowa widoczność."""
+    economy = getattr(player, 'economy', None)
+    return (
+        {name: getattr(player, name) for name in PLAYER_VALUES if hasattr(player, name)},
+        dict(economy.__dict__) if economy is not None else None,
+        len(getattr(player, 'vp_history', [])),
+        {name: set(getattr(player, name)) for name in PLAYER_SETS if hasattr(player, name)},
+    )
+
+
+def restore_player_state(player, state: tuple):
+    values, economy, history_len, sets = state
+    for name, value in values.items():
+        setattr(player, name, value)
+    if economy is not None:
+        player.economy.__dict__.update(economy)
+    if hasattr(player, 'vp_history'):
+        del player.vp_history[history_len:]
+    for name, value in sets.items():
+        setattr(player, name, set(value))
+
+
+def clone_player(player):
+    """Kopia gracza z własnymi kopiami pól zmienianych w trakcie gry (reszta współdzielona)."""
+    twin = copy.copy(player)
+    if getattr(player, 'economy', None) is not None:
+        twin.economy = copy.copy(player.economy)
+    if hasattr(player, 'vp_history'):
+        twin.vp_history = list(player.vp_history)
+    for name in PLAYER_SETS + ('visible_hexes', 'visible_tokens'):
+        if hasattr(player, name):
+            setattr(twin, name, set(getattr(player, name)))
+    return twin
+
+
+@dataclass(frozen=True)
+class EngineSnapshot:
+    """Migawka stanu gry w pamięci (GameEngine.snapshot/restore). Trzyma referencje do żetonów
+    i graczy oraz krotki ich zmiennych pól; teren i statystyki jednostek nie są kopiowane."""
+    tokens: Tuple[Tuple[Token, tuple], ...]
+    players: Tuple[Tuple[Any, tuple], ...]
+    key_points_state: Dict[str, dict]
+    key_points: Dict[str, Any]
+    key_point_grid: Any
+    turn: Any
+    current_player: Any
+    rng: Any
+
+
+def take_snapshot(engine) -> EngineSnapshot:
+    board = engine.board
+    return EngineSnapshot(
+        tokens=tuple((t, token_state(t)) for t in engine.tokens),
+        players=tuple((p, player_state(p)) for p in getattr(engine, 'players', [])),
+        key_points_state={k: dict(v) for k, v in getattr(engine, 'key_points_state', {}).items()},
+        key_points=dict(board.key_points),
+        key_point_grid=board.key_point_grid.copy(),
+        turn=getattr(engine, 'turn', None),
+        current_player=getattr(engine, 'current_player', None),
+        rng=engine.rng.copy(),
+    )
+
+
+def restore_snapshot(engine, snapshot: EngineSnapshot):
+    tokens = [t for t, _state in snapshot.tokens]
+    current = list(engine.tokens)
+    # Zmieniony skład żetonów (eliminacje, wystawienia) - jedna przebudowa rejestru i indeksu planszy
+    if len(current) != len(tokens) or any(a is not b for a, b in zip(current, tokens)):
+        engine.tokens = tokens
+    for token, state in snapshot.tokens:
+        restore_token_state(token, state)
+    for player, state in snapshot.players:
+        restore_player_state(player, state)
+    engine.key_points_state = {k: dict(v) for k, v in snapshot.key_points_state.items()}
+    engine.board.key_points = dict(snapshot.key_points)
+    engine.board.key_point_grid = snapshot.key_point_grid.copy()
+    engine.turn = snapshot.turn
+    engine.current_player = snapshot.current_player
+    engine.rng.assign(snapshot.rng)
@@ -1,13 +1,106 @@
 import json
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# --- TOŻSAMOŚĆ WŁAŚCICIELA ---
+# Owner zapisywany jest jako napis '2 (Polska)'; do porównań służą małe liczby całkowite:
+# id frakcji (nacji) nadawane przy pierwszym użyciu oraz id gracza sparsowane raz na unikalny napis.
+_FACTION_IDS: Dict[str, int] = {'': 0}
+_FACTION_NAMES: List[str] = ['']
+
+
+def faction_id(nation: Optional[str]) -> int:
+    """Całkowite id frakcji dla nazwy nacji (0 = brak nacji)."""
+    nation = nation or ''
+    fid = _FACTION_IDS.get(nation)
+    if fid is None:
+        fid = _FACTION_IDS[nation] = len(_FACTION_NAMES)
+        _FACTION_NAMES.append(nation)
+    return fid
+
+
+def faction_name(fid: int) -> str:
+    return _FACTION_NAMES[fid]
+
+
+@lru_cache(maxsize=None)
+def owner_identity(owner: Optional[str]) -> Tuple[Any, int]:
+    """(id gracza, id frakcji) z ownera '2 (Polska)'. Id gracza to int, gdy jest liczbą, a None, gdy go brak."""
+    if not owner or '(' not in owner:
+        return None, 0
+    player_part, _, nation_part = owner.rpartition('(')
+    player_id = player_key(player_part.split('(')[0].strip() or None)
+    return player_id, faction_id(nation_part.replace(')', '').strip())
+
+
+def player_key(player_id):
+    """Id gracza w postaci porównywalnej z owner_player (napis z cyframi -> int)."""
+    if isinstance(player_id, str) and player_id.lstrip('-').isdigit():
+        return int(player_id)
+    return player_id
+
+
+def owner_nation(owner: Optional[str]) -> str:
+    """Wyciąga nację z ownera w formacie '2 (Polska)' (pusty napis, jeśli brak nawiasu)."""
+    return _FACTION_NAMES[owner_identity(owner)[1]]
+
+
+def faction_of(token) -> int:
+    """Id frakcji żetonu; obiekty spoza klasy Token (np. atrapy w testach) są obsługiwane przez napis ownera."""
+    fid = getattr(token, 'faction', None)
+    return owner_identity(token.owner)[1] if fid is None else fid
+
+
+def is_owned_by(token, player) -> bool:
+    """Czy żeton należy do gracza (porównanie id gracza i id frakcji zamiast składania napisu ownera)."""
+    owner_player = getattr(token, 'owner_player', None)
+    if owner_player is None:
+        owner_player = owner_identity(getattr(token, 'owner', None))[0]
+    return owner_player == player_key(player.id) and faction_of(token) == faction_id(player.nation)
+
+
+# Wspólne (flyweight) słowniki statystyk: żetony o tej samej definicji jednostki dzielą jeden słownik
+_STATS_TEMPLATES: Dict[str, Dict[str, Any]] = {}
+
+
+def shared_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Zwraca współdzielony słownik statystyk o tej samej zawartości co stats.
+    Słownika nie należy modyfikować w miejscu - zmianę robi się przez przypisanie nowego (token.stats = {...})."""
+    try:
+        key = json.dumps(stats, sort_keys=True, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return stats
+    template = _STATS_TEMPLATES.get(key)
+    if template is None:
+        template = _STATS_TEMPLATES[key] = stats
+    return template
+
+
+# Pola stanu żetonu liczone do skrótu stanu planszy (Board.state_hash) obok pozycji i właściciela.
+# Są właściwościami nad slotami '_<nazwa>', które zgłaszają zmianę wartości planszy, do której żeton jest podpięty.
+HASHED_FIELDS = ('currentMovePoints', 'currentFuel', 'combat_value', 'movement_mode')
+
 
 class Token:
+    # Stan instancji w slotach (bez osobnego __dict__ na żeton); __dict__ tworzony jest leniwie
+    # tylko wtedy, gdy ktoś doda żetonowi własny atrybut spoza listy
+    __slots__ = (
+        '_board', 'id', '_owner', 'owner_player', 'faction', 'stats', '_q', '_r',
+        'maxMovePoints', '_currentMovePoints', 'maxFuel', '_currentFuel', '_combat_value',
+        '_movement_mode', 'movement_mode_locked', 'defense_value', 'base_move', 'base_defense',
+        '__dict__',
+    )
+
     def __init__(self, id: str, owner: str, stats: Dict[str, Any], q: int = None, r: int = None, movement_mode: str = 'combat'):
+        # Plansza, do której indeksu zajętości podpięty jest żeton (ustawia Board.set_tokens/add_token)
+        self._board = None
         self.id = id
-        self.owner = owner
+        self._owner = owner
+        # Tożsamość właściciela jako liczby całkowite (napis owner zostaje do zapisu gry)
+        self.owner_player, self.faction = owner_identity(owner)
         self.stats = stats  # np. {'move': 12, 'combat_value': 6, ...}
-        self.q = q
-        self.r = r
+        self._q = q
+        self._r = r
         # Inicjalizacja punktów ruchu
         self.maxMovePoints = getattr(self, 'maxMovePoints', stats.get('move', 0))
         self.currentMovePoints = getattr(self, 'currentMovePoints', self.maxMovePoints)
@@ -24,9 +117,51 @@ class Token:
         """Sprawdza, czy żeton może się ruszyć na daną odległość (uwzględnia limit ruchu i paliwa)."""
         return dist <= self.stats.get('move', 0) and self.currentFuel > 0
 
+    # --- POZYCJA I WŁAŚCICIEL (aktualizują indeks zajętości planszy) ---
+    @property
+    def q(self):
+        return self._q
+
+    @q.setter
+    def q(self, value):
+        self.set_position(value, self._r)
+
+    @property
+    def r(self):
+        return self._r
+
+    @r.setter
+    def r(self, value):
+        self.set_position(self._q, value)
+
+    @property
+    def owner(self):
+        return self._owner
+
+    @owner.setter
+    def owner(self, value):
+        old_owner = self._owner
+        self._owner = value
+        self.owner_player, self.faction = owner_identity(value)
+        if self._board is not None and old_owner != value:
+            self._board._on_token_owner_changed(self, old_owner)
+
     def set_position(self, q: int, r: int):
-        self.q = q
-        self.r = r
+        old_q, old_r = self._q, self._r
+        self._q = q
+        self._r = r
+        if self._board is not None and (old_q, old_r) != (q, r):
+            self._board._on_token_moved(self, old_q, old_r)
+
+    def clone(self) -> 'Token':
+        """Kopia stanu żetonu bez podpięcia do planszy (np. dla GameEngine.clone); słownik statystyk jest współdzielony."""
+        twin = Token.__new__(Token)
+        for name in Token.__slots__:
+            if name not in ('_board', '__dict__') and hasattr(self, name):
+                setattr(twin, name, getattr(self, name))
+        twin._board = None
+        twin.__dict__.update(self.__dict__)
+        return twin
 
     def serialize(self) -> Dict[str, Any]:
         return {
@@ -89,7 +224,7 @@ class Token:
         token = Token(
             id=data['id'],
             owner=owner,
-            stats=stats,
+            stats=shared_stats(stats),
             q=q,
             r=r,
             movement_mode=movement_mode
@@ -108,7 +243,7 @@ class Token:
         token = Token(
             id=data['id'],
             owner=data['owner'],
-            stats=data['stats'],
+            stats=shared_stats(data['stats']),
             q=data.get('q'),
             r=data.get('r'),
             movement_mode=data.get('movement_mode', 'combat')
@@ -178,6 +313,34 @@ class Token:
         return True, 'ok'
 
 
+def _hashed_field(name: str) -> property:
+    """Właściwość nad slotem '_<name>' (odczyt bez narzutu Pythona, zapis zgłaszany planszy)."""
+    slot = getattr(Token, '_' + name)
+    get, put, delete = slot.__get__, slot.__set__, slot.__delete__
+
+    def fset(self, value):
+        board = self._board
+        if board is None:
+            put(self, value)
+            return
+        old = get(self) if hasattr(self, '_' + name) else None
+        put(self, value)
+        board._on_token_field_changed(self, name, old, value)
+
+    def fdel(self):
+        old = get(self)
+        delete(self)
+        if self._board is not None:
+            self._board._on_token_field_changed(self, name, old, None)
+
+    return property(get, fset, fdel)
+
+
+for _name in HASHED_FIELDS:
+    setattr(Token, _name, _hashed_field(_name))
+del _name
+
+
 def load_tokens(index_path: str, start_path: str):
     """Ładuje żetony z plików JSON (index + start) i zwraca listę obiektów Token."""
     with open(index_path, encoding='utf-8') as f:
@@ -0,0 +1,152 @@
+from collections.abc import Sequence
+from typing import Callable, Dict, Iterable, List, Optional
+from engine.token import owner_nation
+
+
+def token_nation(token) -> str:
+    """Nacja żetonu: z ownera '2 (Polska)', a gdy go brak - ze statystyk."""
+    return owner_nation(token.owner) or token.stats.get('nation', '')
+
+
+def find_token(tokens, token_id):
+    """Żeton o podanym id: O(1) dla TokenRegistry, liniowo dla zwykłej listy (np. atrapy silnika w testach)."""
+    if isinstance(tokens, TokenRegistry):
+        return tokens.get(token_id)
+    return next((t for t in tokens if t.id == token_id), None)
+
+
+class TokenRegistry(Sequence):
+    """Rejestr żetonów silnika: indeks id -> żeton oraz kubełki właściciela i nacji, wszystko O(1)
+    przy dodaniu i usunięciu. Kolejność iteracji to kolejność dodania. Dla starszego kodu rejestr
+    zachowuje się jak sekwencja (len, indeks, iteracja, in) i przyjmuje append/remove jak lista.
+
+    Słuchacze (subscribe) dostają zdarzenia: ('reset', None), ('added', żeton), ('removed', żeton),
+    ('owner_changed', żeton)."""
+
+    def __init__(self, tokens: Iterable = ()):
+        self._by_id: Dict[str, object] = {}
+        self._by_owner: Dict[str, Dict[str, object]] = {}
+        self._by_nation: Dict[str, Dict[str, object]] = {}
+        # Krotka żetonów w kolejności dodania, budowana przy pierwszym odczycie po zmianie
+        self._order: Optional[tuple] = None
+        self._listeners: List[Callable] = []
+        for token in tokens:
+            self._add(token)
+
+    # --- SEKWENCJA ---
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        # Iteracja po krotce: zmiany rejestru w trakcie pętli (eliminacje, wystawienia) jej nie psują
+        return iter(self._ordered())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._ordered()[index])
+        return self._ordered()[index]
+
+    def _ordered(self) -> tuple:
+        if self._order is None:
+            self._order = tuple(self._by_id.values())
+        return self._order
+
+    def __contains__(self, item):
+        if isinstance(item, str):
+            return item in self._by_id
+        return self._by_id.get(getattr(item, 'id', None)) is item
+
+    def __repr__(self):
+        return f"TokenRegistry({len(self)} żetonów)"
+
+    # --- ZAPYTANIA ---
+    def get(self, token_id, default=None):
+        return self._by_id.get(token_id, default)
+
+    def ids(self):
+        return self._by_id.keys()
+
+    def order(self) -> tuple:
+        """Żetony w kolejności iteracji jako niezmienna krotka (tania do zapamiętania, np. w transakcji)."""
+        return self._ordered()
+
+    def by_owner(self, owner: str) -> List:
+        return list(self._by_owner.get(owner, {}).values())
+
+    def by_nation(self, nation: str) -> List:
+        return list(self._by_nation.get(nation, {}).values())
+
+    # --- ZMIANY ---
+    def subscribe(self, listener: Callable):
+        self._listeners.append(listener)
+
+    def _notify(self, event, token):
+        for listener in self._listeners:
+            listener(event, token)
+
+    def reset(self, tokens: Iterable):
+        """Zastępuje całą zawartość rejestru (np. po wczytaniu stanu gry)."""
+        tokens = list(tokens)
+        self._by_id = {}
+        self._by_owner = {}
+        self._by_nation = {}
+        self._order = None
+        for token in tokens:
+            self._add(token)
+        self._notify('reset', None)
+
+    def add(self, token):
+        """Dodaje żeton; żeton o tym samym id zostaje zastąpiony."""
+        previous = self._by_id.get(token.id)
+        if previous is token:
+            return
+        if previous is not None:
+            self.remove(previous)
+        self._add(token)
+        self._notify('added', token)
+
+    append = add
+
+    def remove(self, token):
+        """Usuwa żeton (lub żeton o podanym id). Jak list.remove: ValueError, gdy go nie ma."""
+        token_id = token if isinstance(token, str) else token.id
+        current = self._by_id.get(token_id)
+        if current is None or (not isinstance(token, str) and current is not token):
+            raise ValueError(f"Żeton {token_id} nie jest w rejestrze")
+        del self._by_id[token_id]
+        self._unbucket(current, current.owner)
+        self._order = None
+        self._notify('removed', current)
+        return current
+
+    def discard(self, token):
+        try:
+            return self.remove(token)
+        except ValueError:
+            return None
+
+    def token_owner_changed(self, token, old_owner):
+        """Przenosi żeton do kubełków nowego właściciela (wywoływane przez Board przy zmianie ownera)."""
+        if self._by_id.get(token.id) is not token:
+            return
+        self._unbucket(token, old_owner)
+        self._bucket(token)
+        self._notify('owner_changed', token)
+
+    def _add(self, token):
+        self._by_id[token.id] = token
+        self._bucket(token)
+        self._order = None
+
+    def _bucket(self, token):
+        self._by_owner.setdefault(token.owner, {})[token.id] = token
+        self._by_nation.setdefault(token_nation(token), {})[token.id] = token
+
+    def _unbucket(self, token, owner):
+        nation = owner_nation(owner) or token.stats.get('nation', '')
+        for buckets, key in ((self._by_owner, owner), (self._by_nation, nation)):
+            bucket = buckets.get(key)
+            if bucket is not None:
+                bucket.pop(token.id, None)
+                if not bucket:
+                    del buckets[key]
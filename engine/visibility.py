@@ -0,0 +1,263 @@
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from engine.hex_utils import hex_disk_offsets
+from engine.token import faction_id, faction_of, player_key
+
+
+class _PlayerView:
+    """Stan widoczności jednego gracza: licznik żetonów widzących każdy heks siatki
+    oraz zapamiętana tymczasowa widoczność, którą już doliczono do zbiorów gracza."""
+
+    def __init__(self, player, board, commanders: Optional[List] = None):
+        self.player = player
+        self.faction = faction_id(player.nation)
+        self.is_general = commanders is not None
+        self.commanders = commanders or []
+        self.counts = np.zeros((board.grid_rows, board.grid_cols), dtype=np.int16)
+        self.temp_hexes: Set[Tuple[int, int]] = set()
+        self.temp_tokens: Set[str] = set()
+
+    def temp_source(self) -> Tuple[Set[Tuple[int, int]], Set[str]]:
+        """Tymczasowa widoczność: dowódca ma własną, generał sumuje heksy swoich dowódców."""
+        if self.is_general:
+            hexes = set()
+            for commander in self.commanders:
+                hexes |= getattr(commander, 'temp_visible_hexes', set())
+            return hexes, set()
+        return set(getattr(self.player, 'temp_visible_hexes', set())), set(getattr(self.player, 'temp_visible_tokens', set()))
+
+
+class VisibilityTracker:
+    """Przyrostowa mgła wojny. Dla każdego gracza trzyma licznik heks -> liczba własnych żetonów,
+    które go widzą; ruch, wystawienie lub eliminacja żetonu zmienia tylko różnicę dwóch dysków widzenia.
+    Generał dostaje te same różnice co dowódcy jego nacji. Reguły są takie same jak w
+    update_player_visibility/update_general_visibility z engine.engine."""
+
+    def __init__(self, board):
+        self.board = board
+        self.players: List = []
+        self.views: List[_PlayerView] = []
+        # (id gracza, id frakcji) właściciela -> widoki, którym liczą się jego żetony
+        self._views_by_owner: Dict[Tuple, List[_PlayerView]] = {}
+        # id żetonu -> (q, r, promień, (id gracza, id frakcji)) dysku doliczonego do liczników
+        self._stamps: Dict[str, Tuple[int, int, int, Tuple]] = {}
+        self.valid = False
+        board.visibility = self
+
+    @staticmethod
+    def for_board(board) -> 'VisibilityTracker':
+        tracker = getattr(board, 'visibility', None)
+        if tracker is None:
+            tracker = VisibilityTracker(board)
+        return tracker
+
+    # --- PEŁNE PRZELICZENIE ---
+    def update(self, players, all_tokens):
+        """Uzgadnia widoczność graczy: przy zmianie graczy lub listy żetonów liczy wszystko od zera,
+        w przeciwnym razie dolicza tylko zmiany tymczasowej widoczności (temp_visible_*)."""
+        players = list(players)
+        tracked = all_tokens is self.board.tokens and len(all_tokens) == len(self.board._tokens_by_id)
+        if self.valid and tracked and len(players) == len(self.players) and all(a is b for a, b in zip(players, self.players)):
+            for view in self.views:
+                self._sync_temp(view)
+            return
+        self.rebuild(players, all_tokens)
+        self.valid = tracked
+
+    def rebuild(self, players, all_tokens):
+        board = self.board
+        self.players = list(players)
+        self.views = []
+        self._views_by_owner = {}
+        self._stamps = {}
+        commander_views = {}
+        for player in self.players:
+            if player.role.lower() == 'dowódca':
+                view = _PlayerView(player, board)
+                commander_views[(player_key(player.id), view.faction)] = view
+                self.views.append(view)
+        for player in self.players:
+            role = player.role.lower()
+            if role == 'generał':
+                commanders = [v.player for v in commander_views.values() if v.player.nation == player.nation]
+                view = _PlayerView(player, board, commanders)
+                for owner, commander_view in commander_views.items():
+                    if commander_view.player.nation == player.nation:
+                        self._views_by_owner.setdefault(owner, []).append(view)
+                self.views.append(view)
+            elif role != 'dowódca':
+                self.views.append(_PlayerView(player, board))
+        for owner, view in commander_views.items():
+            self._views_by_owner.setdefault(owner, []).insert(0, view)
+        for token in all_tokens:
+            self._stamp(token, +1, track_changes=False)
+        for view in self.views:
+            view.temp_hexes, view.temp_tokens = view.temp_source()
+            hexes = board.mask_to_hexes((view.counts > 0) & board.valid_grid) | view.temp_hexes
+            view.player.visible_hexes = hexes
+            view.player.visible_tokens = {t.id for t in all_tokens if self._sees(view, t)}
+
+    def invalidate(self):
+        """Wymusza pełne przeliczenie przy najbliższym update()."""
+        self.valid = False
+
+    # --- ZDARZENIA Z PLANSZY ---
+    def tokens_reset(self):
+        self.valid = False
+
+    def token_added(self, token):
+        if not self.valid:
+            return
+        self._stamp(token, +1)
+        self._refresh_token(token)
+
+    def token_removed(self, token):
+        if not self.valid:
+            return
+        self._unstamp(token.id)
+        for view in self.views:
+            if token.id not in view.temp_tokens:
+                view.player.visible_tokens.discard(token.id)
+
+    def token_changed(self, token):
+        """Zmiana pozycji lub właściciela: zdejmij stary dysk, nałóż nowy."""
+        if not self.valid:
+            return
+        # Najpierw nowy dysk, potem zdjęcie starego: wspólna część dysków nie znika nawet chwilowo
+        old_stamp = self._stamps.pop(token.id, None)
+        self._stamp(token, +1)
+        if old_stamp is not None:
+            self._apply(old_stamp, -1, True)
+        self._refresh_token(token)
+
+    # --- LICZNIKI ---
+    def _stamp(self, token, sign, track_changes=True):
+        if token.q is None or token.r is None:
+            return
+        stamp = (token.q, token.r, token.stats.get('sight', 0), (token.owner_player, token.faction))
+        self._stamps[token.id] = stamp
+        self._apply(stamp, sign, track_changes)
+
+    def _unstamp(self, token_id):
+        stamp = self._stamps.pop(token_id, None)
+        if stamp is not None:
+            self._apply(stamp, -1, True)
+
+    def _apply(self, stamp, sign, track_changes):
+        q, r, radius, owner = stamp
+        views = self._views_by_owner.get(owner)
+        if not views or radius < 0:
+            return
+        window = self.board.vision_window(q, r, radius)
+        if window is None:
+            return
+        region, stencil = window
+        delta = stencil.astype(np.int16) * sign
+        for view in views:
+            counts = view.counts[region]
+            if not track_changes:
+                counts += delta
+                continue
+            before = counts > 0
+            counts += delta
+            changed = (before != (counts > 0)) & stencil & self.board.valid_grid[region]
+            if not changed.any():
+                continue
+            rows, cols = np.nonzero(changed)
+            rows += region[0].start
+            cols += region[1].start
+            hexes = list(zip(self.board.q_grid[rows, cols].tolist(), self.board.r_grid[rows, cols].tolist()))
+            if sign > 0:
+                self._gain_hexes(view, hexes)
+            else:
+                self._lose_hexes(view, [h for h in hexes if h not in view.temp_hexes])
+
+    def _count(self, view, hex_coords) -> int:
+        idx = self.board.hex_id(*hex_coords)
+        if idx < 0:
+            return 0
+        return int(view.counts.flat[idx])
+
+    # --- ZBIORY GRACZA ---
+    def _sees(self, view, token) -> bool:
+        if view.is_general:
+            # Generał widzi wszystkie żetony swojej nacji i wrogie na widocznych heksach
+            if not token.owner:
+                return False
+            if token.faction == view.faction:
+                return True
+            return (token.q, token.r) in view.player.visible_hexes
+        return token.id in view.temp_tokens or (token.q, token.r) in view.player.visible_hexes
+
+    def _refresh_token(self, token):
+        for view in self.views:
+            if self._sees(view, token):
+                view.player.visible_tokens.add(token.id)
+            else:
+                view.player.visible_tokens.discard(token.id)
+
+    def _gain_hexes(self, view, hexes):
+        view.player.visible_hexes.update(hexes)
+        for q, r in hexes:
+            for token in self.board.tokens_at(q, r):
+                if self._sees(view, token):
+                    view.player.visible_tokens.add(token.id)
+
+    def _lose_hexes(self, view, hexes):
+        view.player.visible_hexes.difference_update(hexes)
+        for q, r in hexes:
+            for token in self.board.tokens_at(q, r):
+                if not self._sees(view, token):
+                    view.player.visible_tokens.discard(token.id)
+
+    def _sync_temp(self, view):
+        hexes, tokens = view.temp_source()
+        gained = hexes - view.temp_hexes
+        dropped = view.temp_hexes - hexes
+        dropped_tokens = view.temp_tokens - tokens
+        view.temp_hexes, view.temp_tokens = hexes, tokens
+        if gained:
+            self._gain_hexes(view, gained)
+        if dropped:
+            self._lose_hexes(view, [h for h in dropped if self._count(view, h) == 0])
+        view.player.visible_tokens |= tokens
+        for token_id in dropped_tokens:
+            token = self.board.get_token(token_id)
+            if token is None or not self._sees(view, token):
+                view.player.visible_tokens.discard(token_id)
+
+
+class PathVision:
+    """Widzenie żetonu wzdłuż ścieżki ruchu. Indeks heks -> wrogie żetony budowany jest raz na ruch,
+    więc sprawdzenie kroku kosztuje O(rozmiar dysku) zamiast skanu wszystkich żetonów,
+    a odkryte heksy to jedna suma dysków kroków faktycznie przebytej trasy."""
+
+    def __init__(self, board, token, tokens, sight: Optional[int] = None):
+        self.board = board
+        self.sight = token.stats.get('sight', 0) if sight is None else sight
+        self.offsets = hex_disk_offsets(self.sight) if self.sight >= 0 else ()
+        self.enemies: Dict[Tuple[int, int], List[str]] = {}
+        if token.owner:
+            faction = faction_of(token)
+            for t in tokens:
+                if t.owner and t.q is not None and t.r is not None and faction_of(t) != faction:
+                    self.enemies.setdefault((t.q, t.r), []).append(t.id)
+
+    def sees_enemy(self, position: Tuple[int, int]) -> bool:
+        """Czy z danego heksa w zasięgu widzenia jest jakikolwiek wrogi żeton."""
+        if not self.enemies:
+            return False
+        if len(self.enemies) < len(self.offsets):
+            return any(self.board.hex_distance(position, pos) <= self.sight for pos in self.enemies)
+        q, r = position
+        return any((q + dq, r + dr) in self.enemies for dq, dr in self.offsets)
+
+    def reveal(self, path: List[Tuple[int, int]]) -> Tuple[Set[Tuple[int, int]], Set[str]]:
+        """Heksy mapy widziane z dowolnego kroku ścieżki oraz wrogie żetony stojące na nich."""
+        seen = {(q + dq, r + dr) for q, r in path for dq, dr in self.offsets}
+        hexes = {h for h in seen if self.board.get_tile(*h) is not None}
+        token_ids = set()
+        for pos, ids in self.enemies.items():
+            if pos in hexes:
+                token_ids.update(ids)
+        return hexes, token_ids
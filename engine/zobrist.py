@@ -0,0 +1,40 @@
+import hashlib
+from functools import lru_cache, reduce
+from operator import xor
+from engine.token import HASHED_FIELDS
+
+
+@lru_cache(maxsize=1 << 18)
+def zobrist_key(*parts) -> int:
+    """Losowy (ale stały między procesami i maszynami) 64-bitowy klucz Zobrista dla krotki (obiekt, pole, wartość).
+
+    Skrót stanu to XOR kluczy wszystkich par pole-wartość, więc zmiana jednego pola to dwa XOR-y:
+    usunięcie klucza starej wartości i dodanie klucza nowej."""
+    data = "\x1f".join(repr(part) for part in parts)
+    return int.from_bytes(hashlib.blake2b(data.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def token_hash(token) -> int:
+    """Wkład żetonu do skrótu planszy: pozycja, właściciel i pola z HASHED_FIELDS."""
+    token_id = token.id
+    h = zobrist_key(token_id, 'pos', token.q, token.r) ^ zobrist_key(token_id, 'owner', token.owner)
+    for name in HASHED_FIELDS:
+        h ^= zobrist_key(token_id, name, getattr(token, name, None))
+    return h
+
+
+def key_point_hash(hex_id, kp) -> int:
+    return zobrist_key('key_point', hex_id, kp.get('current_value'))
+
+
+def turn_hash(turn, current_player, current_player_id) -> int:
+    return zobrist_key('turn', turn) ^ zobrist_key('current_player', current_player, current_player_id)
+
+
+def full_state_hash(engine) -> int:
+    """Skrót stanu liczony od zera (O(n)). Powinien być zawsze równy przyrostowemu GameEngine.state_hash;
+    różnica oznacza zmianę stanu z pominięciem setterów (np. bezpośredni zapis do slotu żetonu)."""
+    tokens = reduce(xor, (token_hash(t) for t in engine.tokens), 0)
+    key_points = reduce(xor, (key_point_hash(k, v) for k, v in engine.key_points_state.items()), 0)
+    player = getattr(engine, 'current_player_obj', None)
+    return tokens ^ key_points ^ turn_hash(engine.turn, engine.current_player, getattr(player, 'id', None))
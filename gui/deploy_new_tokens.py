@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox
 from pathlib import Path
+from gui.sprite_cache import get_token_sprite
 
 class DeployNewTokensWindow(tk.Toplevel):
     def __init__(self, parent, gracz, panel_dowodcy=None):
@@ -52,7 +53,6 @@ class DeployNewTokensWindow(tk.Toplevel):
         super().destroy()
 
     def _load_new_tokens(self):
-        from PIL import Image, ImageTk
         folder = Path(f"assets/tokens/nowe_dla_{self.gracz.id}/")
         self.selected_token_path = None  # Dodane: reset wyboru przy każdym ładowaniu
         for widget in self.tokens_frame.winfo_children():
@@ -76,11 +76,7 @@ class DeployNewTokensWindow(tk.Toplevel):
                 found = True
                 img_path = sub / "token.png"
                 if img_path.exists():
-                    try:
-                        img = Image.open(img_path).resize((60, 60), Image.LANCZOS)
-                        photo = ImageTk.PhotoImage(img)
-                    except Exception:
-                        photo = None
+                    photo = get_token_sprite(img_path, 60)
                 else:
                     photo = None
                 if photo:
@@ -0,0 +1,188 @@
+import math
+from PIL import Image, ImageDraw
+from engine.hex_utils import get_hex_vertices
+
+__all__ = ["MapOverlayRenderer"]
+
+# Odpowiedniki dawnych wzorków stipple: gray25 ~ 25% krycia, gray50 ~ 50%
+SPAWN_COLORS = {
+    'Polska': (255, 85, 85),
+    'Niemcy': (85, 85, 255),
+}
+SPAWN_DEFAULT_COLOR = (204, 204, 204)
+SPAWN_ALPHA = 64
+SPECIAL_COLOR = (182, 255, 182)
+SPECIAL_ALPHA = 64
+SPECIAL_TYPES = {'most', 'miasto', 'fortyfikacja', 'węzeł komunikacyjny'}
+FOG_COLOR = (34, 34, 34)
+FOG_ALPHA = 128
+GRID_COLOR = (255, 0, 0, 255)
+
+
+class MapOverlayRenderer:
+    """Rastrowa nakładka mapy: tło, podświetlenie spawnów, siatka heksów, mgła wojny i punkty specjalne
+    składane w jeden obraz RGBA (Pillow). Obraz dzielony jest na kafle TILE x TILE; zmiana widoczności
+    lub punktów kluczowych oznacza jako brudne tylko kafle pod zmienionymi heksami, a flush() składa
+    wyłącznie brudne kafle w zadanym oknie widoku (reszta czeka, aż zostanie przewinięta na ekran)."""
+
+    TILE = 256
+
+    def __init__(self, board, background=None, size=None):
+        self.board = board
+        if background is not None:
+            self.background = background.convert("RGBA")
+        else:
+            self.background = Image.new("RGBA", size, (0, 0, 0, 0))
+        self.size = self.background.size
+        width, height = self.size
+        self._boxes = {}
+        self._masks = {}
+        self._polygons = {}
+        # Indeks przestrzenny: kafel (tx, ty) -> heksy, których prostokąt go przecina
+        self._tile_hexes = {}
+        s = board.hex_size
+        for tile in board.terrain.values():
+            cx, cy = board.hex_to_pixel(tile.q, tile.r)
+            verts = get_hex_vertices(cx, cy, s)
+            left = max(0, math.floor(min(x for x, _ in verts)))
+            top = max(0, math.floor(min(y for _, y in verts)))
+            right = min(width, math.ceil(max(x for x, _ in verts)) + 1)
+            bottom = min(height, math.ceil(max(y for _, y in verts)) + 1)
+            if left >= right or top >= bottom:
+                continue
+            mask = Image.new("L", (right - left, bottom - top), 0)
+            ImageDraw.Draw(mask).polygon([(x - left, y - top) for x, y in verts], fill=255)
+            key = (tile.q, tile.r)
+            self._boxes[key] = (left, top, right, bottom)
+            self._masks[key] = mask
+            self._polygons[key] = verts
+            # Siatka i mgła tylko dla heksów, których środek leży na tle (jak dawniej na canvasie)
+            if not (0 <= cx <= width and 0 <= cy <= height):
+                self._polygons[key] = None
+            for tile_key in self._tiles_in(self._boxes[key]):
+                self._tile_hexes.setdefault(tile_key, []).append(key)
+        self.spawn_hexes = {}
+        for nation, hex_list in getattr(board, 'spawn_points', {}).items():
+            color = SPAWN_COLORS.get(nation, SPAWN_DEFAULT_COLOR)
+            for hex_id in hex_list:
+                coords = board.key_to_coords(hex_id)
+                if coords in self._boxes:
+                    self.spawn_hexes[coords] = color
+        self.special_hexes = self._special_hexes()
+        self.fogged = {key for key, verts in self._polygons.items() if verts is not None}
+        self._fog_solid = Image.new("RGBA", self.size, FOG_COLOR + (255,))
+        self._fog_alpha = Image.new("L", self.size, 0)
+        for key in self.fogged:
+            self._fog_alpha.paste(FOG_ALPHA, self._boxes[key], self._masks[key])
+        self._static = self.background.copy()
+        self._static_tiles = set()
+        self.image = Image.new("RGBA", self.size, (0, 0, 0, 0))
+        self._dirty_tiles = set(self._tiles_in((0, 0, width, height)))
+
+    def _special_hexes(self):
+        result = set()
+        for hex_id, point in getattr(self.board, 'key_points', {}).items():
+            type_str = point.get('type', '').lower() if isinstance(point, dict) else str(point).lower()
+            if type_str in SPECIAL_TYPES:
+                coords = self.board.key_to_coords(hex_id)
+                if coords in self._boxes and self._polygons.get(coords) is not None:
+                    result.add(coords)
+        return result
+
+    # --- INDEKS PRZESTRZENNY ---
+    def _tiles_in(self, box):
+        left, top, right, bottom = box
+        t = self.TILE
+        return [
+            (tx, ty)
+            for tx in range(max(0, left) // t, (max(0, right - 1)) // t + 1)
+            for ty in range(max(0, top) // t, (max(0, bottom - 1)) // t + 1)
+        ]
+
+    def _tile_box(self, tile_key):
+        tx, ty = tile_key
+        t = self.TILE
+        return (tx * t, ty * t, min(self.size[0], (tx + 1) * t), min(self.size[1], (ty + 1) * t))
+
+    def hexes_in(self, box):
+        """Heksy, których prostokąt przecina box (lewy, górny, prawy, dolny) w pikselach mapy."""
+        left, top, right, bottom = box
+        result = set()
+        for tile_key in self._tiles_in(box):
+            for key in self._tile_hexes.get(tile_key, ()):
+                l, t, r, b = self._boxes[key]
+                if l < right and r > left and t < bottom and b > top:
+                    result.add(key)
+        return result
+
+    # --- SKŁADANIE ---
+    def _tint(self, image, origin, key, color, alpha):
+        """Nakłada półprzezroczysty kolor na heks (współrzędne obrazu przesunięte o origin)."""
+        left, top, right, bottom = self._boxes[key]
+        box = (left - origin[0], top - origin[1], right - origin[0], bottom - origin[1])
+        region = image.crop(box)
+        solid = Image.new("RGBA", region.size, color + (255,))
+        mask = self._masks[key].point(lambda p: p * alpha // 255)
+        image.paste(Image.composite(solid, region, mask), box[:2])
+
+    def _render_static(self, box):
+        """Warstwa pod mgłą: tło, podświetlenie spawnów i kontury heksów w prostokącie box."""
+        region = self.background.crop(box)
+        keys = self.hexes_in(box)
+        for key in keys:
+            if key in self.spawn_hexes:
+                self._tint(region, box[:2], key, self.spawn_hexes[key], SPAWN_ALPHA)
+        draw = ImageDraw.Draw(region)
+        for key in keys:
+            verts = self._polygons[key]
+            if verts is not None:
+                draw.polygon([(x - box[0], y - box[1]) for x, y in verts], outline=GRID_COLOR)
+        self._static.paste(region, box[:2])
+
+    def _compose_tile(self, tile_key):
+        """Składa gotowy kafel: warstwa statyczna, mgła, punkty specjalne."""
+        box = self._tile_box(tile_key)
+        if tile_key not in self._static_tiles:
+            self._render_static(box)
+            self._static_tiles.add(tile_key)
+        region = Image.composite(self._fog_solid.crop(box), self._static.crop(box), self._fog_alpha.crop(box))
+        for key in self.special_hexes.intersection(self._tile_hexes.get(tile_key, ())):
+            self._tint(region, box[:2], key, SPECIAL_COLOR, SPECIAL_ALPHA)
+        self.image.paste(region, box[:2])
+
+    def _mark_dirty(self, keys):
+        for key in keys:
+            self._dirty_tiles.update(self._tiles_in(self._boxes[key]))
+
+    def flush(self, viewport=None) -> bool:
+        """Składa brudne kafle przecinające viewport (wszystkie, gdy None). Zwraca True, jeśli obraz się zmienił."""
+        if viewport is None:
+            tiles = list(self._dirty_tiles)
+        else:
+            tiles = [t for t in self._tiles_in(viewport) if t in self._dirty_tiles]
+        for tile_key in tiles:
+            self._compose_tile(tile_key)
+        self._dirty_tiles.difference_update(tiles)
+        return bool(tiles)
+
+    def set_visible(self, visible_hexes, viewport=None) -> bool:
+        """Ustawia mgłę na heksach spoza visible_hexes i składa brudne kafle w viewport.
+        Zwraca True, jeśli obraz się zmienił."""
+        fogged = {key for key in self._polygons if self._polygons[key] is not None and key not in visible_hexes}
+        changed = fogged ^ self.fogged
+        if changed:
+            self.fogged = fogged
+            for key in changed:
+                value = FOG_ALPHA if key in fogged else 0
+                self._fog_alpha.paste(value, self._boxes[key], self._masks[key])
+            self._mark_dirty(changed)
+        return self.flush(viewport)
+
+    def refresh_key_points(self, viewport=None) -> bool:
+        """Usuwa podświetlenie wyczerpanych punktów kluczowych. Zwraca True, jeśli obraz się zmienił."""
+        special = self._special_hexes()
+        changed = special ^ self.special_hexes
+        if changed:
+            self.special_hexes = special
+            self._mark_dirty(changed)
+        return self.flush(viewport)
@@ -281,6 +281,11 @@ class PanelDowodcy:
                 token.combat_value = ile_combat
             if token.combat_value > max_combat:
                 token.combat_value = max_combat
+            if hasattr(self.game_engine, 'record'):
+                self.game_engine.record('resupply', token_id=token.id, fuel=ile_fuel, combat=ile_combat)
+            # Cofnięcie ruchu sprzed uzupełnienia wymazałoby je (punkty są już odjęte)
+            if getattr(self, 'panel_mapa', None) is not None:
+                self.panel_mapa.clear_undo()
             if callback:
                 callback(ile_fuel, ile_combat)
             # Odśwież UI po uzupełnieniu: panel mapy (markery paliwa/MP) i panel informacji o żetonie
@@ -51,7 +51,7 @@ class PanelGracza(tk.Frame):
         btn_frame.pack(pady=8)
 
         from tkinter import messagebox, filedialog
-        from engine.save_manager import save_game, load_game
+        from engine.save_manager import capture_save, write_save, load_game
 
         def on_save():
             import os
@@ -71,30 +71,49 @@ class PanelGracza(tk.Frame):
             role = str(role).replace(' ', '_')
             nation = str(nation).replace(' ', '_')
             player_id = str(player_id)
-            default_name = f"save_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{role}{player_id}_{nation}.json"
+            default_name = f"save_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{role}{player_id}_{nation}.sav"
             path = filedialog.asksaveasfilename(
-                defaultextension='.json',
-                filetypes=[('Plik zapisu', '*.json')],
+                defaultextension='.sav',
+                filetypes=[('Plik zapisu', '*.sav *.json')],
                 initialdir=saves_dir,
                 initialfile=default_name
             )
             if not path:
                 # Jeśli użytkownik anuluje, nie zapisuj
                 return
-            try:
-                save_game(path, self.game_engine, self.player)
+            def report(error):
                 from tkinter import messagebox
-                messagebox.showinfo("Zapis gry", f"Gra została zapisana jako:\n{os.path.basename(path)}")
+                if error is None:
+                    messagebox.showinfo("Zapis gry", f"Gra została zapisana jako:\n{os.path.basename(path)}")
+                else:
+                    messagebox.showerror("Błąd zapisu", str(error))
+
+            try:
+                # Kopia stanu teraz, zapis pliku w wątku zapisu automatycznego (GUI nie czeka na dysk)
+                state = capture_save(self.game_engine, self.player)
+                autosave = getattr(self.game_engine, 'autosave', None)
+                if autosave is None:
+                    write_save(path, state)
+                    report(None)
+                    return
+                future = autosave.submit(write_save, path, state)
             except Exception as e:
-                from tkinter import messagebox
-                messagebox.showerror("Błąd zapisu", str(e))
+                report(e)
+                return
+
+            def poll():
+                if future.done():
+                    report(future.exception())
+                else:
+                    self.after(100, poll)
+            poll()
 
         def on_load():
             import os
             saves_dir = os.path.join(os.getcwd(), 'saves')
             os.makedirs(saves_dir, exist_ok=True)
             path = filedialog.askopenfilename(
-                filetypes=[('Plik zapisu', '*.json')],
+                filetypes=[('Plik zapisu', '*.sav *.json')],
                 initialdir=saves_dir
             )
             if path:
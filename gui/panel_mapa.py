@@ -1,10 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, simpledialog
 from engine.hex_utils import get_hex_vertices
+from gui.sprite_cache import get_token_sprite
+from gui.map_overlay import MapOverlayRenderer
+from engine.token_registry import find_token
+from engine.token import faction_id, faction_of, is_owned_by, owner_identity, player_key
 from PIL import Image, ImageTk
 import os
 
 class PanelMapa(tk.Frame):
+    # Zapas wokół widocznej części mapy (px), w którym elementy są dorysowywane z wyprzedzeniem
+    VIEWPORT_MARGIN = 200
+
     def __init__(self, parent, game_engine, bg_path: str, player_nation: str, width=800, height=600, token_info_panel=None, panel_dowodcy=None):
         super().__init__(parent)
         self.game_engine = game_engine
@@ -23,23 +30,22 @@ class PanelMapa(tk.Frame):
         self.canvas = tk.Canvas(self, width=width, height=height)
         hbar = tk.Scrollbar(self, orient="horizontal", command=self.canvas.xview)
         vbar = tk.Scrollbar(self, orient="vertical",   command=self.canvas.yview)
-        self.canvas.configure(xscrollcommand=hbar.set, yscrollcommand=vbar.set)
+        self._hbar, self._vbar = hbar, vbar
+        self.canvas.configure(xscrollcommand=self._on_xscroll, yscrollcommand=self._on_yscroll)
         self.canvas.grid(row=0, column=0, sticky="nsew")
         hbar.grid(row=1, column=0, sticky="ew")
         vbar.grid(row=0, column=1, sticky="ns")
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
-        # tło mapy - jeśli nie podano lub plik nie istnieje, nie ustawiaj tła
+        # tło mapy - jeśli nie podano lub plik nie istnieje, nakładka powstaje na pustym płótnie
         if bg_path and os.path.exists(bg_path):
-            bg = Image.open(bg_path)
-            self._bg = ImageTk.PhotoImage(bg)
-            self.canvas.create_image(0, 0, anchor="nw", image=self._bg)
-            self.canvas.config(scrollregion=(0, 0, bg.width, bg.height))
-            self._bg_width = bg.width
-            self._bg_height = bg.height
+            self._bg_source = Image.open(bg_path)
+            self.canvas.config(scrollregion=(0, 0, self._bg_source.width, self._bg_source.height))
+            self._bg_width = self._bg_source.width
+            self._bg_height = self._bg_source.height
         else:
-            self._bg = None
+            self._bg_source = None
             self._bg_width = width
             self._bg_height = height
             self.canvas.config(scrollregion=(0, 0, width, height))
@@ -50,13 +56,24 @@ class PanelMapa(tk.Frame):
         # kliknięcia
         self.canvas.bind("<Button-1>", self._on_click)
         self.canvas.bind("<Button-3>", self._on_right_click_token)
+        # Cofanie ruchu (Ctrl+Z): migawki silnika sprzed ruchów, kasowane po każdej walce (atak, ogień
+        # reakcyjny wroga) oraz przy zmianie tury lub gracza (_undo_context)
+        self._undo_stack = []
+        self._undo_key = None
+        self.canvas.bind_all("<Control-z>", lambda _e: self.undo_last_move())
 
         # żetony
         self.token_images = {}
-        # mapowanie token_id -> canvas item id (dla markerów statusu ruchu)
+        # mapowanie token_id -> canvas item id (elementy żetonów tworzone raz i przesuwane)
         self._token_canvas_items = {}
+        # token_id -> (x, y, obrazek) ostatnio nadane elementowi żetonu
+        self._token_render_state = {}
+        # obwódka zaznaczonego żetonu (jeden element canvasu)
+        self._selection_item = None
         # markery statusu ruchu (token_id -> marker canvas id)
         self._move_status_markers = {}
+        # klucz ostatnio narysowanej warstwy żetonów (pominięcie odświeżenia bez zmian)
+        self._token_layer_key = None
         self._draw_tokens_on_map()
         # Aktywuj podgląd hover dla generała i dowódców jeśli dostępny player w silniku
         try:
@@ -68,6 +85,8 @@ class PanelMapa(tk.Frame):
 
     def set_active_commander(self, commander_id):
         """Ustawia aktywnego dowódcę dla efektu przezroczystości żetonów"""
+        if commander_id != self.active_commander_id:
+            self._undo_stack = []
         self.active_commander_id = commander_id
         self._draw_tokens_on_map()  # Odśwież wyświetlanie żetonów
 
@@ -85,10 +104,9 @@ class PanelMapa(tk.Frame):
         
         # Znajdź wszystkie jednostki gracza
         player_tokens = []
-        expected_owner = f"{self.player.id} ({self.player.nation})"
         
         for token in self.tokens:
-            if hasattr(token, 'owner') and token.owner == expected_owner:
+            if is_owned_by(token, self.player):
                 if token.q is not None and token.r is not None:
                     player_tokens.append(token)
         
@@ -129,15 +147,12 @@ class PanelMapa(tk.Frame):
         if not nation:
             return
         nation_tokens = []
-        # Szukamy po owner (format: "<id> (Nacja)") oraz po stats['nation'] jako fallback
-        marker = f"({nation})"
+        # Szukamy po frakcji ownera (format: "<id> (Nacja)") oraz po stats['nation'] jako fallback
+        faction = faction_id(nation)
         for token in self.tokens:
             if token.q is None or token.r is None:
                 continue
-            try:
-                owner_ok = (hasattr(token, 'owner') and token.owner.endswith(marker))
-            except Exception:
-                owner_ok = False
+            owner_ok = faction_of(token) == faction
             nation_ok = False
             try:
                 nation_ok = (token.stats.get('nation') == nation)
@@ -166,13 +181,14 @@ class PanelMapa(tk.Frame):
         if not commander_id:
             return
         commander_tokens = []
-        marker_suffix = f"({nation})" if nation else ''
-        prefix = f"{commander_id} "  # owner zwykle: '2 (Polska)'
+        faction = faction_id(nation) if nation else None
+        commander = player_key(commander_id)  # owner zwykle: '2 (Polska)'
         for token in self.tokens:
             if token.q is None or token.r is None:
                 continue
-            if hasattr(token, 'owner') and token.owner.startswith(prefix):
-                if marker_suffix and not token.owner.endswith(marker_suffix):
+            owner_player, owner_faction = owner_identity(getattr(token, 'owner', None))
+            if owner_player == commander:
+                if faction is not None and owner_faction != faction:
                     continue
                 commander_tokens.append(token)
         if not commander_tokens:
@@ -197,108 +213,83 @@ class PanelMapa(tk.Frame):
             self.player = self.game_engine.current_player_obj
 
     def _draw_hex_grid(self):
+        """Warstwa heksów jako jeden obraz: tło, spawny, siatka, mgła i punkty specjalne są składane
+        w Pillow (MapOverlayRenderer), a przy odświeżeniu przeskładane są tylko heksy, których stan się zmienił."""
         self._sync_player_from_engine()
-        self.canvas.delete("hex")
-        self.canvas.delete("fog")
-        self.canvas.delete("spawn_overlay")  # Usuwamy stare nakładki spawnów
-        s = self.map_model.hex_size
+        if getattr(self, '_map_overlay', None) is None:
+            self._build_map_overlay()
         visible_hexes = set()
         if hasattr(self, 'player') and hasattr(self.player, 'visible_hexes'):
             visible_hexes = set((int(q), int(r)) for q, r in self.player.visible_hexes)
         # Dodaj tymczasową widoczność (odkryte w tej turze)
         if hasattr(self.player, 'temp_visible_hexes'):
             visible_hexes |= set((int(q), int(r)) for q, r in self.player.temp_visible_hexes)
-        fogged = []
-        for key, tile in self.map_model.terrain.items():
-            if isinstance(key, tuple) and len(key) == 2:
-                q, r = key
-            else:
-                q, r = map(int, str(key).split(','))
-            cx, cy = self.map_model.hex_to_pixel(q, r)
-            if 0 <= cx <= self._bg_width and 0 <= cy <= self._bg_height:
-                if (int(q), int(r)) not in visible_hexes:
-                    fogged.append((int(q), int(r)))
-        # --- PODŚWIETLANIE SPAWNÓW ---
-        spawn_colors = {
-            'Polska': '#ff5555',   # półprzezroczysty czerwony
-            'Niemcy': '#5555ff',   # półprzezroczysty niebieski
-        }
-        spawn_points = getattr(self.map_model, 'spawn_points', {})
-        for nation, hex_list in spawn_points.items():
-            color = spawn_colors.get(nation, '#cccccc')
-            for hex_id in hex_list:
-                if ',' in hex_id:
-                    try:
-                        q, r = map(int, hex_id.split(','))
-                    except Exception:
-                        continue
-                else:
-                    continue
-                cx, cy = self.map_model.hex_to_pixel(q, r)
-                verts = get_hex_vertices(cx, cy, s)
-                flat = [coord for p in verts for coord in p]
-                self.canvas.create_polygon(
-                    flat,
-                    fill=color,
-                    outline='',
-                    stipple='gray25',
-                    tags='spawn_overlay'
-                )
-        for key, tile in self.map_model.terrain.items():
-            # Obsługa kluczy tuple (q, r) lub string "q,r"
-            if isinstance(key, tuple) and len(key) == 2:
-                q, r = int(key[0]), int(key[1])
-            else:
-                q, r = map(int, str(key).split(','))
-            cx, cy = self.map_model.hex_to_pixel(q, r)
-            if 0 <= cx <= self._bg_width and 0 <= cy <= self._bg_height:
-                verts = get_hex_vertices(cx, cy, s)
-                flat = [coord for p in verts for coord in p]
-                self.canvas.create_polygon(
-                    flat,
-                    outline="red",
-                    fill="",
-                    width=1,
-                    tags="hex"
-                )
-                # Rysuj mgiełkę tylko jeśli (q, r) nie jest w visible_hexes (upewnij się, że tuple intów)
-                if (q, r) not in visible_hexes:
-                    self.canvas.create_polygon(
-                        flat,
-                        fill="#222222",
-                        stipple="gray50",
-                        outline="",
-                        tags="fog"
-                    )
-        # --- PODŚWIETLANIE PUNKTÓW SPECJALNYCH (mosty, miasta, fortyfikacje, węzły) ---
-        key_points = getattr(self.map_model, 'key_points', {})
-        special_types = {'most', 'miasto', 'fortyfikacja', 'węzeł komunikacyjny'}
-        for hex_id, point_type in key_points.items():
-            # point_type to dict, np. {'type': 'miasto', 'value': 100}
-            type_str = point_type.get('type', '').lower() if isinstance(point_type, dict) else str(point_type).lower()
-            if type_str in special_types:
-                if isinstance(hex_id, tuple) and len(hex_id) == 2:
-                    q, r = int(hex_id[0]), int(hex_id[1])
-                else:
-                    q, r = map(int, str(hex_id).split(','))
-                cx, cy = self.map_model.hex_to_pixel(q, r)
-                if 0 <= cx <= self._bg_width and 0 <= cy <= self._bg_height:
-                    verts = get_hex_vertices(cx, cy, s)
-                    flat = [coord for p in verts for coord in p]
-                    # Bardzo delikatna zielona mgiełka (jasna, półprzezroczysta, lekki wzorek)
-                    self.canvas.create_polygon(
-                        flat,
-                        fill='#b6ffb6',  # bardzo jasna zieleń
-                        outline='',
-                        stipple='gray25',  # bardzo delikatna mgiełka
-                        tags='special_point_overlay'
-                    )
+        viewport = self._viewport_box()
+        changed = self._map_overlay.set_visible(visible_hexes, viewport)
+        # Usuń nakładki wyczerpanych punktów kluczowych
+        changed = self._map_overlay.refresh_key_points(viewport) or changed
+        if changed:
+            self._bg.paste(self._map_overlay.image)
+
+    def _viewport_box(self):
+        """Prostokąt widocznej części canvasu (piksele mapy) powiększony o VIEWPORT_MARGIN."""
+        try:
+            left = self.canvas.canvasx(0)
+            top = self.canvas.canvasy(0)
+            width = self.canvas.winfo_width()
+            height = self.canvas.winfo_height()
+            if width <= 1 or height <= 1:
+                # Canvas jeszcze nie zmapowany - bierzemy rozmiar zadany przy tworzeniu
+                width = int(self.canvas.cget('width'))
+                height = int(self.canvas.cget('height'))
+        except (tk.TclError, TypeError, ValueError):
+            return None
+        m = self.VIEWPORT_MARGIN
+        return (int(left) - m, int(top) - m, int(left + width) + m, int(top + height) + m)
+
+    def _in_viewport(self, x, y, viewport):
+        return viewport is None or (viewport[0] <= x <= viewport[2] and viewport[1] <= y <= viewport[3])
+
+    def _on_xscroll(self, first, last):
+        self._hbar.set(first, last)
+        self._schedule_viewport_update()
+
+    def _on_yscroll(self, first, last):
+        self._vbar.set(first, last)
+        self._schedule_viewport_update()
+
+    def _schedule_viewport_update(self):
+        # Wiele zdarzeń przewijania w jednej klatce składamy w jedno doładowanie widoku
+        if not getattr(self, '_viewport_update_pending', False):
+            self._viewport_update_pending = True
+            self.after_idle(self._on_viewport_changed)
+
+    def _on_viewport_changed(self):
+        """Doładowanie po przewinięciu: brudne kafle nakładki i żetony, które weszły w widok."""
+        self._viewport_update_pending = False
+        overlay = getattr(self, '_map_overlay', None)
+        if overlay is None:
+            return
+        if overlay.flush(self._viewport_box()):
+            self._bg.paste(overlay.image)
+        self._draw_tokens_on_map()
+
+    def _build_map_overlay(self):
+        """Tworzy jednorazowo nakładkę rastrową i jedyny element canvasu, który ją wyświetla."""
+        self._map_overlay = MapOverlayRenderer(
+            self.map_model,
+            background=getattr(self, '_bg_source', None),
+            size=(self._bg_width, self._bg_height),
+        )
+        self._bg = ImageTk.PhotoImage(self._map_overlay.image)
+        self._bg_item = self.canvas.create_image(0, 0, anchor="nw", image=self._bg, tags="map_overlay")
+        self.canvas.tag_lower(self._bg_item)
 
     def _draw_tokens_on_map(self):
+        """Warstwa żetonów w trybie zachowanym: element canvasu na żeton tworzony raz,
+        potem tylko przesuwany (coords), podmieniany obrazek lub usuwany po zniknięciu żetonu."""
         self._sync_player_from_engine()
         self.tokens = self.game_engine.tokens  # Zawsze aktualizuj listę żetonów
-        self.canvas.delete("token")
-        self.canvas.delete("token_sel")  # Usuwamy stare obwódki        # Filtrowanie widoczności żetonów przez fog of war (uwzględnij temp_visible_tokens)
         # Usuń stare markery statusu
         try:
             for mid in self._move_status_markers.values():
@@ -306,69 +297,105 @@ class PanelMapa(tk.Frame):
         except Exception:
             pass
         self._move_status_markers = {}
-        self._token_canvas_items = {}
-        tokens = self.tokens
+        # Filtrowanie widoczności żetonów przez fog of war (uwzględnij temp_visible_tokens)
+        visible_ids = None
         if hasattr(self, 'player') and hasattr(self.player, 'visible_tokens') and hasattr(self.player, 'temp_visible_tokens'):
-            tokens = [t for t in self.tokens if t.id in (self.player.visible_tokens | self.player.temp_visible_tokens)]
+            visible_ids = frozenset(self.player.visible_tokens | self.player.temp_visible_tokens)
         elif hasattr(self, 'player') and hasattr(self.player, 'visible_tokens'):
-            tokens = [t for t in self.tokens if t.id in self.player.visible_tokens]
+            visible_ids = frozenset(self.player.visible_tokens)
+        viewport = self._viewport_box()
+        # Warstwa zależy tylko od stanu gry (skrót Zobrista silnika), widoczności, widoku i zaznaczenia -
+        # bez zmian żadnego z nich odświeżenie nie dotyka canvasu ani plików obrazków
+        layer_key = (getattr(self.game_engine, 'state_hash', None), visible_ids, viewport,
+                     self.active_commander_id, getattr(self, 'selected_token_id', None))
+        if layer_key[0] is not None and layer_key == self._token_layer_key:
+            return
+        self._token_layer_key = layer_key
+        tokens = self.tokens
+        if visible_ids is not None:
+            tokens = [t for t in self.tokens if t.id in visible_ids]
+        hex_size = 40  # Ustaw stały rozmiar 40x40
+        selected = None
+        drawn = set()
         for token in tokens:
-            # USUNIĘTO DEBUGI
-            if token.q is not None and token.r is not None:
-                img_path = token.stats.get("image")
+            if token.q is None or token.r is None:
+                continue
+            x, y = self.map_model.hex_to_pixel(token.q, token.r)
+            # Żetony poza widokiem (z zapasem) dorysujemy dopiero po przewinięciu
+            if not self._in_viewport(x, y, viewport):
+                continue
+            img_path = token.stats.get("image")
+            if not img_path:
+                nation = token.stats.get('nation', '')
+                img_path = f"assets/tokens/{nation}/{token.id}/token.png"
+            if not os.path.exists(img_path):
+                img_path = "assets/tokens/default/token.png" if os.path.exists("assets/tokens/default/token.png") else None
                 if not img_path:
-                    nation = token.stats.get('nation', '')
-                    img_path = f"assets/tokens/{nation}/{token.id}/token.png"
-                if not os.path.exists(img_path):
-                    img_path = "assets/tokens/default/token.png" if os.path.exists("assets/tokens/default/token.png") else None
-                    if not img_path:
-                        continue
-                try:
-                    img = Image.open(img_path)
-                    hex_size = 40  # Ustaw stały rozmiar 40x40
-                    img = img.resize((hex_size, hex_size), Image.LANCZOS)
-                    
-                    # Zastosuj przezroczystość dla nieaktywnych żetonów
-                    if self.active_commander_id is not None:
-                        token_commander_id = self._get_token_commander_id(token)
-                        if token_commander_id != self.active_commander_id:
-                            # Żeton nieaktywnego dowódcy - zmniejsz przezroczystość
-                            img = img.convert("RGBA")
-                            alpha = img.split()[-1]  # Pobierz kanał alfa
-                            alpha = alpha.point(lambda p: int(p * 0.4))  # 40% przezroczystości
-                            img.putalpha(alpha)
-                    
-                    tk_img = ImageTk.PhotoImage(img)
-                    x, y = self.map_model.hex_to_pixel(token.q, token.r)
-                    img_item = self.canvas.create_image(x, y, image=tk_img, anchor="center", tags=("token", f"token_{token.id}"))
-                    self.token_images[token.id] = tk_img
-                    self._token_canvas_items[token.id] = img_item
-                    # --- USUNIĘTO: wyświetlanie parametrów tekstowych na żetonie ---
-                    # Obwódka zależna od trybu ruchu
-                    border_color = "yellow"  # domyślnie bojowy
-                    if hasattr(token, 'movement_mode'):
-                        if token.movement_mode == 'combat':
-                            border_color = "yellow"  # bojowy
-                        elif token.movement_mode == 'march':
-                            border_color = "limegreen"  # marsz
-                        elif token.movement_mode == 'recon':
-                            border_color = "red"  # zwiad
-                    if hasattr(self, 'selected_token_id') and token.id == self.selected_token_id:
-                        verts = get_hex_vertices(x, y, hex_size)
-                        flat = [coord for p in verts for coord in p]
-                        self.canvas.create_polygon(
-                            flat,
-                            outline=border_color,
-                            width=2,
-                            fill="",
-                            tags="token_sel"
-                        )
-                except Exception as e:
-                    pass  # USUNIĘTO DEBUGI
-        # Kod spełnia wymagania: synchronizacja żetonów, tagowanie, poprawna mgiełka i widoczność.
+                    continue
+            # Żeton nieaktywnego dowódcy rysujemy przyciemniony (40% krycia)
+            dimmed = (self.active_commander_id is not None
+                      and self._get_token_commander_id(token) != self.active_commander_id)
+            # Gotowy wariant obrazka ze wspólnej pamięci podręcznej (bez odczytu z dysku i skalowania)
+            tk_img = get_token_sprite(img_path, hex_size, dimmed=dimmed)
+            if tk_img is None:
+                continue
+            self._place_token_item(token.id, x, y, tk_img)
+            drawn.add(token.id)
+            if hasattr(self, 'selected_token_id') and token.id == self.selected_token_id:
+                selected = (token, x, y)
+        # Żetony zniszczone, ukryte przez mgłę wojny lub poza widokiem
+        for token_id in [tid for tid in self._token_canvas_items if tid not in drawn]:
+            self.canvas.delete(self._token_canvas_items.pop(token_id))
+            self._token_render_state.pop(token_id, None)
+            self.token_images.pop(token_id, None)
+        self._place_selection_outline(selected, hex_size)
         # Po narysowaniu żetonów zaktualizuj markery statusu ruchu
         self._refresh_move_status_markers()
 
+    def _place_token_item(self, token_id, x, y, tk_img):
+        """Tworzy element żetonu albo aktualizuje tylko to, co się zmieniło (pozycja, obrazek)."""
+        item = self._token_canvas_items.get(token_id)
+        state = self._token_render_state.get(token_id)
+        if item is None:
+            item = self.canvas.create_image(x, y, image=tk_img, anchor="center", tags=("token", f"token_{token_id}"))
+            self._token_canvas_items[token_id] = item
+        elif state is None:
+            # Stan nieznany (np. po animacji miganiem/cofaniem) - odtwórz wszystko
+            self.canvas.coords(item, x, y)
+            self.canvas.itemconfigure(item, image=tk_img, state='normal')
+        else:
+            if state[:2] != (x, y):
+                self.canvas.coords(item, x, y)
+            if state[2] is not tk_img:
+                self.canvas.itemconfigure(item, image=tk_img)
+        self._token_render_state[token_id] = (x, y, tk_img)
+        self.token_images[token_id] = tk_img
+
+    def _place_selection_outline(self, selected, hex_size):
+        """Jedna obwódka zaznaczonego żetonu, przesuwana zamiast tworzona od nowa."""
+        if selected is None:
+            if self._selection_item is not None:
+                self.canvas.itemconfigure(self._selection_item, state='hidden')
+            return
+        token, x, y = selected
+        # Obwódka zależna od trybu ruchu
+        border_color = "yellow"  # domyślnie bojowy
+        if hasattr(token, 'movement_mode'):
+            if token.movement_mode == 'combat':
+                border_color = "yellow"  # bojowy
+            elif token.movement_mode == 'march':
+                border_color = "limegreen"  # marsz
+            elif token.movement_mode == 'recon':
+                border_color = "red"  # zwiad
+        verts = get_hex_vertices(x, y, hex_size)
+        flat = [coord for p in verts for coord in p]
+        if self._selection_item is None:
+            self._selection_item = self.canvas.create_polygon(flat, outline=border_color, width=2, fill="", tags="token_sel")
+        else:
+            self.canvas.coords(self._selection_item, *flat)
+            self.canvas.itemconfigure(self._selection_item, outline=border_color, state='normal')
+            self.canvas.tag_raise(self._selection_item)
+
     def _refresh_move_status_markers(self):
         """WYŁĄCZONE: nie rysuj kropek statusu ruchu. Czyść tylko ewentualne stare markery."""
         try:
@@ -383,6 +410,10 @@ class PanelMapa(tk.Frame):
         self._move_status_markers = {}
         # No-op: marker drawing disabled
 
+    def _movement_range(self, token):
+        """Pole osiągalności żetonu (jeden przebieg Dijkstry, zapamiętywany przez Board do zmiany zajętości pól)."""
+        return self.game_engine.board.reachable((token.q, token.r), max_mp=token.currentMovePoints, max_fuel=getattr(token, 'currentFuel', 9999))
+
     def _draw_path_on_map(self):
         if self.current_path:
             coords = []
@@ -401,7 +432,7 @@ class PanelMapa(tk.Frame):
         self._draw_path_on_map()
         # Po odświeżeniu aktualizujemy ewentualny podgląd hover
         if getattr(self, 'last_hover_token_id', None) and self.token_info_panel:
-            tok = next((t for t in self.tokens if t.id == self.last_hover_token_id), None)
+            tok = find_token(self.tokens, self.last_hover_token_id)
             if tok:
                 try:
                     self.token_info_panel.show_token(tok)
@@ -524,7 +555,8 @@ class PanelMapa(tk.Frame):
                         shutil.copy2(png_src, png_dst)
                         # print(f"[DEBUG] Skopiowano PNG do: {png_dst}")
                         # Ustaw nową ścieżkę do obrazka w stats['image']
-                        new_token.stats['image'] = png_dst.replace('\\', '/')
+                        # (statystyki są współdzielone między żetonami tej samej jednostki - podmieniamy słownik)
+                        new_token.stats = dict(new_token.stats, image=png_dst.replace('\\', '/'))
                     # Skopiuj również token.json do katalogu aktualne
                     if os.path.exists(json_src):
                         json_dst = os.path.join(dest_dir, base_name + ".json")
@@ -533,7 +565,11 @@ class PanelMapa(tk.Frame):
                     # print(f"[DEBUG] Utworzono Token: id={new_token.id}, q={new_token.q}, r={new_token.r}, owner={new_token.owner}")
                     self.game_engine.tokens.append(new_token)
                     # print(f"[DEBUG] Liczba żetonów po dodaniu: {len(self.game_engine.tokens)}")
-                    self.game_engine.board.set_tokens(self.game_engine.tokens)
+                    self.game_engine.board.add_token(new_token)
+                    # Cofnięcie ruchu sprzed wystawienia usunęłoby nowy żeton (folder poczekalni znika niżej)
+                    self.clear_undo()
+                    if hasattr(self.game_engine, 'record'):
+                        self.game_engine.record('deploy', token_id=new_token.id, q=new_token.q, r=new_token.r)
                     # LOG: deploy
                     try:
                         from utils.action_logger import log_action
@@ -626,19 +662,23 @@ class PanelMapa(tk.Frame):
                         clicked_token.movement_mode = "recon"
                     clicked_token.apply_movement_mode(reset_mp=False)
                     clicked_token.movement_mode_locked = True  # Blokada zmiany trybu do końca tury
+                    self.clear_undo()
                     self.selected_token_id = clicked_token.id
                     if self.panel_dowodcy is not None:
                         self.panel_dowodcy.wybrany_token = clicked_token
                     if self.token_info_panel is not None:
                         self.token_info_panel.show_token(clicked_token)  # Odśwież info panel po zmianie trybu
+            # Zasięg ruchu liczony raz przy wyborze żetonu; kliknięcia korzystają z zapamiętanego pola
+            self._movement_range(clicked_token)
             self.current_path = None
             self.refresh()
             return
         elif hr and self.selected_token_id:
-            token = next((t for t in self.tokens if t.id == self.selected_token_id), None)
+            token = find_token(self.tokens, self.selected_token_id)
             if token:
                 # Spróbuj znaleźć ścieżkę do celu, a jeśli się nie uda, znajdź maksymalnie osiągalną ścieżkę
-                path = self.game_engine.board.find_path((token.q, token.r), hr, max_mp=token.currentMovePoints, max_fuel=getattr(token, 'currentFuel', 9999))
+                move_range = self._movement_range(token)
+                path = move_range.path_to(hr)
                 if path:
                     # POLICZ RZECZYWISTY KOSZT RUCHU
                     real_cost = 0
@@ -661,109 +701,11 @@ class PanelMapa(tk.Frame):
                         self.canvas.after(500, lambda: self.canvas.delete('path_label'))
                     except Exception:
                         pass
-                    def _do_move_to_target():
-                        from engine.action import MoveAction
-                        action = MoveAction(token.id, hr[0], hr[1])
-                        success, msg = self.game_engine.execute_action(action, player=getattr(self, 'player', None))
-                        self.tokens = self.game_engine.tokens
-                        # LOG: move
-                        try:
-                            from utils.action_logger import log_action
-                            log_action(
-                                self.game_engine,
-                                getattr(self, 'player', None),
-                                getattr(self.game_engine, 'turn', None),
-                                'move',
-                                details={
-                                    'token_id': token.id,
-                                    'from_q': path[0][0], 'from_r': path[0][1],
-                                    'to_q': hr[0], 'to_r': hr[1],
-                                },
-                                result_msg=msg
-                            )
-                        except Exception:
-                            pass
-                        if success:
-                            from engine.engine import update_all_players_visibility
-                            if hasattr(self.game_engine, 'players'):
-                                update_all_players_visibility(self.game_engine.players, self.game_engine.tokens, self.game_engine.board)
-                            # --- AUTOMATYCZNA REAKCJA WROGÓW ---
-                            moved_token = token  # żeton, który się ruszał
-                            # print(f"[DEBUG] Sprawdzam reakcję wrogów na ruch żetonu {moved_token.id} ({moved_token.owner}) na ({moved_token.q},{moved_token.r})")
-                            for enemy in self.game_engine.tokens:
-                                if enemy.id == moved_token.id or enemy.owner == moved_token.owner:
-                                    continue
-                                # Blokada: nie atakuje własnych żetonów
-                                nation_enemy = enemy.owner.split('(')[-1].replace(')','').strip()
-                                nation_moved = moved_token.owner.split('(')[-1].replace(')','').strip()
-                                if nation_enemy == nation_moved:
-                                    # print(f"[DEBUG] Blokada: {enemy.id} ({enemy.owner}) nie atakuje własnego żetonu {moved_token.id} ({moved_token.owner})!")
-                                    continue
-                                sight = enemy.stats.get('sight', 0)
-                                dist = self.game_engine.board.hex_distance((enemy.q, enemy.r), (moved_token.q, moved_token.r))
-                                in_sight = dist <= sight
-                                attack_range = enemy.stats.get('attack', {}).get('range', 1)
-                                in_range = dist <= attack_range
-                                # print(f"[DEBUG] Wróg {enemy.id} ({enemy.owner}) na ({enemy.q},{enemy.r}): dystans={dist}, sight={sight}, attack_range={attack_range}, in_sight={in_sight}, in_range={in_range}")
-                                if in_sight and in_range:
-                                    # print(f"[REAKCJA WROGA] {enemy.id} ({enemy.owner}) atakuje {moved_token.id} ({moved_token.owner})!")
-                                    setattr(moved_token, 'wykryty_do_konca_tury', True)
-                                    from engine.action import CombatAction
-                                    action = CombatAction(enemy.id, moved_token.id, is_reaction=True)
-                                    success2, msg2 = self.game_engine.execute_action(action)
-                                    # LOG: reaction attack
-                                    try:
-                                        from utils.action_logger import log_action
-                                        # Preferuj numer tury z TurnManager jeśli jest dostępny
-                                        current_turn = None
-                                        try:
-                                            current_turn = getattr(getattr(self.game_engine, 'turn_manager', None), 'current_turn', None)
-                                        except Exception:
-                                            current_turn = None
-                                        if current_turn is None:
-                                            current_turn = getattr(self.game_engine, 'turn', None)
-                                        log_action(
-                                            self.game_engine,
-                                            enemy.owner,
-                                            current_turn,
-                                            'reaction_attack',
-                                            details={
-                                                'token_id': enemy.id,
-                                                'target_token_id': moved_token.id,
-                                                'from_q': enemy.q, 'from_r': enemy.r,
-                                                'to_q': moved_token.q, 'to_r': moved_token.r,
-                                            },
-                                            result_msg=msg2
-                                        )
-                                    except Exception:
-                                        pass
-                                    # print(f"[WYNIK REAKCJI] {enemy.id} -> {moved_token.id}: {msg2}")
-                                    self._visualize_combat(enemy, moved_token, msg2)
-                                    # Komunikat zwrotny także dla ataku reakcyjnego
-                                    from tkinter import messagebox
-                                    messagebox.showinfo("Wynik walki", msg2)
-                            # --- DODANE: wymuszone odświeżenie mapy po wszystkich reakcjach wrogów ---
-                            self.refresh()
-                        # Zaktualizuj panel informacji o żetonie natychmiast po ruchu
-                        try:
-                            if self.token_info_panel is not None:
-                                moved = next((t for t in self.tokens if t.id == token.id), None)
-                                if moved is not None:
-                                    self.token_info_panel.show_token(moved)
-                        except Exception:
-                            pass
-                        if not success:
-                            from tkinter import messagebox
-                            messagebox.showerror("Błąd ruchu", msg)
-                        if success:
-                            self.selected_token_id = None
-                        self.current_path = None
-                        self.refresh()
                     # Odczekaj 0.5 sekundy zanim wykonasz ruch (by ścieżka była widoczna)
-                    self.canvas.after(500, _do_move_to_target)
+                    self.canvas.after(500, lambda: self._execute_move(token, hr, path))
                 else:
                     # Ustal ścieżkę do najdalszego osiągalnego pola (fallback)
-                    fallback_path = self.game_engine.board.find_path((token.q, token.r), hr, max_mp=token.currentMovePoints, max_fuel=getattr(token, 'currentFuel', 9999), fallback_to_closest=True)
+                    fallback_path = move_range.path_to_closest(hr)
                     if fallback_path and len(fallback_path) > 1:
                         # Narysuj ścieżkę, odczekaj 0.5s i automatycznie wykonaj ruch do ostatniego heksu z fallbacku
                         self.current_path = fallback_path
@@ -780,91 +722,8 @@ class PanelMapa(tk.Frame):
                             self.canvas.after(500, lambda: self.canvas.delete('path_label'))
                         except Exception:
                             pass
-                        def _do_move_to_fallback():
-                            from engine.action import MoveAction
-                            action = MoveAction(token.id, dest[0], dest[1])
-                            success, msg = self.game_engine.execute_action(action, player=getattr(self, 'player', None))
-                        self.tokens = self.game_engine.tokens
-                        # LOG: move (fallback)
-                        try:
-                            from utils.action_logger import log_action
-                            log_action(
-                                self.game_engine,
-                                getattr(self, 'player', None),
-                                getattr(self.game_engine, 'turn', None),
-                                'move',
-                                details={
-                                    'token_id': token.id,
-                                    'from_q': fallback_path[0][0], 'from_r': fallback_path[0][1],
-                                    'to_q': dest[0], 'to_r': dest[1],
-                                    'fallback': True
-                                },
-                                result_msg=None
-                            )
-                        except Exception:
-                            pass
-                        def _after_fallback_move():
-                            # Po wykonaniu ruchu powtórz logikę post-move jak w głównym ruchu
-                            success = True  # zakładamy, że log powyżej zapisany; wynik ruchu sprawdzimy wewnątrz funkcji
-                            try:
-                                from engine.engine import update_all_players_visibility
-                                if hasattr(self.game_engine, 'players'):
-                                    update_all_players_visibility(self.game_engine.players, self.game_engine.tokens, self.game_engine.board)
-                                moved_token = token
-                                for enemy in self.game_engine.tokens:
-                                    if enemy.id == moved_token.id or enemy.owner == moved_token.owner:
-                                        continue
-                                    nation_enemy = enemy.owner.split('(')[-1].replace(')','').strip()
-                                    nation_moved = moved_token.owner.split('(')[-1].replace(')','').strip()
-                                    if nation_enemy == nation_moved:
-                                        continue
-                                    sight = enemy.stats.get('sight', 0)
-                                    dist = self.game_engine.board.hex_distance((enemy.q, enemy.r), (moved_token.q, moved_token.r))
-                                    in_sight = dist <= sight
-                                    attack_range = enemy.stats.get('attack', {}).get('range', 1)
-                                    in_range = dist <= attack_range
-                                    if in_sight and in_range:
-                                        setattr(moved_token, 'wykryty_do_konca_tury', True)
-                                        from engine.action import CombatAction
-                                        action2 = CombatAction(enemy.id, moved_token.id, is_reaction=True)
-                                        success2, msg2 = self.game_engine.execute_action(action2)
-                                        try:
-                                            from utils.action_logger import log_action
-                                            current_turn = getattr(getattr(self.game_engine, 'turn_manager', None), 'current_turn', getattr(self.game_engine, 'turn', None))
-                                            log_action(
-                                                self.game_engine,
-                                                enemy.owner,
-                                                current_turn,
-                                                'reaction_attack',
-                                                details={
-                                                    'token_id': enemy.id,
-                                                    'target_token_id': moved_token.id,
-                                                    'from_q': enemy.q, 'from_r': enemy.r,
-                                                    'to_q': moved_token.q, 'to_r': moved_token.r,
-                                                },
-                                                result_msg=msg2
-                                            )
-                                        except Exception:
-                                            pass
-                                        self._visualize_combat(enemy, moved_token, msg2)
-                                        from tkinter import messagebox
-                                        messagebox.showinfo("Wynik walki", msg2)
-                                self.refresh()
-                            except Exception:
-                                pass
-                            # Zaktualizuj panel informacji o żetonie natychmiast po ruchu (fallback)
-                            try:
-                                if self.token_info_panel is not None:
-                                    moved = next((t for t in self.tokens if t.id == token.id), None)
-                                    if moved is not None:
-                                        self.token_info_panel.show_token(moved)
-                            except Exception:
-                                pass
-                            self.selected_token_id = None
-                            self.current_path = None
-                            self.refresh()
-                        # Odczekaj 0.5 sekundy zanim wykonasz ruch fallback
-                        self.canvas.after(500, lambda: (_do_move_to_fallback(), _after_fallback_move()))
+                        # Ruch do najdalszego osiągalnego pola: ta sama transakcja, reakcje i cofanie co ruch w zasięgu
+                        self.canvas.after(500, lambda: self._execute_move(token, dest, fallback_path, fallback=True))
                     else:
                         # Brak jakiegokolwiek ruchu możliwego — NIC nie rób i nie pokazuj błędu
                         try:
@@ -879,6 +738,131 @@ class PanelMapa(tk.Frame):
             self.clear_token_info_panel()
         self.refresh()
 
+    def _execute_move(self, token, dest, path, fallback=False):
+        """Ruch żetonu do dest (także do najdalszego osiągalnego pola, fallback=True): ruch, ogień reakcyjny
+        i widoczność w jednej transakcji silnika, migawka do cofnięcia (Ctrl+Z), logi i komunikaty."""
+        from engine.action import MoveAction
+        action = MoveAction(token.id, dest[0], dest[1])
+        # Ruch, ogień reakcyjny i widoczność w jednej transakcji silnika
+        before = self.game_engine.snapshot()
+        batch = self.game_engine.execute_batch([action], player=getattr(self, 'player', None))
+        success, msg = batch.success, batch.messages[0]
+        if success:
+            # Ruchu, na który odpowiedział wróg, nie da się cofnąć
+            if batch.reactions:
+                self._undo_stack = []
+            else:
+                self._push_undo(before)
+        self.tokens = self.game_engine.tokens
+        # LOG: move
+        try:
+            from utils.action_logger import log_action
+            log_action(
+                self.game_engine,
+                getattr(self, 'player', None),
+                getattr(self.game_engine, 'turn', None),
+                'move',
+                details={
+                    'token_id': token.id,
+                    'from_q': path[0][0], 'from_r': path[0][1],
+                    'to_q': dest[0], 'to_r': dest[1],
+                    **({'fallback': True} if fallback else {}),
+                },
+                result_msg=msg
+            )
+        except Exception:
+            pass
+        if success:
+            # --- AUTOMATYCZNA REAKCJA WROGÓW (rozstrzygnięta w execute_batch) ---
+            for enemy, moved_token, success2, msg2 in batch.reactions:
+                # LOG: reaction attack
+                try:
+                    from utils.action_logger import log_action
+                    # Preferuj numer tury z TurnManager jeśli jest dostępny
+                    current_turn = None
+                    try:
+                        current_turn = getattr(getattr(self.game_engine, 'turn_manager', None), 'current_turn', None)
+                    except Exception:
+                        current_turn = None
+                    if current_turn is None:
+                        current_turn = getattr(self.game_engine, 'turn', None)
+                    log_action(
+                        self.game_engine,
+                        enemy.owner,
+                        current_turn,
+                        'reaction_attack',
+                        details={
+                            'token_id': enemy.id,
+                            'target_token_id': moved_token.id,
+                            'from_q': enemy.q, 'from_r': enemy.r,
+                            'to_q': moved_token.q, 'to_r': moved_token.r,
+                        },
+                        result_msg=msg2
+                    )
+                except Exception:
+                    pass
+                self._visualize_combat(enemy, moved_token, msg2)
+                # Komunikat zwrotny także dla ataku reakcyjnego
+                from tkinter import messagebox
+                messagebox.showinfo("Wynik walki", msg2)
+            # --- DODANE: wymuszone odświeżenie mapy po wszystkich reakcjach wrogów ---
+            self.refresh()
+        # Zaktualizuj panel informacji o żetonie natychmiast po ruchu
+        try:
+            if self.token_info_panel is not None:
+                moved = find_token(self.tokens, token.id)
+                if moved is not None:
+                    self.token_info_panel.show_token(moved)
+        except Exception:
+            pass
+        if not success:
+            from tkinter import messagebox
+            messagebox.showerror("Błąd ruchu", msg)
+        if success:
+            self.selected_token_id = None
+        self.current_path = None
+        self.refresh()
+
+    def _undo_context(self):
+        """Tura i gracz, w których zrobiono ruchy ze stosu cofania; po ich zmianie migawki są nieważne."""
+        engine = self.game_engine
+        return (getattr(engine, 'turn', None), getattr(engine, 'current_player', None),
+                id(getattr(engine, 'current_player_obj', None)), id(getattr(self, 'player', None)))
+
+    def _push_undo(self, snapshot):
+        context = self._undo_context()
+        if context != self._undo_key:
+            self._undo_stack = []
+            self._undo_key = context
+        self._undo_stack.append(snapshot)
+
+    def clear_undo(self):
+        """Unieważnia cofanie ruchów - po każdej zmianie stanu innej niż ruch (walka, wystawienie żetonu,
+        uzupełnienie, zmiana trybu ruchu), którą przywrócenie starszej migawki by wymazało."""
+        self._undo_stack = []
+
+    def undo_last_move(self):
+        """Cofa ostatni ruch żetonu (przywraca migawkę silnika sprzed ruchu). Ruchu sprzed walki
+        albo z poprzedniej tury lub innego gracza nie da się cofnąć; migawki z innym zestawem żetonów
+        niż bieżący (np. po wystawieniu nowego żetonu) też nie są przywracane."""
+        if self._undo_stack and self._undo_context() != self._undo_key:
+            self._undo_stack = []
+        if not self._undo_stack:
+            return False
+        snapshot = self._undo_stack[-1]
+        if {t.id for t, _ in snapshot.tokens} != {t.id for t in self.game_engine.tokens}:
+            self._undo_stack = []
+            return False
+        self._undo_stack.pop()
+        self.game_engine.restore(snapshot)
+        self.tokens = self.game_engine.tokens
+        if hasattr(self.game_engine, 'players'):
+            self.game_engine.update_all_players_visibility(self.game_engine.players)
+        self.selected_token_id = None
+        self.current_path = None
+        self.refresh()
+        return True
+
     def _on_right_click_token(self, event):
         # Obsługa ataku na żeton przeciwnika
         x = self.canvas.canvasx(event.x)
@@ -908,7 +892,7 @@ class PanelMapa(tk.Frame):
             return
         # Sprawdź, czy kliknięto w żeton przeciwnika (nie swój, nie sojusznika)
         if clicked_token and self.selected_token_id:
-            attacker = next((t for t in self.tokens if t.id == self.selected_token_id), None)
+            attacker = find_token(self.tokens, self.selected_token_id)
             if not attacker:
                 return
             # Sprawdź, czy to przeciwnik
@@ -917,7 +901,15 @@ class PanelMapa(tk.Frame):
             if nation1 == nation2:
                 return  # Nie atakuj sojusznika
             from tkinter import messagebox
-            answer = messagebox.askyesno("Potwierdź atak", f"Czy chcesz zaatakować żeton {clicked_token.id}?\n({clicked_token.stats.get('unit','')})")
+            question = f"Czy chcesz zaatakować żeton {clicked_token.id}?\n({clicked_token.stats.get('unit','')})"
+            # Podgląd szans walki (rozkład strat, eliminacji i odwrotu)
+            try:
+                odds = self.game_engine.combat_predictor.predict(attacker, clicked_token)
+                if odds is not None:
+                    question += "\n\n" + odds.summary()
+            except Exception:
+                pass
+            answer = messagebox.askyesno("Potwierdź atak", question)
             if not answer:
                 try:
                     from utils.action_logger import log_action
@@ -936,6 +928,8 @@ class PanelMapa(tk.Frame):
             from engine.action import CombatAction
             action = CombatAction(attacker.id, clicked_token.id)
             success, msg = self.game_engine.execute_action(action, player=getattr(self, 'player', None))
+            # Cofnięcie ruchu sprzed walki wymazałoby jej wynik (straty, losowania)
+            self._undo_stack = []
             self.tokens = self.game_engine.tokens
             # LOG: attack
             try:
@@ -988,7 +982,11 @@ class PanelMapa(tk.Frame):
                     self.canvas.itemconfig(tag, state='normal')
                 if i < times * 2:
                     self.canvas.after(delay, lambda: blink(i + 1))
-                elif on_end:
+                    return
+                # Stan elementu zmieniony poza _draw_tokens_on_map - następne odświeżenie nada go od nowa
+                self._token_render_state.pop(token_id, None)
+                self._token_layer_key = None
+                if on_end:
                     on_end()
             blink(0)
 
@@ -1004,6 +1002,8 @@ class PanelMapa(tk.Frame):
             tag = f"token_{token.id}"
             def move_step(i):
                 if i > steps:
+                    self._token_render_state.pop(token.id, None)
+                    self._token_layer_key = None
                     self.refresh()
                     return
                 self.canvas.move(tag, dx, dy)
@@ -1043,8 +1043,8 @@ class PanelMapa(tk.Frame):
             blink_token(defender.id, color='orange', times=2, delay=100, on_end=after_blink)
         # Po animacjach, po odświeżeniu mapy, wypisz wartości po walce
         def print_after_refresh():
-            att = next((t for t in self.tokens if t.id == attacker.id), None)
-            defn = next((t for t in self.tokens if t.id == defender.id), None)
+            att = find_token(self.tokens, attacker.id)
+            defn = find_token(self.tokens, defender.id)
             # Usunięto printy debugujące
         self.canvas.after(600, print_after_refresh)
 
@@ -0,0 +1,75 @@
+import os
+from collections import OrderedDict
+from PIL import Image
+
+__all__ = ["TokenSpriteCache", "get_token_sprite"]
+
+# Tablica przejścia kanału alfa dla żetonów nieaktywnych dowódców (40% krycia)
+DIM_ALPHA_LUT = [int(p * 0.4) for p in range(256)]
+
+
+def _photo_image(img):
+    from PIL import ImageTk
+    return ImageTk.PhotoImage(img)
+
+
+class TokenSpriteCache:
+    """Wspólna dla całego procesu pamięć podręczna obrazków żetonów.
+    Klucz: (ścieżka, rozmiar, przyciemnienie, zoom). Obrazy źródłowe są odczytywane z dysku raz
+    i unieważniane przy zmianie mtime pliku; najdawniej używane warianty są usuwane (LRU)."""
+
+    def __init__(self, max_items: int = 512, photo_factory=_photo_image):
+        self.max_items = max_items
+        self.photo_factory = photo_factory
+        self._sources = {}  # ścieżka -> (mtime, obraz RGBA)
+        self._sprites = OrderedDict()  # klucz -> (mtime, PhotoImage)
+
+    def get(self, path, size: int, dimmed: bool = False, zoom: float = 1.0):
+        """Zwraca gotowy obraz żetonu (PhotoImage) albo None, jeśli pliku nie da się wczytać."""
+        path = os.path.normpath(str(path))
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        key = (path, size, dimmed, zoom)
+        cached = self._sprites.get(key)
+        if cached is not None and cached[0] == mtime:
+            self._sprites.move_to_end(key)
+            return cached[1]
+        source = self._source(path, mtime)
+        if source is None:
+            return None
+        side = max(1, int(round(size * zoom)))
+        img = source.resize((side, side), Image.LANCZOS)
+        if dimmed:
+            img.putalpha(img.getchannel("A").point(DIM_ALPHA_LUT))
+        sprite = self.photo_factory(img)
+        self._sprites[key] = (mtime, sprite)
+        self._sprites.move_to_end(key)
+        while len(self._sprites) > self.max_items:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def _source(self, path, mtime):
+        cached = self._sources.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            with Image.open(path) as f:
+                img = f.convert("RGBA")
+        except Exception:
+            return None
+        self._sources[path] = (mtime, img)
+        return img
+
+    def clear(self):
+        self._sources.clear()
+        self._sprites.clear()
+
+
+_default_cache = TokenSpriteCache()
+
+
+def get_token_sprite(path, size: int, dimmed: bool = False, zoom: float = 1.0):
+    """Obrazek żetonu ze wspólnej pamięci podręcznej procesu (patrz TokenSpriteCache.get)."""
+    return _default_cache.get(path, size, dimmed, zoom)
@@ -7,6 +7,10 @@ from core.ekonomia import EconomySystem
 from engine.engine import GameEngine, update_all_players_visibility, clear_temp_visibility
 from gui.panel_gracza import PanelGracza
 from core.zwyciestwo import VictoryConditions
+from engine.journal import ActionJournal
+from engine.autosave import AUTOSAVE_DIR, AutoSaver, autosave_files
+from datetime import datetime
+import os
 import tkinter as tk
 
 # AI GENERAŁ IMPORT (odporny na brak modułu ai)
@@ -53,7 +57,8 @@ def main():
             tokens_index_path="assets/tokens/index.json",
             tokens_start_path="assets/start_tokens.json",
             seed=42,
-            read_only=True  # Zapobiega nadpisywaniu pliku mapy
+            read_only=True,  # Zapobiega nadpisywaniu pliku mapy
+            autoload=False  # Wznowienie przerwanej gry niżej, po pytaniu gracza (game_engine.resume)
         )
 
         # Walidacja konfiguracji miejsc (minimum 3 sloty na każdą nację)
@@ -90,6 +95,16 @@ def main():
 
         players = build_players(miejsca, czasy)
 
+        # --- WZNOWIENIE PRZERWANEJ GRY Z ZAPISU AUTOMATYCZNEGO (po każdej pełnej turze) ---
+        resumed = False
+        if autosave_files(AUTOSAVE_DIR):
+            from tkinter import messagebox
+            if messagebox.askyesno("Zapis automatyczny", "Znaleziono zapis automatyczny przerwanej gry.\nCzy chcesz ją wznowić?"):
+                game_engine.players = players
+                resumed = game_engine.resume()
+                # Gracze z zapisu (VP, ekonomia); starszy zapis bez graczy zostawia nowo utworzonych
+                players = game_engine.players
+
         # Uzupełnij economy dla wszystkich graczy (Generał i Dowódca)
         from core.ekonomia import EconomySystem
         for p in players:
@@ -103,15 +118,26 @@ def main():
         update_all_players_visibility(players, game_engine.tokens, game_engine.board)
         
         # --- SYNCHRONIZACJA PUNKTÓW EKONOMICZNYCH DOWÓDCÓW Z SYSTEMEM EKONOMII ---
+        # (wznowiona gra ma punkty_ekonomiczne z zapisu)
         for p in players:
-            if hasattr(p, 'punkty_ekonomiczne'):
+            if hasattr(p, 'punkty_ekonomiczne') and not resumed:
                 p.punkty_ekonomiczne = p.economy.get_points()['economic_points']
         
         # Inicjalizacja menedżera tur
         turn_manager = TurnManager(players, game_engine=game_engine)
+        if resumed:
+            turn_manager.current_turn = game_engine.turn
+
+        # Dziennik zdarzeń gry (powtórka partii: python -m engine.journal <plik> --turn N)
+        os.makedirs('logs', exist_ok=True)
+        ActionJournal(os.path.join('logs', f"journal_{datetime.now():%Y%m%d_%H%M%S}.bin"), game_engine)
+        # Zapis automatyczny w tle po każdej pełnej turze (saves/autosave, pełny zapis co 5, 3 generacje)
+        AutoSaver(AUTOSAVE_DIR, game_engine)
         
         # Uruchomienie gry Human vs Human (z możliwością AI Generałów)
         run_human_vs_human_game(game_engine, players, turn_manager)
+        # Poczekaj na zapisy w tle przed wyjściem
+        game_engine.autosave.close()
         
     except Exception as e:
         print(f"❌ Błąd w main(): {e}")
@@ -163,7 +189,7 @@ def run_human_vs_human_game(game_engine, players, turn_manager):
         if current_player.role == "Generał":
             # Generowanie ekonomii przed stworzeniem GUI (by panel startował ze świeżymi danymi)
             start_points = current_player.economy.economic_points
-            current_player.economy.generate_economic_points()
+            current_player.economy.generate_economic_points(game_engine.rng.stream('economy'))
             current_player.economy.add_special_points()
             available_points = current_player.economy.get_points()['economic_points']
             print(f"  💰 Generowanie ekonomii: {start_points} → {available_points} punktów")
@@ -185,7 +211,7 @@ def run_human_vs_human_game(game_engine, players, turn_manager):
                     saves_dir = os.path.join(os.getcwd(), 'saves')
                     os.makedirs(saves_dir, exist_ok=True)
                     path = filedialog.askopenfilename(
-                        filetypes=[('Plik zapisu', '*.json')],
+                        filetypes=[('Plik zapisu', '*.sav *.json')],
                         initialdir=saves_dir
                     )
                     if path:
@@ -250,7 +276,10 @@ def run_human_vs_human_game(game_engine, players, turn_manager):
         
         # --- ROZDZIEL PUNKTY Z KEY_POINTS tylko na koniec pełnej tury ---
         if is_full_turn_end:
+            # Numer tury w silniku (zapis automatyczny, historia VP) - jak w engine.simulate.play_game
+            game_engine.turn = turn_manager.current_turn
             game_engine.process_key_points(players)  # Ignoruj zwracaną wartość
+            game_engine.autosave.request()
             
         # --- AKTUALIZUJ WIDOCZNOŚĆ NA KOŃCU KAŻDEJ TURY ---
         game_engine.update_all_players_visibility(players)
@@ -17,7 +17,8 @@ if __name__ == "__main__":
         tokens_index_path="assets/tokens/index.json",
         tokens_start_path="assets/start_tokens.json",
         seed=42,
-        read_only=True  # Zapobiega nadpisywaniu pliku mapy
+        read_only=True,  # Zapobiega nadpisywaniu pliku mapy
+        autoload=True  # Wznowienie ostatniej gry z zapisu automatycznego (jak dotąd)
     )
 
     # Automatyczne przypisanie id dowódców zgodnie z ownerami żetonów
@@ -141,7 +142,7 @@ if __name__ == "__main__":
         if isinstance(app, PanelGenerala):
             # Debug: bilans przed losowaniem
             start_points = current_player.economy.economic_points
-            current_player.economy.generate_economic_points()
+            current_player.economy.generate_economic_points(game_engine.rng.stream('economy'))
             current_player.economy.add_special_points()
             available_points = current_player.economy.get_points()['economic_points']
             app.update_economy(available_points)  # Przekazanie dostępnych punktów ekonomicznych
@@ -0,0 +1,63 @@
+# Sprawdza cofanie ruchu w panelu mapy (Ctrl+Z): migawka sprzed ruchu nie jest przywracana po wystawieniu
+# nowego żetonu ani po innej zmianie stanu, która unieważnia cofanie
+import pytest
+from engine.engine import GameEngine
+from engine.token import Token
+from gui.panel_mapa import PanelMapa
+
+
+@pytest.fixture
+def panel():
+    engine = GameEngine(
+        map_path="data/map_data.json",
+        tokens_index_path="assets/tokens/index.json",
+        tokens_start_path="assets/start_tokens.json",
+        seed=1,
+        read_only=True,
+    )
+    engine.players = []
+    # Panel bez okna Tk: tylko stan potrzebny do cofania ruchu
+    panel = object.__new__(PanelMapa)
+    panel.game_engine = engine
+    panel.tokens = engine.tokens
+    panel.player = None
+    panel._undo_stack = []
+    panel._undo_key = None
+    panel.refresh = lambda: None
+    return panel
+
+
+def _move(panel):
+    token = next(iter(panel.game_engine.tokens))
+    before = panel.game_engine.snapshot()
+    start = (token.q, token.r)
+    token.set_position(token.q, token.r + 1)
+    panel._push_undo(before)
+    return token, start
+
+
+def test_cofniecie_ruchu(panel):
+    token, start = _move(panel)
+    assert panel.undo_last_move()
+    assert (token.q, token.r) == start
+    assert not panel.undo_last_move()
+
+
+def test_wystawienie_po_ruchu_nie_jest_cofane(panel):
+    engine = panel.game_engine
+    token, start = _move(panel)
+    moved = (token.q, token.r)
+    # Wystawienie żetonu z pominięciem clear_undo: cofnięcie odmawia, bo zestaw żetonów się zmienił
+    deployed = Token(id="nowy_C", owner="2 (Polska)", stats={"move": 3, "maintenance": 5}, q=1, r=1)
+    engine.tokens.append(deployed)
+    engine.board.add_token(deployed)
+    assert not panel.undo_last_move()
+    assert engine.tokens.get("nowy_C") is deployed
+    assert (token.q, token.r) == moved
+    assert panel._undo_stack == []
+
+
+def test_clear_undo(panel):
+    _move(panel)
+    panel.clear_undo()
+    assert not panel.undo_last_move()
@@ -0,0 +1,105 @@
+# Sprawdza generator dozwolonych akcji: każda wygenerowana akcja się udaje, wynik jest zapamiętywany do zmiany stanu
+import pytest
+from engine.action import CombatAction, ResupplyAction
+from engine.batch import ActionTransaction
+from engine.engine import GameEngine
+from engine.hex_utils import hex_disk_offsets
+from engine.player import Player
+from engine.token import Token
+
+
+@pytest.fixture
+def engine():
+    engine = GameEngine(
+        map_path="data/map_data.json",
+        tokens_index_path="assets/tokens/index.json",
+        tokens_start_path="assets/start_tokens.json",
+        seed=123,
+        autoload=False,
+    )
+    q, r = next(
+        (q, r) for q, r in sorted(engine.board.key_to_coords(k) for k in engine.board.terrain)
+        if all(getattr(engine.board.get_tile(q + i, r), 'move_mod', None) == 0 for i in range(5))
+    )
+    stats = {"move": 3, "maintenance": 6, "sight": 2, "combat_value": 6, "defense_value": 1, "attack": {"range": 1, "value": 2}}
+    engine.tokens = [
+        Token(id="A", owner="2 (Polska)", stats=dict(stats), q=q, r=r),
+        Token(id="B", owner="2 (Polska)", stats=dict(stats, attack={"range": 2, "value": 2}), q=q + 1, r=r),
+        Token(id="E", owner="5 (Niemcy)", stats=dict(stats), q=q + 3, r=r),
+        Token(id="F", owner="5 (Niemcy)", stats=dict(stats), q=q + 4, r=r),
+    ]
+    engine.players = [Player(2, "Polska", "Dowódca", 5), Player(5, "Niemcy", "Dowódca", 5)]
+    for p in engine.players:
+        p.victory_points, p.vp_history, p.punkty_ekonomiczne = 0, [], 3
+    engine.update_all_players_visibility(engine.players)
+    return engine
+
+
+def test_kazda_dozwolona_akcja_sie_udaje(engine):
+    player = engine.players[0]
+    legal = engine.legal_actions(player)
+    assert legal.attacks == {"B": ["E"]}  # F jest poza zasięgiem B, A nie sięga nikogo
+    assert legal.mode_switches["A"] == ["march", "recon"]
+    assert legal.resupply == {}  # pełny bak i pełne zasoby
+    assert legal.moves["A"] and legal.moves["B"]
+    actions = list(legal.actions())
+    assert len(actions) == len(legal)
+    for action in actions:
+        transaction = ActionTransaction(engine)
+        transaction.touch_action(action)
+        success, msg = action.execute(engine)
+        transaction.rollback()
+        assert success, (type(action).__name__, vars(action), msg)
+
+
+def test_wynik_zapamietany_do_zmiany_stanu(engine):
+    player = engine.players[0]
+    first = engine.legal_actions(player)
+    assert engine.legal_actions(player) is first
+    token = engine.tokens.get("A")
+    token.currentFuel = 2
+    second = engine.legal_actions(player)
+    assert second is not first
+    assert second.resupply["A"] == (3, 0)
+    assert len(second.moves["A"]) < len(first.moves["A"])
+    token.movement_mode_locked = True
+    assert "A" not in engine.legal_actions(player).mode_switches
+
+
+def test_uzupelnienie_zgodne_z_akcja(engine):
+    player = engine.players[0]
+    token = engine.tokens.get("A")
+    token.currentFuel, token.combat_value = 4, 4
+    assert engine.legal_actions(player).resupply["A"] == (2, 1)
+    # Brak punktów ekonomicznych: generator nie proponuje uzupełnienia, a akcja się nie udaje
+    del player.punkty_ekonomiczne
+    assert "A" not in engine.legal_actions(player).resupply
+    assert not ResupplyAction("A", fuel=1).execute(engine)[0]
+
+
+def test_ataki_zgodne_z_walidacja_walki(engine):
+    # Żeton sojuszniczego dowódcy (ta sama frakcja, inny właściciel): CombatAction go przyjmuje
+    a = engine.tokens.get("A")
+    q, r = next((a.q + dq, a.r + dr) for dq, dr in hex_disk_offsets(1) if (dq, dr) != (0, 0)
+                and engine.board.get_tile(a.q + dq, a.r + dr) is not None
+                and not engine.board.tokens_at(a.q + dq, a.r + dr))
+    engine.tokens.append(Token(id="S", owner="3 (Polska)", stats=dict(a.stats), q=q, r=r))
+    engine.players.append(Player(3, "Polska", "Dowódca", 5))
+    player = engine.players[0]
+    engine.update_all_players_visibility(engine.players)
+    legal = engine.legal_actions(player)
+    own = [t for t in engine.tokens if t.owner == "2 (Polska)"]
+    for attacker in own:
+        accepted = []
+        for defender in engine.tokens:
+            if defender.id not in player.visible_tokens:
+                continue
+            transaction = ActionTransaction(engine)
+            transaction.touch(attacker.id)
+            transaction.touch(defender.id)
+            success, _ = CombatAction(attacker.id, defender.id).execute(engine)
+            transaction.rollback()
+            if success:
+                accepted.append(defender.id)
+        assert legal.attacks.get(attacker.id, []) == sorted(accepted), attacker.id
+    assert "S" in legal.attacks["A"]
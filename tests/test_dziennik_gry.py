@@ -0,0 +1,96 @@
+# Sprawdza dziennik gry: odtworzenie stanu z dowolnej tury (żetony, VP, punkty kluczowe, RNG)
+import pytest
+from core.ekonomia import EconomySystem
+from core.tura import TurnManager
+from engine.action import CombatAction, MoveAction
+from engine.engine import GameEngine
+from engine.journal import ActionJournal, JournalError, JournalReplayer
+from engine.player import Player
+from engine.simulate import play_game
+from engine.token import Token
+
+
+@pytest.fixture
+def engine():
+    engine = GameEngine(
+        map_path="data/map_data.json",
+        tokens_index_path="assets/tokens/index.json",
+        tokens_start_path="assets/start_tokens.json",
+        seed=1,
+        read_only=True,
+        autoload=False,
+    )
+    q, r = next(
+        (q, r) for q, r in sorted(engine.board.key_to_coords(k) for k in engine.board.terrain)
+        if all(getattr(engine.board.get_tile(q + i, r), 'move_mod', None) == 0 for i in range(5))
+    )
+    stats = {"move": 4, "maintenance": 10, "sight": 1, "combat_value": 6, "defense_value": 1,
+             "attack": {"range": 1, "value": 3}}
+    engine.tokens = [
+        Token(id="A", owner="2 (Polska)", stats=dict(stats), q=q, r=r),
+        Token(id="B", owner="2 (Polska)", stats=dict(stats), q=q + 1, r=r),
+        Token(id="E", owner="5 (Niemcy)", stats=dict(stats), q=q + 2, r=r),
+    ]
+    engine.players = [Player(1, "Polska", "Generał", 5), Player(2, "Polska", "Dowódca", 5),
+                      Player(5, "Niemcy", "Dowódca", 5)]
+    for p in engine.players:
+        p.victory_points, p.vp_history = 0, []
+        p.economy = EconomySystem()
+    engine.update_all_players_visibility(engine.players)
+    return engine
+
+
+def test_odtworzenie_kazdej_tury(engine, tmp_path):
+    path = str(tmp_path / "partia.bin")
+    turn_manager = TurnManager(engine.players, game_engine=engine)
+    ActionJournal(path, engine, keyframe_every=3)
+    kp_hex = next(iter(engine.key_points_state))
+    engine.tokens.get("A").set_position(*engine.board.key_to_coords(kp_hex))
+    engine.record('deploy', token_id="A")
+    end_hash = {}  # tura -> skrót stanu na końcu tury
+    start_rng = {1: engine.rng.getstate()}  # tura -> stan RNG na początku tury
+    while turn_manager.current_turn < 7:
+        if engine.tokens.get("E") is not None:
+            engine.execute_action(CombatAction("B", "E"))
+        engine.execute_action(MoveAction("B", engine.tokens.get("B").q, engine.tokens.get("B").r + 1))
+        engine.players[0].economy.generate_economic_points(engine.rng.stream('economy'))
+        end_hash[turn_manager.current_turn] = engine.state_hash
+        for _ in engine.players:
+            if turn_manager.next_turn():
+                start_rng[turn_manager.current_turn] = engine.rng.getstate()
+                engine.process_key_points(engine.players)
+    end_hash[7] = engine.state_hash
+
+    replayer = JournalReplayer(path)
+    assert replayer.turns == list(range(1, 8))
+    events = [event for _, event, _ in replayer.events()]
+    assert events[:3] == ["start", "deploy", "combat"] and "key_points" in events
+    replay = replayer.new_engine()
+    for turn in range(1, 8):
+        replayer.seek(replay, turn)
+        # Tura w dzienniku pochodzi z menedżera tur (wpis 'turn'), nie ze stanu silnika
+        assert list(replayer.events())[replayer.index_of_turn(turn)][:2] == (turn, "turn" if turn > 1 else "start")
+        assert replay.rng.getstate() == start_rng[turn]
+        last = replayer.index_of_turn(turn + 1) - 1 if turn < 7 else len(replayer) - 1
+        replayer.replay(replay, last)
+        assert replay.state_hash == end_hash[turn]
+    assert [p.victory_points for p in replay.players] == [p.victory_points for p in engine.players]
+    assert replay.players[0].economy.economic_points == engine.players[0].economy.economic_points
+
+
+def test_powtorka_symulowanej_partii(tmp_path):
+    path = str(tmp_path / "symulacja.bin")
+    result = play_game(7, {"Polska": "agresywna", "Niemcy": "losowa"}, max_turns=12, journal_path=path)
+    replayer = JournalReplayer(path)
+    engine = replayer.seek(replayer.new_engine(), 6)
+    assert replayer.entries[replayer.index_of_turn(6)].turn == 6
+    replayer.replay(engine, len(replayer) - 1)
+    vp = sum(p.victory_points for p in engine.players if p.nation == "Polska")
+    assert vp == result.vp_polska
+
+
+def test_uszkodzony_dziennik(tmp_path, engine):
+    path = tmp_path / "zly.bin"
+    path.write_bytes(b"XXXX" + bytes(10))
+    with pytest.raises(JournalError):
+        JournalReplayer(str(path))
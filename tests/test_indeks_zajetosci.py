@@ -0,0 +1,68 @@
+# Sprawdza, czy indeks zajętości planszy (heks -> żetony) nadąża za ruchem, zmianą właściciela i eliminacją
+import json
+import pytest
+from engine.board import Board
+from engine.token import Token
+
+
+@pytest.fixture
+def board(tmp_path):
+    terrain = {f"{q},{r}": {"terrain_key": "pole", "move_mod": 0, "defense_mod": 0} for q in range(4) for r in range(4)}
+    map_path = tmp_path / "map.json"
+    map_path.write_text(json.dumps({"meta": {"hex_size": 30, "cols": 4, "rows": 4}, "terrain": terrain}), encoding="utf-8")
+    return Board(str(map_path))
+
+
+def _token(token_id, owner, q, r):
+    return Token(id=token_id, owner=owner, stats={"move": 5, "maintenance": 5, "nation": owner.split('(')[-1][:-1]}, q=q, r=r)
+
+
+def test_indeks_sledzi_ruch_zetonu(board):
+    t = _token("A", "2 (Polska)", 0, 0)
+    board.set_tokens([t])
+    assert board.is_occupied(0, 0)
+    t.set_position(1, 1)
+    assert not board.is_occupied(0, 0)
+    assert board.is_occupied(1, 1)
+    # Bezpośrednie przypisanie współrzędnych też aktualizuje indeks
+    t.q = 2
+    assert board.token_ids_at(2, 1) == {"A"}
+    assert not board.is_occupied(1, 1)
+
+
+def test_indeks_widocznosc_wlasciciel_i_nacja(board):
+    a = _token("A", "2 (Polska)", 0, 0)
+    b = _token("B", "5 (Niemcy)", 1, 0)
+    board.set_tokens([a, b])
+    assert board.is_occupied(1, 0, visible_tokens={"B"})
+    assert not board.is_occupied(1, 0, visible_tokens={"A"})
+    assert board.tokens_at(1, 0, nation="Niemcy") == [b]
+    assert board.tokens_at(1, 0, nation="Polska") == []
+    assert board.tokens_at(0, 0, owner="2 (Polska)") == [a]
+    b.owner = "6 (Niemcy)"
+    assert board.tokens_at(1, 0, owner="5 (Niemcy)") == []
+    assert board.owner_positions("6 (Niemcy)") == {(1, 0): {"B"}}
+
+
+def test_usuniecie_i_dodanie_zetonu(board):
+    a = _token("A", "2 (Polska)", 0, 0)
+    board.set_tokens([a])
+    board.remove_token(a)
+    assert not board.is_occupied(0, 0)
+    # Po odpięciu żeton nie modyfikuje już indeksu
+    a.set_position(3, 3)
+    assert not board.is_occupied(3, 3)
+    board.add_token(a)
+    assert board.get_token("A") is a
+    assert board.is_occupied(3, 3)
+
+
+def test_pathfinding_omija_zajete_pola(board):
+    blocker = _token("X", "5 (Niemcy)", 1, 0)
+    mover = _token("A", "2 (Polska)", 0, 0)
+    board.set_tokens([mover, blocker])
+    path = board.find_path((0, 0), (2, 0))
+    assert path is not None and (1, 0) not in path
+    # Przesunięcie blokującego żetonu zwalnia bezpośrednią drogę
+    blocker.set_position(3, 3)
+    assert board.find_path((0, 0), (2, 0)) == [(0, 0), (1, 0), (2, 0)]
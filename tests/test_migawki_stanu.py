@@ -0,0 +1,83 @@
+# Sprawdza migawki stanu w pamięci (snapshot/restore) i niezależne kopie silnika (clone)
+import pytest
+from core.ekonomia import EconomySystem
+from engine.action import CombatAction, MoveAction
+from engine.engine import GameEngine
+from engine.player import Player
+from engine.token import Token
+
+
+@pytest.fixture
+def engine():
+    engine = GameEngine(
+        map_path="data/map_data.json",
+        tokens_index_path="assets/tokens/index.json",
+        tokens_start_path="assets/start_tokens.json",
+        seed=1,
+        autoload=False,
+    )
+    q, r = next(
+        (q, r) for q, r in sorted(engine.board.key_to_coords(k) for k in engine.board.terrain)
+        if all(getattr(engine.board.get_tile(q + i, r), 'move_mod', None) == 0 for i in range(5))
+    )
+    stats = {"move": 4, "maintenance": 10, "sight": 1, "combat_value": 6, "defense_value": 1,
+             "attack": {"range": 1, "value": 40}}
+    engine.tokens = [
+        Token(id="A", owner="2 (Polska)", stats=dict(stats), q=q, r=r),
+        Token(id="B", owner="2 (Polska)", stats=dict(stats), q=q + 1, r=r),
+        Token(id="E", owner="5 (Niemcy)", stats=dict(stats), q=q + 2, r=r),
+    ]
+    engine.players = [Player(1, "Polska", "Generał", 5), Player(2, "Polska", "Dowódca", 5),
+                      Player(5, "Niemcy", "Dowódca", 5)]
+    for p in engine.players:
+        p.victory_points, p.vp_history = 0, []
+        p.economy = EconomySystem()
+    engine.update_all_players_visibility(engine.players)
+    return engine
+
+
+def _state(engine):
+    return (
+        sorted((t.id, t.q, t.r, t.owner, t.currentMovePoints, t.currentFuel, t.combat_value) for t in engine.tokens),
+        [(p.victory_points, len(p.vp_history), p.economy.economic_points) for p in engine.players],
+        engine.turn,
+    )
+
+
+def test_restore_przywraca_stan_po_walce_i_ruchach(engine):
+    q, r = engine.tokens.get("A").q, engine.tokens.get("A").r
+    before = _state(engine)
+    snap = engine.snapshot()
+    expected_roll = engine.rng.stream('combat').random()
+    engine.restore(snap)
+
+    success, _ = engine.execute_action(CombatAction("B", "E"))
+    assert success and engine.tokens.get("E") is None
+    assert engine.execute_action(MoveAction("A", q, r + 1))[0]
+    engine.players[0].economy.generate_economic_points(engine.rng.stream('economy'))
+    engine.turn += 1
+    assert _state(engine) != before
+
+    engine.restore(snap)
+    assert _state(engine) == before
+    assert engine.board.token_ids_at(q + 2, r) == {"E"}
+    assert engine.board.token_ids_at(q, r + 1) == set()
+    assert engine.rng.stream('combat').random() == expected_roll
+
+
+def test_clone_jest_niezalezny_od_oryginalu(engine):
+    q, r = engine.tokens.get("A").q, engine.tokens.get("A").r
+    before = _state(engine)
+    twin = engine.clone()
+    assert twin.board.terrain is engine.board.terrain
+    assert twin.tokens.get("A") is not engine.tokens.get("A")
+    assert twin.tokens.get("A").stats is engine.tokens.get("A").stats
+
+    assert twin.execute_action(CombatAction("B", "E"))[0]
+    assert twin.execute_action(MoveAction("A", q, r + 1))[0]
+    assert twin.tokens.get("E") is None
+    assert twin.board.token_ids_at(q, r + 1) == {"A"}
+
+    assert _state(engine) == before
+    assert engine.board.token_ids_at(q, r) == {"A"}
+    assert engine.board.token_ids_at(q + 2, r) == {"E"}
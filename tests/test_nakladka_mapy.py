@@ -0,0 +1,69 @@
+# Sprawdza rastrową nakładkę mapy: przeskładanie tylko zmienionych heksów daje ten sam obraz co pełne złożenie
+import random
+from PIL import Image, ImageChops
+from engine.board import Board
+from gui.map_overlay import MapOverlayRenderer
+
+
+def _board():
+    return Board("data/map_data.json")
+
+
+def _same(a, b):
+    return ImageChops.difference(a, b).getbbox() is None
+
+
+def test_przyrostowa_mgla_rowna_pelnemu_zlozeniu():
+    board = _board()
+    background = Image.new("RGB", (1200, 900), (120, 160, 90))
+    overlay = MapOverlayRenderer(board, background=background)
+    hexes = list(overlay._boxes)
+    rng = random.Random(7)
+    visible = set()
+    for _ in range(5):
+        visible ^= set(rng.sample(hexes, 40))
+        overlay.set_visible(visible)
+    fresh = MapOverlayRenderer(board, background=background)
+    fresh.set_visible(visible)
+    assert _same(overlay.image, fresh.image)
+
+
+def test_brak_zmian_nie_przeskladuje():
+    board = _board()
+    overlay = MapOverlayRenderer(board, size=(800, 600))
+    visible = set(list(overlay._boxes)[:10])
+    assert overlay.set_visible(visible)
+    assert not overlay.set_visible(set(visible))
+    assert not overlay.refresh_key_points()
+
+
+def test_mgla_tylko_poza_widocznymi_heksami():
+    board = _board()
+    background = Image.new("RGB", (800, 600), (200, 200, 200))
+    overlay = MapOverlayRenderer(board, background=background)
+    key = next(k for k, verts in overlay._polygons.items() if verts is not None and k not in overlay.spawn_hexes
+               and k not in overlay.special_hexes)
+    center = tuple(int(c) for c in board.hex_to_pixel(*key))
+    overlay.flush()
+    fogged = overlay.image.getpixel(center)
+    overlay.set_visible({key})
+    assert overlay.image.getpixel(center) == (200, 200, 200, 255)
+    assert fogged[3] == 255 and fogged[0] < 200
+
+
+def test_skladanie_tylko_w_widoku_i_doladowanie():
+    board = _board()
+    background = Image.new("RGB", (1200, 900), (120, 160, 90))
+    overlay = MapOverlayRenderer(board, background=background)
+    visible = set(list(overlay._boxes)[::3])
+    viewport = (0, 0, 300, 300)
+    overlay.set_visible(visible, viewport)
+    # Poza widokiem nic nie zostało złożone
+    assert overlay.image.getpixel((1100, 800))[3] == 0
+    assert overlay._dirty_tiles
+    assert all(t[0] * overlay.TILE >= 300 or t[1] * overlay.TILE >= 300 for t in overlay._dirty_tiles)
+    assert overlay.flush()
+    fresh = MapOverlayRenderer(board, background=background)
+    fresh.set_visible(visible)
+    assert _same(overlay.image, fresh.image)
+    assert overlay.hexes_in(viewport) == {k for k, (l, t, r, b) in overlay._boxes.items() if l < 300 and t < 300}
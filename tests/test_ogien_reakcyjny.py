@@ -0,0 +1,92 @@
+# Sprawdza mapę zagrożeń ognia reakcyjnego: zgodność z pełnym skanem po ruchach i eliminacjach
+import json
+import random
+import pytest
+from engine.board import Board
+from engine.reaction import ReactionResolver
+from engine.token import Token
+
+
+@pytest.fixture
+def board(tmp_path):
+    terrain = {f"{q},{r}": {"terrain_key": "pole", "move_mod": 0, "defense_mod": 0} for q in range(12) for r in range(12)}
+    map_path = tmp_path / "map.json"
+    map_path.write_text(json.dumps({"meta": {"hex_size": 30, "cols": 12, "rows": 12}, "terrain": terrain}), encoding="utf-8")
+    return Board(str(map_path))
+
+
+def _token(token_id, owner, q, r, sight, attack_range):
+    return Token(id=token_id, owner=owner, stats={"sight": sight, "attack": {"range": attack_range, "value": 4}}, q=q, r=r)
+
+
+def _brute_force(board, moved):
+    """Dawna pętla z PanelMapa: każdy wróg w zasięgu widzenia i ataku."""
+    result = []
+    for enemy in board.tokens:
+        if enemy.id == moved.id or enemy.faction == moved.faction:
+            continue
+        dist = board.hex_distance((enemy.q, enemy.r), (moved.q, moved.r))
+        if dist <= enemy.stats['sight'] and dist <= enemy.stats['attack']['range']:
+            result.append(enemy.id)
+    return sorted(result)
+
+
+class _Engine:
+    def __init__(self):
+        self.actions = []
+
+    def execute_action(self, action):
+        self.actions.append((action.token_id, action.defender_id, action.is_reaction))
+        return True, "ok"
+
+
+def test_mapa_zagrozen_zgodna_z_pelnym_skanem(board):
+    rng = random.Random(3)
+    owners = ["2 (Polska)", "3 (Polska)", "5 (Niemcy)", "6 (Niemcy)"]
+    tokens = [_token(f"T{i}", owners[i % 4], rng.randrange(12), rng.randrange(12), rng.randint(0, 3), rng.randint(1, 3))
+              for i in range(30)]
+    board.set_tokens(list(tokens))
+    resolver = ReactionResolver.for_board(board)
+    for step in range(200):
+        token = rng.choice(tokens)
+        if step % 17 == 0 and board.get_token(token.id) is token:
+            board.remove_token(token)
+            board.tokens.remove(token)
+            continue
+        if board.get_token(token.id) is token:
+            token.set_position(rng.randrange(12), rng.randrange(12))
+            found = [t.id for t in resolver.threats_at((token.q, token.r), token.faction)]
+            assert found == _brute_force(board, token)
+
+
+def test_resolve_atakuje_wrogow_z_mapy_zagrozen(board):
+    moved = _token("M", "2 (Polska)", 5, 5, 2, 1)
+    near = _token("E1", "5 (Niemcy)", 6, 5, 2, 1)
+    far_range = _token("E2", "5 (Niemcy)", 7, 5, 3, 1)
+    friend = _token("F", "3 (Polska)", 5, 6, 2, 1)
+    board.set_tokens([moved, near, far_range, friend])
+    engine = _Engine()
+    results = ReactionResolver.for_board(board).resolve(engine, moved)
+    assert engine.actions == [("E1", "M", True)]
+    assert [r[0] for r in results] == [near]
+    assert moved.wykryty_do_konca_tury
+
+
+def test_ruch_przerwany_na_pierwszym_zagrozonym_heksie(board):
+    from engine.action import MoveAction
+    mover = Token(id="M", owner="2 (Polska)", stats={"move": 10, "maintenance": 10, "sight": 0}, q=0, r=0)
+    # Wróg z zasięgiem 1 pilnuje heksu (4,0) i jego sąsiadów; sam go nie widzimy (sight 0)
+    guard = _token("G", "5 (Niemcy)", 4, 0, 2, 1)
+    board.set_tokens([mover, guard])
+
+    class _MoveEngine:
+        pass
+    engine = _MoveEngine()
+    engine.board, engine.tokens, engine.players = board, board.tokens, []
+    action = MoveAction("M", 7, 0)
+    success, _ = action.execute(engine)
+    assert success
+    # Żeton staje na pierwszym heksie strefy zagrożenia (sąsiad wroga), a nie u celu
+    assert (mover.q, mover.r) == action.interrupted_at
+    assert board.hex_distance((mover.q, mover.r), (4, 0)) == 1
+    assert ReactionResolver.for_board(board).threats_at(action.interrupted_at, mover.faction) == [guard]
@@ -0,0 +1,96 @@
+# Sprawdza transakcyjne paczki akcji silnika: wycofanie całej paczki i jedno zdarzenie po sukcesie
+import pytest
+from engine.action import CombatAction, MoveAction, ResupplyAction
+from engine.engine import GameEngine
+from engine.player import Player
+from engine.token import Token
+
+
+@pytest.fixture
+def engine():
+    engine = GameEngine(
+        map_path="data/map_data.json",
+        tokens_index_path="assets/tokens/index.json",
+        tokens_start_path="assets/start_tokens.json",
+        seed=1,
+        autoload=False,
+    )
+    # Rząd pięciu płaskich heksów
+    q, r = next(
+        (q, r) for q, r in sorted(engine.board.key_to_coords(k) for k in engine.board.terrain)
+        if all(getattr(engine.board.get_tile(q + i, r), 'move_mod', None) == 0 for i in range(5))
+    )
+    stats = {"move": 4, "maintenance": 10, "sight": 1, "price": 7, "combat_value": 6,
+             "defense_value": 1, "attack": {"range": 1, "value": 40}}
+    engine.tokens = [
+        Token(id="A", owner="2 (Polska)", stats=dict(stats), q=q, r=r),
+        Token(id="B", owner="2 (Polska)", stats=dict(stats), q=q + 1, r=r),
+        Token(id="E", owner="5 (Niemcy)", stats=dict(stats, sight=0), q=q + 4, r=r),
+    ]
+    engine.players = [Player(2, "Polska", "Dowódca", 5), Player(5, "Niemcy", "Dowódca", 5)]
+    for p in engine.players:
+        p.victory_points, p.vp_history, p.punkty_ekonomiczne = 0, [], 5
+    engine.row = (q, r)
+    return engine
+
+
+def _state(engine):
+    return sorted((t.id, t.q, t.r, t.currentMovePoints, t.currentFuel, t.combat_value) for t in engine.tokens)
+
+
+def test_nieudana_akcja_wycofuje_cala_paczke(engine):
+    q, r = engine.row
+    events = []
+    engine.subscribe(lambda event, data: events.append(event))
+    engine.tokens.get("A").currentFuel = 4
+    enemy = engine.tokens.get("E")
+    enemy.set_position(q + 2, r)  # w zasięgu ataku B
+    # Eliminowany żeton nie na końcu rejestru: rollback wstawia go z powrotem na jego miejsce
+    engine.tokens = [enemy] + [t for t in engine.tokens if t is not enemy]
+    order = list(engine.tokens)
+    before = _state(engine)
+    next_combat_draw = engine.rng.copy().stream('combat').random()
+    result = engine.execute_batch([
+        ResupplyAction("A", fuel=3),
+        CombatAction("B", "E"),
+        MoveAction("A", q, r + 1),
+        MoveAction("X", q, r),  # brak żetonu - paczka przerwana
+    ])
+    assert not result.success and result.failed_index == 3
+    assert "zniszczony" in result.messages[1]  # seed 1: obrońca ginie, rollback przywraca go do rejestru
+    assert _state(engine) == before
+    assert engine.board.get_token("E") is enemy and "E" in engine.tokens
+    assert list(engine.tokens) == order
+    assert [p.victory_points for p in engine.players] == [0, 0]
+    assert [p.punkty_ekonomiczne for p in engine.players] == [5, 5]
+    # Losowania walki z wycofanej paczki są cofnięte (powtarzalność przebiegu gry)
+    assert engine.rng.stream('combat').random() == next_combat_draw
+    assert events == []
+
+
+def test_udana_paczka_jedno_zdarzenie(engine):
+    q, r = engine.row
+    events = []
+    engine.subscribe(lambda event, data: events.append((event, data)))
+    engine.tokens.get("B").combat_value = 4
+    result = engine.execute_batch([MoveAction("A", q, r + 1), ResupplyAction("B", combat=1)], player=engine.players[0])
+    assert result.success, result.messages
+    assert [e for e, _ in events] == ["batch"] and events[0][1] is result
+    assert result.dirty_tokens == {"A", "B"}
+    assert {(q, r), (q, r + 1), (q + 1, r)} <= result.dirty_hexes
+    assert (engine.tokens.get("A").q, engine.tokens.get("A").r) == (q, r + 1)
+    assert engine.players[0].punkty_ekonomiczne == 4
+    assert result.messages[1].endswith("zasoby bojowe +1")
+
+
+def test_uzupelnienie_bez_punktow_i_ponad_maksimum(engine):
+    # Gracz bez punktów ekonomicznych nie uzupełnia za darmo
+    del engine.players[0].punkty_ekonomiczne
+    engine.tokens.get("A").currentFuel = 8
+    success, _ = ResupplyAction("A", fuel=1).execute(engine)
+    assert not success and engine.tokens.get("A").currentFuel == 8
+    # Ilość ponad maksimum jest przycinana; koszt i komunikat dotyczą faktycznie dodanych jednostek
+    engine.players[0].punkty_ekonomiczne = 5
+    success, message = ResupplyAction("A", fuel=1000000).execute(engine)
+    assert success and message == "Uzupełniono: paliwo +2, zasoby bojowe +0"
+    assert engine.tokens.get("A").currentFuel == 10 and engine.players[0].punkty_ekonomiczne == 3
@@ -0,0 +1,60 @@
+# Sprawdza pamięć podręczną obrazków żetonów: brak ponownych odczytów, unieważnianie po mtime i LRU
+import os
+import pytest
+from PIL import Image
+import gui.sprite_cache as sprite_cache
+from gui.sprite_cache import TokenSpriteCache
+
+
+@pytest.fixture
+def png(tmp_path):
+    path = tmp_path / "token.png"
+    Image.new("RGBA", (100, 100), (200, 0, 0, 255)).save(path)
+    return path
+
+
+@pytest.fixture
+def opens(monkeypatch):
+    calls = []
+    original = sprite_cache.Image.open
+
+    def counting_open(*args, **kwargs):
+        calls.append(args[0])
+        return original(*args, **kwargs)
+    monkeypatch.setattr(sprite_cache.Image, "open", counting_open)
+    return calls
+
+
+def test_brak_odczytow_po_rozgrzaniu(png, opens):
+    cache = TokenSpriteCache(photo_factory=lambda img: img)
+    first = cache.get(png, 40)
+    assert first.size == (40, 40)
+    assert cache.get(png, 40) is first
+    dimmed = cache.get(png, 40, dimmed=True)
+    assert dimmed.getpixel((20, 20))[3] == int(255 * 0.4)
+    assert cache.get(png, 40, zoom=2.0).size == (80, 80)
+    # Jeden odczyt pliku na wszystkie warianty
+    assert len(opens) == 1
+
+
+def test_uniewaznienie_po_zmianie_pliku(png, opens):
+    cache = TokenSpriteCache(photo_factory=lambda img: img)
+    first = cache.get(png, 40)
+    Image.new("RGBA", (100, 100), (0, 0, 200, 255)).save(png)
+    stat = os.stat(png)
+    os.utime(png, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    second = cache.get(png, 40)
+    assert second is not first
+    assert second.getpixel((20, 20))[:3] == (0, 0, 200)
+    assert len(opens) == 2
+
+
+def test_lru_i_brakujacy_plik(png, tmp_path):
+    cache = TokenSpriteCache(max_items=2, photo_factory=lambda img: img)
+    a = cache.get(png, 10)
+    cache.get(png, 20)
+    cache.get(png, 10)
+    cache.get(png, 30)  # usuwa najdawniej użyty wariant (20)
+    assert cache.get(png, 10) is a
+    assert len(cache._sprites) == 2
+    assert cache.get(tmp_path / "brak.png", 40) is None
@@ -0,0 +1,65 @@
+# Sprawdza wektorowe pole widzenia (szablony dysków na siatce terenu) względem definicji z dystansem heksowym
+import pytest
+from engine.board import Board
+from engine.engine import update_player_visibility
+from engine.player import Player
+from engine.token import Token
+
+
+@pytest.fixture(scope="module")
+def board():
+    return Board("data/map_data.json")
+
+
+def _brute_force(board, q, r, radius):
+    return {
+        (tile.q, tile.r) for tile in board.terrain.values()
+        if board.hex_distance((q, r), (tile.q, tile.r)) <= radius
+    }
+
+
+@pytest.mark.parametrize("radius", [0, 1, 2, 3, 5])
+def test_dysk_zgodny_z_dystansem_heksowym(board, radius):
+    tiles = list(board.terrain.values())
+    # Środki przy krawędziach i w środku mapy, obie parzystości q
+    samples = tiles[::97] + [tiles[0], tiles[-1]]
+    for tile in samples:
+        assert board.vision_hexes(tile.q, tile.r, radius) == _brute_force(board, tile.q, tile.r, radius)
+    # Środek poza mapą nadal widzi pobliskie heksy
+    assert board.vision_hexes(-2, 1, 3) == _brute_force(board, -2, 1, 3)
+
+
+def test_widocznosc_gracza_sumuje_dyski(board):
+    tiles = list(board.terrain.values())
+    tokens = [
+        Token(id=f"T{i}", owner="2 (Polska)", stats={"sight": 1 + i % 4}, q=tile.q, r=tile.r)
+        for i, tile in enumerate(tiles[::5])
+    ]
+    enemy = Token(id="E", owner="5 (Niemcy)", stats={"sight": 2}, q=tiles[3].q, r=tiles[3].r)
+    player = Player(2, "Polska", "Dowódca")
+    update_player_visibility(player, tokens + [enemy], board)
+    expected = set()
+    for t in tokens:
+        expected |= _brute_force(board, t.q, t.r, t.stats["sight"])
+    assert player.visible_hexes == expected
+    assert "E" in player.visible_tokens
+
+
+def test_widzenie_wzdluz_sciezki_zatrzymuje_na_wrogu(board):
+    from engine.visibility import PathVision
+    tiles = list(board.terrain.values())
+    start = tiles[len(tiles) // 2]
+    path = [(start.q + i, start.r) for i in range(6)]
+    assert all(board.get_tile(*h) is not None for h in path)
+    mover = Token(id="M", owner="2 (Polska)", stats={"sight": 2}, q=path[0][0], r=path[0][1])
+    ally = Token(id="A", owner="3 (Polska)", stats={"sight": 2}, q=path[2][0], r=path[2][1] + 1)
+    enemy = Token(id="E", owner="5 (Niemcy)", stats={"sight": 2}, q=path[5][0], r=path[5][1])
+    vision = PathVision(board, mover, [mover, ally, enemy])
+    first_sighting = next(i for i, step in enumerate(path) if vision.sees_enemy(step))
+    assert first_sighting == 3
+    hexes, enemy_ids = vision.reveal(path[:first_sighting + 1])
+    expected = set()
+    for step in path[:first_sighting + 1]:
+        expected |= _brute_force(board, step[0], step[1], 2)
+    assert hexes == expected
+    assert enemy_ids == {"E"}
@@ -0,0 +1,60 @@
+# Sprawdza rejestr żetonów silnika: indeks id, kubełki właściciela/nacji i zgodność z indeksem planszy
+import pytest
+from engine.engine import GameEngine
+from engine.token import Token
+from engine.token_registry import TokenRegistry, find_token
+
+
+def _token(token_id, owner, q=None, r=None):
+    return Token(id=token_id, owner=owner, stats={"move": 5, "maintenance": 5, "nation": owner.split('(')[-1][:-1]}, q=q, r=r)
+
+
+@pytest.fixture
+def engine():
+    return GameEngine(
+        map_path="data/map_data.json",
+        tokens_index_path="assets/tokens/index.json",
+        tokens_start_path="assets/start_tokens.json",
+        seed=123,
+    )
+
+
+def test_rejestr_indeks_kubelki_i_kolejnosc():
+    a, b, c = _token("A", "2 (Polska)"), _token("B", "5 (Niemcy)"), _token("C", "2 (Polska)")
+    reg = TokenRegistry([a, b])
+    reg.append(c)
+    assert list(reg) == [a, b, c] and reg[2] is c and len(reg) == 3
+    assert reg.get("B") is b and "B" in reg and b in reg
+    assert reg.by_owner("2 (Polska)") == [a, c]
+    assert reg.by_nation("Niemcy") == [b]
+    reg.remove(a)
+    assert list(reg) == [b, c] and reg[0] is b
+    assert reg.by_nation("Polska") == [c]
+    with pytest.raises(ValueError):
+        reg.remove(a)
+    assert find_token(reg, "C") is c
+    assert find_token([a, b], "A") is a
+    # Usuwanie w trakcie iteracji (np. eliminacje w pętli po żetonach)
+    for token in reg:
+        reg.remove(token)
+    assert len(reg) == 0 and reg.by_owner("2 (Polska)") == []
+
+
+def test_silnik_synchronizuje_plansze(engine):
+    tokens = engine.tokens
+    assert isinstance(tokens, TokenRegistry)
+    assert engine.board.tokens is tokens
+    token = next(t for t in tokens if t.q is not None)
+    engine.tokens.remove(token)
+    assert engine.board.get_token(token.id) is None
+    assert token.id not in engine.board.token_ids_at(token.q, token.r)
+    engine.tokens.add(token)
+    assert engine.board.get_token(token.id) is token
+    # Zmiana właściciela przenosi żeton między kubełkami rejestru
+    token.owner = "99 (Niemcy)"
+    assert engine.tokens.by_owner("99 (Niemcy)") == [token]
+    # Przypisanie listy zastępuje zawartość rejestru i indeks planszy
+    fresh = _token("X", "2 (Polska)", 0, 0)
+    engine.tokens = [fresh]
+    assert list(engine.tokens) == [fresh]
+    assert engine.board.get_token("X") is fresh and engine.board.get_token(token.id) is None
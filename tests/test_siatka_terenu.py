@@ -0,0 +1,56 @@
+# Sprawdza gęstą siatkę terenu (id heksów, tablice NumPy) i zgodność get_tile/coords_to_hex z danymi mapy
+import pytest
+from engine.board import Board
+from engine.hex_utils import get_hex_vertices, point_in_polygon
+
+
+@pytest.fixture(scope="module")
+def board():
+    return Board("data/map_data.json")
+
+
+def test_id_heksa_jest_odwracalne(board):
+    for key, tile in board.terrain.items():
+        idx = board.hex_id(tile.q, tile.r)
+        assert idx >= 0
+        assert board.hex_coords(idx) == (tile.q, tile.r)
+        assert board.get_tile(tile.q, tile.r) is tile
+        assert board.key_to_coords(key) == (tile.q, tile.r)
+    assert board.get_tile(-100, 500) is None
+    assert board.hex_id(-100, 500) == -1
+
+
+def test_tablice_zgodne_z_kafelkami(board):
+    assert int(board.valid_grid.sum()) == len(board.terrain)
+    for tile in board.terrain.values():
+        row, col = board.grid_index(tile.q, tile.r)
+        assert board.move_mod_grid[row, col] == tile.move_mod
+        assert board.defense_mod_grid[row, col] == tile.defense_mod
+        assert board.passable_grid[row, col] == (tile.move_mod != -1)
+        assert (board.q_grid[row, col], board.r_grid[row, col]) == (tile.q, tile.r)
+        spawn = board.spawn_grid[row, col]
+        assert (board.spawn_nations[spawn] if spawn >= 0 else None) == tile.spawn_nation
+    assert int(board.key_point_grid.sum()) == len([k for k in board.key_points if k in board.terrain])
+
+
+def test_coords_to_hex_zgodne_z_pelnym_przeszukaniem(board):
+    def brute_force(x, y):
+        for tile in board.terrain.values():
+            cx, cy = board.hex_to_pixel(tile.q, tile.r)
+            if point_in_polygon(x, y, get_hex_vertices(cx, cy, board.hex_size)):
+                return tile.q, tile.r
+        return None
+    for tile in list(board.terrain.values())[::37]:
+        cx, cy = board.hex_to_pixel(tile.q, tile.r)
+        for dx, dy in [(0, 0), (7, 3), (-9, 5), (4, -11)]:
+            assert board.coords_to_hex(cx + dx, cy + dy) == brute_force(cx + dx, cy + dy)
+
+
+def test_usuniecie_punktu_kluczowego(board):
+    key = next(iter(board.key_points))
+    row, col = board.grid_index(*board.key_to_coords(key))
+    assert board.key_point_grid[row, col]
+    b2 = Board("data/map_data.json")
+    b2.remove_key_point(key)
+    assert key not in b2.key_points
+    assert not b2.key_point_grid[row, col]
@@ -0,0 +1,81 @@
+# Sprawdza przyrostowy skrót stanu (Zobrist): zgodność z liczeniem od zera i niezależność od kolejności zmian
+import pytest
+from core.ekonomia import EconomySystem
+from engine.action import CombatAction, ModeChangeAction, MoveAction, ResupplyAction
+from engine.engine import GameEngine
+from engine.player import Player
+from engine.token import Token
+from engine.zobrist import full_state_hash
+
+
+@pytest.fixture
+def engine():
+    engine = GameEngine(
+        map_path="data/map_data.json",
+        tokens_index_path="assets/tokens/index.json",
+        tokens_start_path="assets/start_tokens.json",
+        seed=1,
+        read_only=True,
+        autoload=False,
+    )
+    q, r = next(
+        (q, r) for q, r in sorted(engine.board.key_to_coords(k) for k in engine.board.terrain)
+        if all(getattr(engine.board.get_tile(q + i, r), 'move_mod', None) == 0 for i in range(5))
+    )
+    stats = {"move": 4, "maintenance": 10, "sight": 1, "combat_value": 6, "defense_value": 1,
+             "attack": {"range": 1, "value": 40}}
+    engine.tokens = [
+        Token(id="A", owner="2 (Polska)", stats=dict(stats), q=q, r=r),
+        Token(id="B", owner="2 (Polska)", stats=dict(stats), q=q + 1, r=r),
+        Token(id="E", owner="5 (Niemcy)", stats=dict(stats), q=q + 2, r=r),
+    ]
+    engine.players = [Player(1, "Polska", "Generał", 5), Player(2, "Polska", "Dowódca", 5),
+                      Player(5, "Niemcy", "Dowódca", 5)]
+    for p in engine.players:
+        p.victory_points, p.vp_history, p.punkty_ekonomiczne = 0, [], 10
+        p.economy = EconomySystem()
+    engine.update_all_players_visibility(engine.players)
+    return engine
+
+
+def test_skrot_przyrostowy_rowny_liczonemu_od_zera(engine):
+    q, r = engine.tokens.get("A").q, engine.tokens.get("A").r
+    start = engine.state_hash
+    assert start == full_state_hash(engine)
+    snap = engine.snapshot()
+    steps = [
+        lambda: engine.execute_action(MoveAction("A", q, r + 1)),
+        lambda: engine.execute_action(ModeChangeAction("B", "recon")),
+        lambda: engine.execute_action(CombatAction("B", "E")),
+        lambda: engine.execute_action(ResupplyAction("A", fuel=1)),
+        lambda: engine.tokens.get("A").set_position(*engine.board.key_to_coords(next(iter(engine.key_points_state)))),
+        lambda: engine.process_key_points(engine.players),
+        lambda: engine.next_turn(),
+    ]
+    seen = {start}
+    for step in steps:
+        step()
+        assert engine.state_hash == full_state_hash(engine)
+        seen.add(engine.state_hash)
+    assert len(seen) == len(steps) + 1
+    engine.restore(snap)
+    assert engine.state_hash == start
+
+
+def test_rollback_paczki_przywraca_skrot(engine):
+    q, r = engine.tokens.get("A").q, engine.tokens.get("A").r
+    start = engine.state_hash
+    result = engine.execute_batch([MoveAction("A", q, r + 1), MoveAction("B", q + 50, r + 50)])
+    assert not result.success
+    assert engine.state_hash == start
+
+
+def test_ten_sam_stan_niezaleznie_od_kolejnosci(engine):
+    q, r = engine.tokens.get("A").q, engine.tokens.get("A").r
+    first, second = engine.clone(), engine.clone()
+    assert first.state_hash == second.state_hash == engine.state_hash
+    first.execute_action(MoveAction("A", q, r + 1))
+    first.execute_action(MoveAction("B", q + 1, r + 1))
+    second.execute_action(MoveAction("B", q + 1, r + 1))
+    second.execute_action(MoveAction("A", q, r + 1))
+    assert first.state_hash == second.state_hash != engine.state_hash
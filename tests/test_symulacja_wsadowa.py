@@ -0,0 +1,29 @@
+# Sprawdza symulacje wsadowe bez GUI: powtarzalność partii i zgodność wyników puli procesów
+import csv
+from engine.simulate import play_game, run_batch, write_results
+
+POLICIES = {"Polska": "losowa", "Niemcy": "agresywna"}
+
+
+def _key(result):
+    return (result.game, result.seed, result.winner, result.vp_polska, result.vp_niemcy, result.turns)
+
+
+def test_partia_powtarzalna_dla_seeda():
+    first = play_game(11, POLICIES, max_turns=4)
+    second = play_game(11, POLICIES, max_turns=4)
+    assert _key(first) == _key(second)
+    assert first.turns == 4
+    assert first.vp_polska + first.vp_niemcy == 0  # VP za eliminację przechodzą między stronami
+
+
+def test_pula_procesow_zgodna_z_jednym_procesem(tmp_path):
+    serial = list(run_batch(3, POLICIES, seed=5, max_turns=3, workers=1))
+    parallel = list(run_batch(3, POLICIES, seed=5, max_turns=3, workers=2))
+    assert [_key(r) for r in serial] == [_key(r) for r in parallel]
+    out = tmp_path / "wyniki.csv"
+    assert write_results(serial, str(out)) == 3
+    with open(out, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [int(row["game"]) for row in rows] == [0, 1, 2]
+    assert {row["winner"] for row in rows} <= {"Polska", "Niemcy", "remis"}
@@ -0,0 +1,60 @@
+# Sprawdza analityczny podgląd szans walki z rozkładem z wielu rozstrzygnięć CombatAction
+import json
+import random
+import pytest
+from engine.action import CombatAction
+from engine.board import Board
+from engine.combat import CombatPredictor, rounded_roll_distribution
+from engine.token import Token
+
+
+@pytest.fixture
+def board(tmp_path):
+    terrain = {f"{q},{r}": {"terrain_key": "pole", "move_mod": 0, "defense_mod": 1} for q in range(6) for r in range(6)}
+    map_path = tmp_path / "map.json"
+    map_path.write_text(json.dumps({"meta": {"hex_size": 30, "cols": 6, "rows": 6}, "terrain": terrain}), encoding="utf-8")
+    return Board(str(map_path))
+
+
+class _Engine:
+    def __init__(self, board, tokens):
+        self.board = board
+        self.tokens = tokens
+        self.players = []
+
+
+def _pair():
+    attacker = Token(id="A", owner="2 (Polska)", stats={"move": 3, "attack": {"range": 1, "value": 6}, "defense_value": 3, "combat_value": 8}, q=2, r=2)
+    defender = Token(id="D", owner="5 (Niemcy)", stats={"attack": {"range": 1, "value": 4}, "defense_value": 4, "combat_value": 6}, q=3, r=2)
+    return attacker, defender
+
+
+def test_rozklad_rzutu_sumuje_sie_do_jedynki():
+    for value in (0, 1, 5, 7.5, -3):
+        dist = dict(rounded_roll_distribution(value))
+        assert sum(dist.values()) == pytest.approx(1.0)
+    assert dict(rounded_roll_distribution(5)) == pytest.approx({4: 0.25, 5: 0.5, 6: 0.25})
+
+
+def test_podglad_zgodny_z_symulacja(board):
+    attacker, defender = _pair()
+    board.set_tokens([attacker, defender])
+    odds = CombatPredictor(board).predict(attacker, defender)
+    assert odds.defender_destroyed + odds.defender_retreats <= 1.0
+    random.seed(11)
+    runs = 4000
+    destroyed = retreated = attacker_lost = 0
+    for _ in range(runs):
+        a, d = _pair()
+        board.set_tokens([a, d])
+        engine = _Engine(board, [a, d])
+        assert CombatAction("A", "D").execute(engine)[0]
+        if d not in engine.tokens:
+            destroyed += 1
+        elif (d.q, d.r) != (3, 2):
+            retreated += 1
+        if a not in engine.tokens:
+            attacker_lost += 1
+    assert destroyed / runs == pytest.approx(odds.defender_destroyed, abs=0.03)
+    assert retreated / runs == pytest.approx(odds.defender_retreats, abs=0.03)
+    assert attacker_lost / runs == pytest.approx(odds.attacker_destroyed, abs=0.03)
@@ -0,0 +1,21 @@
+# Sprawdza tożsamość właściciela żetonu jako liczby całkowite (id gracza, id frakcji)
+from engine.player import Player
+from engine.token import Token, faction_id, is_owned_by, owner_identity, owner_nation
+
+
+def test_tozsamosc_parsowana_raz_i_aktualizowana():
+    token = Token(id="A", owner="2 (Polska)", stats={})
+    assert (token.owner_player, token.faction) == (2, faction_id("Polska"))
+    assert owner_identity("2 (Polska)") is owner_identity("2 (Polska)")
+    token.owner = "5 (Niemcy)"
+    assert (token.owner_player, token.faction) == (5, faction_id("Niemcy"))
+    assert owner_nation("5 (Niemcy)") == "Niemcy"
+    assert owner_nation("Polska") == "" and owner_identity(None) == (None, 0)
+
+
+def test_is_owned_by_porownuje_id_gracza_i_frakcje():
+    token = Token(id="A", owner="2 (Polska)", stats={})
+    assert is_owned_by(token, Player(2, "Polska", "Dowódca"))
+    assert is_owned_by(token, Player("2", "Polska", "Dowódca"))
+    assert not is_owned_by(token, Player(2, "Niemcy", "Dowódca"))
+    assert not is_owned_by(token, Player(3, "Polska", "Dowódca"))
@@ -0,0 +1,87 @@
+# Sprawdza, czy przyrostowa mgła wojny (liczniki widoczności) daje ten sam wynik co pełne przeliczenie
+import copy
+import random
+import pytest
+from engine.board import Board
+from engine.engine import update_all_players_visibility, update_general_visibility, update_player_visibility, clear_temp_visibility
+from engine.player import Player
+from engine.token import Token
+
+
+@pytest.fixture
+def board():
+    return Board("data/map_data.json")
+
+
+def _players():
+    return [
+        Player(1, "Polska", "Generał"), Player(2, "Polska", "Dowódca"), Player(3, "Polska", "Dowódca"),
+        Player(4, "Niemcy", "Generał"), Player(5, "Niemcy", "Dowódca"), Player(6, "Niemcy", "Dowódca"),
+    ]
+
+
+def _full_recompute(players, tokens, board):
+    """Referencyjne pełne przeliczenie na kopiach graczy."""
+    reference = copy.deepcopy(players)
+    for player in reference:
+        update_player_visibility(player, tokens, board)
+    for player in reference:
+        if player.role.lower() == 'generał':
+            update_general_visibility(player, reference, tokens)
+    return {p.id: (p.visible_hexes, p.visible_tokens) for p in reference}
+
+
+def _assert_matches(players, tokens, board):
+    expected = _full_recompute(players, tokens, board)
+    for p in players:
+        assert p.visible_hexes == expected[p.id][0], p
+        assert p.visible_tokens == expected[p.id][1], p
+
+
+def test_ruchy_dodawanie_i_eliminacja(board):
+    rng = random.Random(7)
+    tiles = list(board.terrain.values())
+    owners = ["2 (Polska)", "3 (Polska)", "5 (Niemcy)", "6 (Niemcy)"]
+    tokens = []
+    for i in range(40):
+        tile = rng.choice(tiles)
+        tokens.append(Token(id=f"T{i}", owner=owners[i % 4], stats={"sight": rng.randint(0, 4)}, q=tile.q, r=tile.r))
+    board.set_tokens(tokens)
+    players = _players()
+    update_all_players_visibility(players, tokens, board)
+    _assert_matches(players, tokens, board)
+    for step in range(60):
+        token = rng.choice(tokens)
+        neighbour = rng.choice(board.neighbors(token.q, token.r))
+        if board.get_tile(*neighbour) is not None:
+            token.set_position(*neighbour)
+        if step % 15 == 0:
+            victim = tokens.pop(rng.randrange(len(tokens)))
+            board.remove_token(victim)
+        if step % 20 == 0:
+            tile = rng.choice(tiles)
+            new_token = Token(id=f"N{step}", owner=rng.choice(owners), stats={"sight": 2}, q=tile.q, r=tile.r)
+            tokens.append(new_token)
+            board.add_token(new_token)
+        _assert_matches(players, tokens, board)
+
+
+def test_widocznosc_tymczasowa(board):
+    tiles = list(board.terrain.values())
+    scout = Token(id="S", owner="2 (Polska)", stats={"sight": 1}, q=tiles[0].q, r=tiles[0].r)
+    enemy = Token(id="E", owner="5 (Niemcy)", stats={"sight": 1}, q=tiles[-1].q, r=tiles[-1].r)
+    tokens = [scout, enemy]
+    board.set_tokens(tokens)
+    players = _players()
+    update_all_players_visibility(players, tokens, board)
+    assert "E" not in players[1].visible_tokens
+    # Odkrycie w trakcie tury (jak w MoveAction) i wyczyszczenie na koniec tury
+    players[1].temp_visible_hexes.add((enemy.q, enemy.r))
+    update_all_players_visibility(players, tokens, board)
+    assert "E" in players[1].visible_tokens
+    assert (enemy.q, enemy.r) in players[0].visible_hexes
+    _assert_matches(players, tokens, board)
+    clear_temp_visibility(players)
+    update_all_players_visibility(players, tokens, board)
+    assert "E" not in players[1].visible_tokens
+    _assert_matches(players, tokens, board)
@@ -0,0 +1,78 @@
+# Sprawdza zapis gry w formacie archiwum: pliki kupionych żetonów w magazynie blobs zapisywane raz,
+# odtwarzanie ich przy wczytaniu oraz wczytywanie starych zapisów JSON
+import json
+import os
+import zipfile
+import pytest
+from core.ekonomia import EconomySystem
+from engine.engine import GameEngine
+from engine.player import Player
+from engine.save_manager import BLOBS_DIR, load_game, save_game, save_game_json
+from engine.token import Token
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = GameEngine(
+        map_path="data/map_data.json",
+        tokens_index_path="assets/tokens/index.json",
+        tokens_start_path="assets/start_tokens.json",
+        seed=1,
+        read_only=True,
+        autoload=False,
+    )
+    engine.players = [Player(2, "Polska", "Dowódca", 5)]
+    engine.players[0].economy = EconomySystem()
+    engine.players[0].economy.economic_points = 12
+    # Pliki względne (assets/tokens/aktualne) w katalogu tymczasowym zamiast w repozytorium
+    monkeypatch.chdir(tmp_path)
+    return engine
+
+
+def _buy_token(engine, token_id, image: bytes):
+    aktualne = os.path.join("assets", "tokens", "aktualne")
+    os.makedirs(aktualne, exist_ok=True)
+    with open(os.path.join(aktualne, f"{token_id}.png"), "wb") as f:
+        f.write(image)
+    with open(os.path.join(aktualne, f"{token_id}.json"), "w", encoding="utf-8") as f:
+        json.dump({"id": token_id, "move": 3}, f)
+    engine.tokens.append(Token(id=token_id, owner="2 (Polska)", stats={"move": 3, "maintenance": 5}, q=1, r=1))
+
+
+def _blob_count(saves):
+    return sum(len(files) for _, _, files in os.walk(saves / BLOBS_DIR))
+
+
+def test_pliki_zetonow_zapisane_raz(engine, tmp_path):
+    saves = tmp_path / "saves"
+    image = os.urandom(40_000)
+    _buy_token(engine, "nowy_A", image)
+    save_game(str(saves / "pierwszy.sav"), engine)
+    assert zipfile.is_zipfile(saves / "pierwszy.sav")
+    assert _blob_count(saves) == 2
+    # Kolejne zapisy tej samej gry nie powielają plików, a sam zapis nie zawiera obrazka
+    _buy_token(engine, "nowy_A", image)
+    save_game(str(saves / "drugi.sav"), engine)
+    assert _blob_count(saves) == 2
+    assert os.path.getsize(saves / "drugi.sav") < len(image) // 4
+
+    png = tmp_path / "assets" / "tokens" / "aktualne" / "nowy_A.png"
+    assert not png.exists()  # save_game czyści folder aktualne
+    engine.tokens.remove("nowy_A")
+    engine.players[0].economy.economic_points = 0
+    load_game(str(saves / "drugi.sav"), engine)
+    assert png.read_bytes() == image
+    assert engine.tokens.get("nowy_A").q == 1
+    assert engine.players[0].economy.economic_points == 12
+
+
+def test_wczytanie_starego_zapisu_json(engine, tmp_path):
+    image = os.urandom(1_000)
+    _buy_token(engine, "nowy_B", image)
+    path = tmp_path / "saves" / "stary.json"
+    save_game_json(str(path), engine)
+    assert not zipfile.is_zipfile(path)
+    engine.tokens.remove("nowy_B")
+    load_game(str(path), engine)
+    assert engine.tokens.get("nowy_B") is not None
+    assert (tmp_path / "assets" / "tokens" / "aktualne" / "nowy_B.png").read_bytes() == image
@@ -0,0 +1,81 @@
+# Sprawdza zapis automatyczny w tle: zapisy różnicowe między pełnymi, rotację generacji i odtworzenie stanu
+import os
+import pytest
+from core.ekonomia import EconomySystem
+from engine.autosave import AutoSaver, autosave_files, capture_state, load_autosave
+from engine.engine import GameEngine
+from engine.player import Player
+
+PATHS = {name: os.path.abspath(path) for name, path in (
+    ("map_path", "data/map_data.json"),
+    ("tokens_index_path", "assets/tokens/index.json"),
+    ("tokens_start_path", "assets/start_tokens.json"),
+)}
+
+
+@pytest.fixture
+def engine():
+    engine = GameEngine(**PATHS, seed=1, read_only=True)
+    engine.players = [Player(1, "Polska", "Generał", 5), Player(2, "Polska", "Dowódca", 5)]
+    for p in engine.players:
+        p.victory_points, p.vp_history = 0, []
+        p.economy = EconomySystem()
+    engine.players[1].punkty_ekonomiczne = 0
+    return engine
+
+
+def _move_some(engine, turn):
+    for token in list(engine.tokens)[turn % 5::7]:
+        token.set_position(token.q, token.r + 1)
+    engine.rng.stream('combat').random()
+    engine.players[turn % 2].victory_points += turn
+    engine.players[1].punkty_ekonomiczne = turn
+    hex_id, kp = next(iter(engine.key_points_state.items()))
+    engine._set_key_point_value(hex_id, kp, kp['current_value'] - 1)
+    engine.turn += 1
+
+
+def test_roznice_i_rotacja_generacji(engine, tmp_path):
+    saver = AutoSaver(str(tmp_path), engine, full_every=3, generations=2)
+    states = {}
+    for seq in range(1, 8):
+        _move_some(engine, seq)
+        saver.request()
+        states[seq] = capture_state(engine)
+    saver.close()
+    files = autosave_files(str(tmp_path))
+    assert [(n, kind) for n, kind, _ in files] == [(4, "full"), (5, "delta"), (6, "delta"), (7, "full")]
+    assert os.path.getsize(files[1][2]) < os.path.getsize(files[0][2]) / 2
+    assert load_autosave(str(tmp_path)) == states[7]
+
+    # Uszkodzony ostatni pełny zapis: stan z poprzedniej generacji i jej różnic
+    with open(files[-1][2], "wb") as f:
+        f.write(b"uszkodzony")
+    assert load_autosave(str(tmp_path)) == states[6]
+
+
+def test_end_turn_zapisuje_stan_z_chwili_wywolania(engine, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _move_some(engine, 3)
+    engine.end_turn()
+    expected = capture_state(engine)
+    # Zmiana po powrocie z end_turn nie trafia do zleconego zapisu
+    token = next(iter(engine.tokens))
+    token.set_position(token.q + 1, token.r)
+    engine.autosave.close()
+    # Bez autoload zawsze nowa gra; wznowienie odtwarza też graczy (VP, ekonomia) i punkty kluczowe
+    assert GameEngine(**PATHS, seed=1, read_only=True).turn == 1
+    resumed = GameEngine(**PATHS, seed=1, read_only=True, autoload=True)
+    assert capture_state(resumed) == expected
+    assert resumed.players[1].punkty_ekonomiczne == 3
+
+
+def test_rotacja_nie_usuwa_bazy_roznic(engine, tmp_path):
+    # Różnice po ostatnim pełnym zapisie przetrwają rotację razem z nim, a osierocone różnice znikają
+    saver = AutoSaver(str(tmp_path), engine, full_every=4, generations=1)
+    for seq in range(1, 7):
+        _move_some(engine, seq)
+        saver.request()
+    saver.close()
+    assert [(n, kind) for n, kind, _ in autosave_files(str(tmp_path))] == [(5, "full"), (6, "delta")]
+    assert load_autosave(str(tmp_path)) == capture_state(engine)
@@ -0,0 +1,58 @@
+# Sprawdza pole osiągalności (Dijkstra) planszy: koszty, ścieżki, zgodność z find_path i unieważnianie pamięci podręcznej
+import json
+import pytest
+from engine.board import Board
+from engine.token import Token
+
+
+@pytest.fixture
+def board(tmp_path):
+    terrain = {f"{q},{r}": {"terrain_key": "pole", "move_mod": 0, "defense_mod": 0} for q in range(5) for r in range(5)}
+    terrain["1,0"]["move_mod"] = 2  # las
+    terrain["2,2"]["move_mod"] = -1  # nieprzejezdne
+    map_path = tmp_path / "map.json"
+    map_path.write_text(json.dumps({"meta": {"hex_size": 30, "cols": 5, "rows": 5}, "terrain": terrain}), encoding="utf-8")
+    return Board(str(map_path))
+
+
+def _path_cost(board, path):
+    return sum(board.step_cost(*step) for step in path[1:])
+
+
+def test_koszty_i_sciezki_zgodne_z_find_path(board):
+    field = board.reachable((0, 0), max_mp=4, max_fuel=6)
+    assert field.cost_to((0, 0)) == 0
+    assert (2, 2) not in field
+    for target in board.terrain:
+        goal = board.key_to_coords(target)
+        path = board.find_path((0, 0), goal, max_mp=4, max_fuel=6)
+        if path is None:
+            assert goal not in field or goal == (0, 0)
+            continue
+        assert goal in field
+        assert field.cost_to(goal) == _path_cost(board, path)
+        reconstructed = field.path_to(goal)
+        assert reconstructed[0] == (0, 0) and reconstructed[-1] == goal
+        assert _path_cost(board, reconstructed) == field.cost_to(goal)
+    # Paliwo ogranicza zasięg tak samo jak MP
+    assert max(board.reachable((0, 0), max_mp=9, max_fuel=2).cost.values()) <= 2
+
+
+def test_fallback_do_najblizszego_pola(board):
+    field = board.reachable((0, 0), max_mp=2, max_fuel=2)
+    assert field.path_to((4, 4)) is None
+    path = field.path_to_closest((4, 4))
+    assert path[0] == (0, 0) and len(path) > 1
+    assert board.hex_distance(path[-1], (4, 4)) == min(board.hex_distance(h, (4, 4)) for h in field.hexes())
+
+
+def test_pamiec_podreczna_uniewazniana_po_ruchu_zetonu(board):
+    blocker = Token(id="X", owner="5 (Niemcy)", stats={"move": 5, "maintenance": 5, "nation": "Niemcy"}, q=0, r=1)
+    board.set_tokens([blocker])
+    field = board.reachable((0, 0), max_mp=3, max_fuel=3)
+    assert (0, 1) not in field
+    assert board.reachable((0, 0), max_mp=3, max_fuel=3) is field
+    # Niewidoczny żeton nie blokuje ruchu
+    assert (0, 1) in board.reachable((0, 0), max_mp=3, max_fuel=3, visible_tokens=set())
+    blocker.set_position(4, 4)
+    assert (0, 1) in board.reachable((0, 0), max_mp=3, max_fuel=3)
@@ -0,0 +1,23 @@
+# Sprawdza zwarty model żetonu: sloty zamiast __dict__ i współdzielone statystyki jednostek
+from engine.token import Token, load_tokens
+
+
+def test_zetony_dziela_statystyki_i_nie_maja_slownika():
+    tokens = load_tokens("assets/tokens/index.json", "assets/start_tokens.json")
+    token = tokens[0]
+    token.apply_movement_mode(reset_mp=True)
+    assert not hasattr(token, '__dict__') or not token.__dict__
+    copy = Token.from_dict(token.serialize())
+    assert copy.stats is token.stats
+    assert copy.serialize() == token.serialize()
+
+
+def test_wlasny_atrybut_i_podmiana_statystyk():
+    token = Token.from_dict({"id": "A", "owner": "2 (Polska)", "stats": {"move": 4, "sight": 2}})
+    other = Token.from_dict({"id": "B", "owner": "2 (Polska)", "stats": {"move": 4, "sight": 2}})
+    assert token.stats is other.stats
+    # Zmiana statystyk jednego żetonu przez podmianę słownika nie dotyka drugiego
+    token.stats = dict(token.stats, sight=5)
+    assert other.stats["sight"] == 2
+    token.custom_flag = True
+    assert token.custom_flag
@@ -65,7 +65,8 @@ def diagnose_key_points_system():
             tokens_index_path="assets/tokens/index.json",
             tokens_start_path="assets/start_tokens.json",
             seed=42,
-            read_only=True  # Zapobiega nadpisywaniu pliku mapy
+            read_only=True,  # Zapobiega nadpisywaniu pliku mapy
+            autoload=False  # Diagnostyka stanu początkowego, bez wznawiania zapisanej gry
         )
         print("✅ GameEngine został zainicjalizowany")
     except Exception as e:
@@ -1,6 +1,7 @@
 import csv
 import os
 from datetime import datetime
+from engine.token import owner_identity, player_key
 
 _log_file_path = None
 _initialized = False
@@ -76,14 +77,10 @@ def _resolve_player_info(player_or_owner, players):
     # Owner string like "2 (Polska)"
     owner_str = str(player_or_owner or '').strip()
     if owner_str:
-        try:
-            owner_id = owner_str.split('(')[0].strip()
-            owner_id_int = int(owner_id)
-        except Exception:
-            owner_id_int = None
-        if players and owner_id_int is not None:
+        owner_id = owner_identity(owner_str)[0] if '(' in owner_str else player_key(owner_str)
+        if players and owner_id is not None:
             for p in players:
-                if getattr(p, 'id', None) == owner_id_int:
+                if player_key(getattr(p, 'id', None)) == owner_id:
                     return p.id, p.nation, p.role
     return pid, nation, role
 